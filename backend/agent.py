@@ -0,0 +1,137 @@
+"""
+Jun-Panel Agent 入口
+无界面模式：在被监控主机上采集系统状态与容器列表，批量压缩后上报到中心面板
+
+用法:
+    PANEL_URL=http://nas:3030 AGENT_TOKEN=xxx NODE_NAME=box1 python agent.py
+"""
+import os
+import sys
+import gzip
+import time
+import asyncio
+import logging
+from collections import deque
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from schema.schemas import NodeReport, NodeSample
+from service.system_service import get_sampler
+from service.docker_service import docker_service
+from service.node_service import default_node_name
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("agent")
+
+# 中心面板地址
+PANEL_URL = os.getenv("PANEL_URL", "http://127.0.0.1:8000").rstrip("/")
+# 上报密钥（需与中心面板的 AGENT_TOKEN 一致）
+AGENT_TOKEN = os.getenv("AGENT_TOKEN", "")
+# 采样间隔（秒）
+AGENT_INTERVAL = float(os.getenv("AGENT_INTERVAL", "1"))
+# 每批上报的采样数
+AGENT_BATCH_SIZE = int(os.getenv("AGENT_BATCH_SIZE", "5"))
+# 上报失败时最多缓存的采样数，超出后丢弃最旧的
+AGENT_MAX_BUFFER = int(os.getenv("AGENT_MAX_BUFFER", "600"))
+# 上报失败后的重试间隔（秒）：从 AGENT_BACKOFF_BASE 起逐次翻倍，不超过 AGENT_BACKOFF_MAX
+AGENT_BACKOFF_BASE = float(os.getenv("AGENT_BACKOFF_BASE", "1"))
+AGENT_BACKOFF_MAX = float(os.getenv("AGENT_BACKOFF_MAX", "60"))
+
+
+async def push_report(session: aiohttp.ClientSession, report: NodeReport) -> bool:
+    """压缩并上报一批数据"""
+    body = gzip.compress(report.model_dump_json().encode(), compresslevel=6)
+    try:
+        async with session.post(
+            f"{PANEL_URL}/api/nodes/ingest",
+            data=body,
+            headers={
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+                "X-Agent-Token": AGENT_TOKEN
+            },
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status != 200:
+                logger.warning(f"上报被拒绝: HTTP {response.status} {await response.text()}")
+                return False
+            return True
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"上报失败: {e}")
+        return False
+
+
+async def push_loop(session: aiohttp.ClientSession, buffer: deque, ready: asyncio.Event):
+    """
+    上报任务，与采样循环分离
+
+    缓冲区攒够一批时被唤醒，每次发送缓冲区中的全部采样；
+    失败后按指数退避重试，期间采样照常进行，超出缓冲上限时丢弃最旧的采样
+    """
+    node = default_node_name()
+    backoff = 0.0
+    while True:
+        if backoff:
+            await asyncio.sleep(backoff)
+        else:
+            await ready.wait()
+        ready.clear()
+        if not buffer:
+            continue
+
+        batch = list(buffer)
+        containers = None
+        if await docker_service.is_available():
+            containers = await docker_service.list_containers()
+        report = NodeReport(node=node, samples=batch, containers=containers)
+
+        if await push_report(session, report):
+            # 只移除已发送的采样；发送期间新增的留到下一批
+            sent = {id(sample) for sample in batch}
+            while buffer and id(buffer[0]) in sent:
+                buffer.popleft()
+            backoff = 0.0
+            if len(buffer) >= AGENT_BATCH_SIZE:
+                ready.set()
+        else:
+            backoff = min(max(backoff * 2, AGENT_BACKOFF_BASE), AGENT_BACKOFF_MAX)
+            logger.info(f"{backoff:g} 秒后重试上报，已缓存 {len(buffer)} 条采样")
+
+
+async def run_agent():
+    """按固定间隔采样，上报在独立任务中进行，服务端不可用时不影响采样"""
+    buffer: deque = deque(maxlen=AGENT_MAX_BUFFER)
+    ready = asyncio.Event()
+    logger.info(f"Agent {default_node_name()} 已启动，上报到 {PANEL_URL}，间隔 {AGENT_INTERVAL}s")
+
+    sampler = get_sampler()
+    await asyncio.to_thread(sampler.sample)  # 预热 CPU / IO 计数器
+    async with aiohttp.ClientSession() as session:
+        pusher = asyncio.create_task(push_loop(session, buffer, ready))
+        try:
+            while True:
+                started = time.monotonic()
+                status = await asyncio.to_thread(sampler.sample)
+                buffer.append(NodeSample(timestamp=time.time(), status=status))
+                if len(buffer) >= AGENT_BATCH_SIZE:
+                    ready.set()
+
+                elapsed = time.monotonic() - started
+                await asyncio.sleep(max(0.0, AGENT_INTERVAL - elapsed))
+        finally:
+            pusher.cancel()
+
+
+if __name__ == "__main__":
+    if not AGENT_TOKEN:
+        logger.error("未配置 AGENT_TOKEN")
+        sys.exit(1)
+    try:
+        asyncio.run(run_agent())
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,6 @@
 """
 API 路由包初始化
 """
-from api import cards, groups, system, docker, settings, upload, health
+from api import cards, groups, system, docker, settings, upload, health, nodes, alerts
 
-__all__ = ["cards", "groups", "system", "docker", "settings", "upload", "health"]
+__all__ = ["cards", "groups", "system", "docker", "settings", "upload", "health", "nodes", "alerts"]
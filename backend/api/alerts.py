@@ -0,0 +1,155 @@
+"""
+告警规则 API 路由
+处理告警规则的增删改查与当前告警查询
+"""
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from repository.database import get_db
+from model.user import User
+from model.alert_rule import AlertRule
+from schema.schemas import (
+    AlertRuleCreate, AlertRuleUpdate, AlertRuleResponse,
+    AlertEvent, MessageResponse
+)
+from service.auth_service import get_current_user
+from service.alert_service import alert_engine, ALERT_SINKS, TARGET_METRICS
+
+router = APIRouter(prefix="/api/alerts", tags=["告警"])
+
+
+def validate_rule(metric: str, sink: str, target: Optional[str] = None, webhook_url: Optional[str] = None):
+    """校验指标、监控对象与通知渠道；webhook 通知必须配置 http / https 地址"""
+    if not alert_engine.supports(metric):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的指标: {metric}"
+        )
+    if target and metric not in TARGET_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"指标 {metric} 不支持指定监控对象"
+        )
+    if sink not in ALERT_SINKS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的通知方式: {sink}"
+        )
+    if sink == "webhook" and not (
+        webhook_url and webhook_url.startswith(("http://", "https://")) and urlsplit(webhook_url).hostname
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="webhook 通知需要填写 http / https 地址"
+        )
+
+
+@router.get("/rules", response_model=List[AlertRuleResponse])
+async def get_rules(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    获取当前用户的所有告警规则
+    """
+    return db.query(AlertRule).filter(
+        AlertRule.user_id == current_user.id
+    ).order_by(AlertRule.id).all()
+
+
+@router.post("/rules", response_model=AlertRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule_data: AlertRuleCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    创建告警规则
+    """
+    validate_rule(rule_data.metric, rule_data.sink, rule_data.target, rule_data.webhook_url)
+    
+    rule = AlertRule(user_id=current_user.id, **rule_data.model_dump())
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    
+    alert_engine.reload()
+    return rule
+
+
+@router.put("/rules/{rule_id}", response_model=AlertRuleResponse)
+async def update_rule(
+    rule_id: int,
+    rule_data: AlertRuleUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    更新告警规则
+    """
+    rule = db.query(AlertRule).filter(
+        AlertRule.id == rule_id,
+        AlertRule.user_id == current_user.id
+    ).first()
+    
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="告警规则不存在"
+        )
+    
+    update_data = rule_data.model_dump(exclude_unset=True)
+    validate_rule(
+        update_data.get("metric", rule.metric),
+        update_data.get("sink", rule.sink),
+        update_data.get("target", rule.target),
+        update_data.get("webhook_url", rule.webhook_url)
+    )
+    for field, value in update_data.items():
+        setattr(rule, field, value)
+    
+    db.commit()
+    db.refresh(rule)
+    
+    alert_engine.reload()
+    return rule
+
+
+@router.delete("/rules/{rule_id}", response_model=MessageResponse)
+async def delete_rule(
+    rule_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    删除告警规则
+    """
+    rule = db.query(AlertRule).filter(
+        AlertRule.id == rule_id,
+        AlertRule.user_id == current_user.id
+    ).first()
+    
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="告警规则不存在"
+        )
+    
+    db.delete(rule)
+    db.commit()
+    
+    alert_engine.reload()
+    return MessageResponse(message="告警规则已删除", success=True)
+
+
+@router.get("/active", response_model=List[AlertEvent])
+async def get_active_alerts(current_user: User = Depends(get_current_user)):
+    """
+    获取当前正在触发的告警
+    
+    容器事件规则按容器各返回一条
+    """
+    return alert_engine.active_events(current_user.id)
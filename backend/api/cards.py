@@ -3,35 +3,55 @@
 处理卡片的增删改查和排序
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from repository.database import get_db
 from model.user import User
 from model.card import Card
 from model.group import Group
+from model.setting import Setting
 from schema.schemas import (
     CardCreate, CardUpdate, CardResponse, CardWithGroup,
-    SortRequest, MessageResponse
+    SortRequest, SortResponse, MessageResponse
 )
 from service.auth_service import get_current_user
+from service.health_service import health_prober
+from service.route_service import is_lan_client, preferred_url
+from service.sort_service import SortConflict, SortError, sort_cards as bulk_sort_cards, touch_version
 
 router = APIRouter(prefix="/api/cards", tags=["导航卡片"])
 
 
 @router.get("", response_model=List[CardWithGroup])
 async def get_cards(
+    request: Request,
+    route: str = Query("manual", pattern="^(manual|auto)$"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     获取当前用户的所有导航卡片
+    
+    Args:
+        route: auto 时根据后台探测结果与访问者所在网络为每张卡片填写 preferred_url
     """
     cards = db.query(Card).filter(
         Card.user_id == current_user.id
     ).order_by(Card.sort_order).all()
     
-    return cards
+    if route == "manual":
+        return cards
+    
+    setting = db.query(Setting).filter(Setting.user_id == current_user.id).first()
+    use_external = bool(setting and setting.use_external_url)
+    lan = is_lan_client(request)
+    results = []
+    for card in cards:
+        item = CardWithGroup.model_validate(card)
+        item.preferred_url = preferred_url(card, lan, use_external, health_prober.result)
+        results.append(item)
+    return results
 
 
 @router.get("/{card_id}", response_model=CardResponse)
@@ -171,12 +191,14 @@ async def delete_card(
         )
     
     db.delete(card)
+    # 删除不留下 updated_at，推进排序版本使其他页面的旧顺序失效
+    touch_version(db, Card, current_user.id)
     db.commit()
     
     return MessageResponse(message="卡片已删除", success=True)
 
 
-@router.put("/sort/batch", response_model=MessageResponse)
+@router.put("/sort/batch", response_model=SortResponse)
 async def sort_cards(
     sort_data: SortRequest,
     current_user: User = Depends(get_current_user),
@@ -184,24 +206,22 @@ async def sort_cards(
 ):
     """
     批量更新卡片排序
-    """
-    for item in sort_data.items:
-        card = db.query(Card).filter(
-            Card.id == item.id,
-            Card.user_id == current_user.id
-        ).first()
-        
-        if card:
-            card.sort_order = item.sort_order
-            # 如果提供了 group_id，则处理分组变更（支持跨组拖动）
-            if item.group_id is not None:
-                # 只有当 ID > 0 时才更新为特定分组，如果为 0 或 -1 可能代表未分组（视前端逻辑而定）
-                # 这里假设前端传来的 group_id 是准确的数据库 ID
-                # 如果要设为未分组，前端应该传 None 吗？Schema 里 group_id 是 int。
-                # 这里的逻辑：如果 item.group_id >= 0 才更新。如果是 None 或没传就不动。
-                # 但 Optional[int] 默认为 None。
-                card.group_id = item.group_id if item.group_id > 0 else None
     
+    单条 UPDATE 写入全部排序项；提供 group_id 时同时移动分组（<= 0 表示移出分组）；
+    提供 version 且卡片已在该版本之后被修改时返回 409
+    """
+    try:
+        version = bulk_sort_cards(db, current_user.id, sort_data.items, sort_data.version)
+    except SortConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except SortError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     db.commit()
     
-    return MessageResponse(message="排序已更新", success=True)
+    return SortResponse(message="排序已更新", success=True, version=version)
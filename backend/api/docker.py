@@ -2,63 +2,154 @@
 Docker 容器管理 API 路由
 提供 Docker 容器的查询和控制功能
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
 from model.user import User
-from schema.schemas import DockerContainer, DockerContainerAction, MessageResponse
+from repository.database import get_db
+from schema.schemas import (
+    BatchActionResponse, ContainerActionResult, ContainerStats, DockerBatchAction, DockerContainer,
+    DockerContainerAction, DockerDiskUsage, DockerHostInfo, DockerStack, DockerStackAction,
+    MessageResponse
+)
 from service.auth_service import get_current_user
-from service.docker_service import docker_service
+from service.broadcast_service import SSE_HEARTBEAT
+from service.docker_client import DockerError, DockerNotFound, DockerUnavailable
+from service.docker_service import (
+    DockerService, docker_hosts, docker_service, group_stacks, iter_log_lines
+)
 
 router = APIRouter(prefix="/api/docker", tags=["Docker 管理"])
 
 
+def get_docker_host(host: Optional[str] = None) -> DockerService:
+    """
+    按 host 查询参数选择 Docker 主机，未指定时使用默认主机
+    """
+    if host is None:
+        return docker_service
+    service = docker_hosts.get(host)
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Docker 主机不存在"
+        )
+    return service
+
+
 @router.get("/status")
 async def get_docker_status(current_user: User = Depends(get_current_user)):
     """
-    获取 Docker 服务状态
+    获取 Docker 服务状态（任一主机可用即视为可用）
     """
+    available = await docker_hosts.any_available()
     return {
-        "available": docker_service.is_available(),
-        "message": "Docker 服务正常" if docker_service.is_available() else "Docker 服务不可用"
+        "available": available,
+        "message": "Docker 服务正常" if available else "Docker 服务不可用"
     }
 
 
+@router.get("/hosts", response_model=List[DockerHostInfo])
+async def get_docker_hosts(current_user: User = Depends(get_current_user)):
+    """
+    获取全部 Docker 主机的连接状态
+    """
+    return docker_hosts.info()
+
+
 @router.get("/containers", response_model=List[DockerContainer])
 async def get_containers(
     all_containers: bool = True,
+    host: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """
-    获取所有 Docker 容器列表
+    获取 Docker 容器列表
     
     Args:
         all_containers: 是否包含已停止的容器
+        host: 只查询指定主机；为空时并发查询全部主机并合并，
+              不可用主机返回上次结果（stale 为 true）
     """
-    if not docker_service.is_available():
+    if host is not None:
+        service = get_docker_host(host)
+        if not await service.is_available():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Docker 服务不可用"
+            )
+        return await service.list_containers(all_containers=all_containers)
+    
+    return await docker_hosts.list_containers(all_containers=all_containers)
+
+
+@router.get("/stats", response_model=List[ContainerStats])
+async def get_container_stats(
+    docker: DockerService = Depends(get_docker_host),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取全部运行中容器的资源占用（CPU / 内存 / 网络 / 块设备 IO）
+    
+    结果缓存 DOCKER_STATS_TTL 秒（默认 2 秒），有效期内的重复请求不会再访问 Docker；
+    缓存过期后只发起一轮 stats 请求，并发的请求共享同一轮的结果
+    """
+    if not await docker.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Docker 服务不可用"
         )
     
-    return docker_service.list_containers(all_containers=all_containers)
+    return await docker.get_stats()
+
+
+@router.get("/disk-usage", response_model=DockerDiskUsage)
+async def get_disk_usage(
+    refresh: bool = False,
+    docker: DockerService = Depends(get_docker_host),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取 Docker 磁盘占用（镜像 / 容器 / 卷 / 构建缓存及可回收空间）
+    
+    结果在后台计算并缓存，过期时先返回旧结果（stale 为 true）；
+    首次请求或 refresh 为 true 时等待扫描完成
+    """
+    if not await docker.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Docker 服务不可用"
+        )
+    
+    try:
+        return await docker.get_disk_usage(refresh=refresh)
+    except DockerError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="获取 Docker 磁盘占用失败"
+        )
 
 
 @router.get("/containers/{container_id}", response_model=DockerContainer)
 async def get_container(
     container_id: str,
+    docker: DockerService = Depends(get_docker_host),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取单个容器详情
     """
-    if not docker_service.is_available():
+    if not await docker.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Docker 服务不可用"
         )
     
-    container = docker_service.get_container(container_id)
+    container = await docker.get_container(container_id)
     if not container:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,16 +159,102 @@ async def get_container(
     return container
 
 
+@router.get("/containers/{container_id}/logs")
+async def stream_container_logs(
+    container_id: str,
+    request: Request,
+    tail: Optional[int] = Query(100, ge=0, le=10000),
+    follow: bool = False,
+    since: Optional[int] = None,
+    timestamps: bool = False,
+    docker: DockerService = Depends(get_docker_host),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    容器日志（Server-Sent Events）
+    
+    每行一条 data: {"stream": "stdout|stderr", "line": "..."}，日志读完（非 follow 或容器退出）
+    时发送 end 事件，客户端收到后应关闭连接。边读边推，不缓存完整日志；
+    客户端消费慢时停止读取 Docker，由连接流控形成背压
+    
+    Args:
+        tail: 只返回最后 N 行
+        follow: 是否持续跟随新日志
+        since: 起始 unix 时间戳
+        timestamps: 每行是否带时间戳前缀
+    """
+    # 鉴权完成后立即归还数据库连接，避免长连接占满连接池
+    db.close()
+    
+    if not await docker.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Docker 服务不可用"
+        )
+    
+    try:
+        logs = await docker.open_logs(
+            container_id, tail=tail, follow=follow, since=since, timestamps=timestamps
+        )
+    except DockerNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="容器不存在"
+        )
+    except DockerError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="获取容器日志失败"
+        )
+    
+    async def event_stream():
+        lines = iter_log_lines(logs).__aiter__()
+        next_line = None
+        try:
+            while True:
+                if next_line is None:
+                    next_line = asyncio.ensure_future(lines.__anext__())
+                # 等待下一行期间定时发送心跳，不取消正在进行的读取
+                done, _ = await asyncio.wait({next_line}, timeout=SSE_HEARTBEAT)
+                if not done:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                try:
+                    stream, line = next_line.result()
+                except StopAsyncIteration:
+                    yield "event: end\ndata: {}\n\n"
+                    break
+                except DockerError as e:
+                    yield f"event: end\ndata: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n"
+                    break
+                next_line = None
+                yield f"data: {json.dumps({'stream': stream, 'line': line}, ensure_ascii=False)}\n\n"
+        finally:
+            if next_line is not None:
+                next_line.cancel()
+            logs.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/containers/{container_id}/action", response_model=MessageResponse)
 async def container_action(
     container_id: str,
     action: DockerContainerAction,
+    docker: DockerService = Depends(get_docker_host),
     current_user: User = Depends(get_current_user)
 ):
     """
     对容器执行操作（启动/停止/重启/暂停/恢复）
     """
-    if not docker_service.is_available():
+    if not await docker.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Docker 服务不可用"
@@ -85,11 +262,11 @@ async def container_action(
     
     # 执行对应操作
     action_map = {
-        "start": docker_service.start_container,
-        "stop": docker_service.stop_container,
-        "restart": docker_service.restart_container,
-        "pause": docker_service.pause_container,
-        "unpause": docker_service.unpause_container
+        "start": docker.start_container,
+        "stop": docker.stop_container,
+        "restart": docker.restart_container,
+        "pause": docker.pause_container,
+        "unpause": docker.unpause_container
     }
     
     action_func = action_map.get(action.action)
@@ -99,7 +276,7 @@ async def container_action(
             detail="不支持的操作"
         )
     
-    success = action_func(container_id)
+    success = await action_func(container_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -118,3 +295,140 @@ async def container_action(
         message=f"容器{action_names.get(action.action, action.action)}成功",
         success=True
     )
+
+
+@router.post("/actions/batch", response_model=BatchActionResponse)
+async def batch_container_action(
+    batch: DockerBatchAction,
+    request: Request,
+    stream: bool = False,
+    docker: DockerService = Depends(get_docker_host),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    对多个容器并发执行同一操作
+    
+    Args:
+        stream: 为 true 时以 NDJSON 逐行返回每个容器的结果（按完成顺序），
+                客户端断开后尚未开始的操作会被取消
+    """
+    if not await docker.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Docker 服务不可用"
+        )
+    
+    results = docker.batch_action(batch.ids, batch.action, batch.concurrency)
+    return await batch_response(request, results, batch.ids, batch.action, stream)
+
+
+@router.get("/stacks", response_model=List[DockerStack])
+async def get_stacks(
+    host: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    按 compose 项目分组的容器栈
+    
+    由容器列表单次遍历得到，不额外访问 Docker
+    
+    Args:
+        host: 只查询指定主机；为空时合并全部主机
+    """
+    if host is not None:
+        service = get_docker_host(host)
+        if not await service.is_available():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Docker 服务不可用"
+            )
+        containers = await service.list_containers()
+    else:
+        containers = await docker_hosts.list_containers()
+    return group_stacks(containers)
+
+
+@router.post("/stacks/action", response_model=BatchActionResponse)
+async def stack_action(
+    batch: DockerStackAction,
+    request: Request,
+    stream: bool = False,
+    host: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    对一个或多个 compose 栈的全部容器并发执行同一操作
+    
+    栈按名称在全部主机中查找（与 /stacks 一致），不同主机上的同名栈一并操作；
+    所有栈的容器合并为一次批量操作，每个主机的并发数限制与 /actions/batch 相同
+    
+    Args:
+        stream: 为 true 时以 NDJSON 逐行返回每个容器的结果
+        host: 只在指定主机中查找；为空时查找全部主机
+    """
+    services = [get_docker_host(host)] if host is not None else docker_hosts.services
+    containers, errors = await docker_hosts.fetch_containers(services)
+    
+    stacks = [stack for stack in group_stacks(containers) if stack.name in batch.stacks]
+    found = {stack.name for stack in stacks}
+    missing = [name for name in batch.stacks if name not in found]
+    if missing and errors:
+        # 栈可能位于请求失败的主机上，如实返回守护进程错误而不是“栈不存在”
+        if all(isinstance(e, DockerUnavailable) for e in errors.values()):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Docker 服务不可用: {', '.join(errors)}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Docker 请求失败: " + "; ".join(f"{name}: {e}" for name, e in errors.items())
+        )
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"栈不存在: {', '.join(missing)}"
+        )
+    
+    targets: Dict[str, List[str]] = {}
+    for stack in stacks:
+        targets.setdefault(stack.host, []).extend(stack.containers)
+    ids = [container_id for stack in stacks for container_id in stack.containers]
+    results = docker_hosts.batch_action(targets, batch.action, batch.concurrency)
+    return await batch_response(request, results, ids, batch.action, stream)
+
+
+async def batch_response(
+    request: Request,
+    results: AsyncIterator[ContainerActionResult],
+    ids: List[str],
+    action: str,
+    stream: bool
+):
+    """
+    返回批量操作结果：stream 时逐行推送 NDJSON，否则按请求顺序汇总
+    """
+    if stream:
+        async def progress():
+            try:
+                async for result in results:
+                    if await request.is_disconnected():
+                        break
+                    yield result.model_dump_json() + "\n"
+            finally:
+                await results.aclose()
+        
+        return StreamingResponse(
+            progress(),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    by_id = {result.id: result async for result in results}
+    ordered = [by_id[container_id] for container_id in dict.fromkeys(ids)]
+    succeeded = sum(1 for r in ordered if r.success)
+    return BatchActionResponse(
+        action=action,
+        succeeded=succeeded,
+        failed=len(ordered) - succeeded,
+        results=ordered
+    )
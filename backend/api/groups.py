@@ -9,11 +9,13 @@ from sqlalchemy.orm import Session
 from repository.database import get_db
 from model.user import User
 from model.group import Group
+from model.card import Card
 from schema.schemas import (
     GroupCreate, GroupUpdate, GroupResponse,
-    SortRequest, MessageResponse
+    SortRequest, SortResponse, MessageResponse
 )
 from service.auth_service import get_current_user
+from service.sort_service import SortConflict, sort_groups as bulk_sort_groups, touch_version
 
 router = APIRouter(prefix="/api/groups", tags=["分组管理"])
 
@@ -139,12 +141,15 @@ async def delete_group(
         )
     
     db.delete(group)
+    # 删除不留下 updated_at，推进排序版本使其他页面的旧顺序失效（分组下的卡片一并删除）
+    touch_version(db, Group, current_user.id)
+    touch_version(db, Card, current_user.id)
     db.commit()
     
     return MessageResponse(message="分组已删除", success=True)
 
 
-@router.put("/sort/batch", response_model=MessageResponse)
+@router.put("/sort/batch", response_model=SortResponse)
 async def sort_groups(
     sort_data: SortRequest,
     current_user: User = Depends(get_current_user),
@@ -152,16 +157,16 @@ async def sort_groups(
 ):
     """
     批量更新分组排序
-    """
-    for item in sort_data.items:
-        group = db.query(Group).filter(
-            Group.id == item.id,
-            Group.user_id == current_user.id
-        ).first()
-        
-        if group:
-            group.sort_order = item.sort_order
     
+    单条 UPDATE 写入全部排序项；提供 version 且分组已在该版本之后被修改时返回 409
+    """
+    try:
+        version = bulk_sort_groups(db, current_user.id, sort_data.items, sort_data.version)
+    except SortConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     db.commit()
     
-    return MessageResponse(message="排序已更新", success=True)
+    return SortResponse(message="排序已更新", success=True, version=version)
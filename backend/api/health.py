@@ -1,57 +1,40 @@
 """
 服务健康检查 API
-检测配置的服务 URL 是否在线
+检测配置的服务 URL 是否在线，管理各地址的探测方式，并提供在线率与延迟历史
 """
-from fastapi import APIRouter
-from pydantic import BaseModel
+from datetime import datetime
 from typing import List, Optional
-import aiohttp
-import asyncio
-import time
-
-router = APIRouter(prefix="/api/health", tags=["健康检查"])
-
-
-class ServiceCheckRequest(BaseModel):
-    """服务检查请求"""
-    urls: List[str]
-    timeout: int = 5
 
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
 
-class ServiceStatus(BaseModel):
-    """单个服务状态"""
-    url: str
-    is_online: bool
-    status_code: Optional[int] = None
-    response_time: Optional[float] = None  # ms
-    error: Optional[str] = None
+from repository.database import get_db
+from model.user import User
+from model.health_probe import HealthProbe
+from schema.schemas import (
+    HealthCheckResponse, ServiceCheckRequest, UptimeSummary,
+    HealthProbeCreate, HealthProbeUpdate, HealthProbeResponse, MessageResponse
+)
+from service.auth_service import get_current_user
+from service.health_service import check_probe_url, health_checker, health_prober, parse_status_ranges
+from service.history_service import parse_duration
+from service.uptime_service import UPTIME_MAX_RANGE, uptime_history
 
-
-class HealthCheckResponse(BaseModel):
-    """健康检查响应"""
-    results: List[ServiceStatus]
-    checked_at: str
+router = APIRouter(prefix="/api/health", tags=["健康检查"])
 
 
-async def check_service(url: str, timeout: int) -> ServiceStatus:
-    """检查单个服务状态"""
-    start = time.time()
+def validate_probe(url: str, mode: str, expect_status: Optional[str], body_match: Optional[str] = None):
+    """校验探测方式与地址、状态码范围、响应内容是否匹配"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout), ssl=False) as response:
-                elapsed = (time.time() - start) * 1000
-                return ServiceStatus(
-                    url=url,
-                    is_online=True,
-                    status_code=response.status,
-                    response_time=round(elapsed, 2)
-                )
-    except asyncio.TimeoutError:
-        return ServiceStatus(url=url, is_online=False, error="Timeout")
-    except aiohttp.ClientError as e:
-        return ServiceStatus(url=url, is_online=False, error=str(e))
-    except Exception as e:
-        return ServiceStatus(url=url, is_online=False, error=str(e))
+        parse_status_ranges(expect_status)
+        if body_match and mode != "get":
+            raise ValueError("仅 GET 探测支持校验响应内容")
+        check_probe_url(url, mode)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.post("/check", response_model=HealthCheckResponse)
@@ -59,14 +42,163 @@ async def check_services(request: ServiceCheckRequest):
     """
     批量检查服务健康状态
     
-    接收 URL 列表，返回各服务的在线状态和响应时间
+    接收 URL 列表，返回各服务的在线状态和响应时间；已配置探测方式的地址按配置探测
     """
-    from datetime import datetime
-    
-    tasks = [check_service(url, request.timeout) for url in request.urls]
-    results = await asyncio.gather(*tasks)
+    results = await health_checker.check_many([
+        (url, health_prober.spec_for(url, request.timeout)) for url in request.urls
+    ])
     
     return HealthCheckResponse(
         results=results,
         checked_at=datetime.utcnow().isoformat()
     )
+
+
+@router.get("/status", response_model=HealthCheckResponse)
+async def get_health_status(urls: Optional[List[str]] = Query(None)):
+    """
+    读取后台探测的缓存结果
+    
+    后台调度器定时探测全部卡片地址，本接口只读内存，不发起出站请求
+    
+    Args:
+        urls: 只返回这些地址；可探测的非卡片地址会加入后台探测（数量有上限），首次查询时可能尚无结果
+    """
+    return HealthCheckResponse(
+        results=health_prober.status(urls),
+        checked_at=datetime.utcnow().isoformat()
+    )
+
+
+@router.get("/uptime", response_model=List[UptimeSummary])
+async def get_uptime(
+    urls: Optional[List[str]] = Query(None),
+    time_range: str = Query("24h", alias="range")
+):
+    """
+    获取在线率与延迟分位数
+    
+    由后台探测累积的分桶草图合并得出，不扫描原始探测记录
+    
+    Args:
+        urls: 只返回这些地址（仅限卡片地址与已配置探测方式的地址，其余忽略）；不传则返回全部卡片地址
+        range: 统计时长，如 "24h"、"7d"、"30d"（最长 30 天）
+    """
+    try:
+        seconds = parse_duration(time_range)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if seconds > UPTIME_MAX_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="统计时长最长 30 天"
+        )
+    
+    if urls is not None:
+        targets = [url for url in dict.fromkeys(urls) if health_prober.is_tracked(url)]
+    else:
+        targets = health_prober.card_urls()
+    return [uptime_history.summary(url, seconds, time_range) for url in targets]
+
+
+@router.get("/probes", response_model=List[HealthProbeResponse])
+async def get_probes(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    获取全部探测配置
+    """
+    return db.query(HealthProbe).order_by(HealthProbe.id).all()
+
+
+@router.post("/probes", response_model=HealthProbeResponse, status_code=status.HTTP_201_CREATED)
+async def create_probe(
+    probe_data: HealthProbeCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    为地址配置探测方式
+    
+    mode 可选 tcp（仅建立连接）、head（HEAD，不支持时回退 GET）、get；
+    expect_status 如 "200-299,401"，body_match 为响应体须包含的文本（仅 get）
+    """
+    validate_probe(probe_data.url, probe_data.mode, probe_data.expect_status, probe_data.body_match)
+    if db.query(HealthProbe).filter(HealthProbe.url == probe_data.url).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="该地址已有探测配置"
+        )
+    
+    probe = HealthProbe(**probe_data.model_dump())
+    db.add(probe)
+    db.commit()
+    db.refresh(probe)
+    
+    health_prober.reload_specs()
+    return probe
+
+
+@router.put("/probes/{probe_id}", response_model=HealthProbeResponse)
+async def update_probe(
+    probe_id: int,
+    probe_data: HealthProbeUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    更新探测配置
+    """
+    probe = db.query(HealthProbe).filter(HealthProbe.id == probe_id).first()
+    
+    if not probe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="探测配置不存在"
+        )
+    
+    update_data = probe_data.model_dump(exclude_unset=True)
+    if update_data.get("mode") is None:
+        update_data.pop("mode", None)
+    validate_probe(
+        probe.url,
+        update_data.get("mode", probe.mode),
+        update_data.get("expect_status", probe.expect_status),
+        update_data.get("body_match", probe.body_match)
+    )
+    for field, value in update_data.items():
+        setattr(probe, field, value)
+    
+    db.commit()
+    db.refresh(probe)
+    
+    health_prober.reload_specs()
+    return probe
+
+
+@router.delete("/probes/{probe_id}", response_model=MessageResponse)
+async def delete_probe(
+    probe_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    删除探测配置，该地址恢复默认的 GET 探测
+    """
+    probe = db.query(HealthProbe).filter(HealthProbe.id == probe_id).first()
+    
+    if not probe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="探测配置不存在"
+        )
+    
+    db.delete(probe)
+    db.commit()
+    
+    health_prober.reload_specs()
+    return MessageResponse(message="探测配置已删除", success=True)
@@ -0,0 +1,120 @@
+"""
+多节点 API 路由
+节点列表查询与 Agent 数据上报
+"""
+import zlib
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from pydantic import ValidationError
+
+from model.user import User
+from schema.schemas import NodeInfo, NodeReport, MessageResponse
+from service.auth_service import get_current_user
+from service.node_service import node_registry, verify_agent_token
+
+router = APIRouter(prefix="/api/nodes", tags=["多节点"])
+
+# 单次上报解压后的最大字节数
+MAX_REPORT_SIZE = 8 * 1024 * 1024
+
+# 单次上报压缩后（即请求体）的最大字节数
+MAX_COMPRESSED_REPORT_SIZE = 2 * 1024 * 1024
+
+
+class ReportTooLarge(ValueError):
+    """上报数据超过大小限制"""
+
+
+async def read_report_body(request: Request, content_encoding: Optional[str]) -> bytes:
+    """
+    读取请求体，超过大小限制立即停止读取
+
+    压缩的请求体限制为 MAX_COMPRESSED_REPORT_SIZE，未压缩的为 MAX_REPORT_SIZE
+
+    Raises:
+        ReportTooLarge: 超过大小限制
+    """
+    compressed = (content_encoding or "").lower() not in ("", "identity")
+    limit = MAX_COMPRESSED_REPORT_SIZE if compressed else MAX_REPORT_SIZE
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise ReportTooLarge("上报数据过大")
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise ReportTooLarge("上报数据过大")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def decode_report_body(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """
+    解压上报内容（支持 gzip / deflate），限制解压后大小
+
+    Raises:
+        ReportTooLarge: 解压后超过大小限制
+        ValueError: 数据损坏或编码不支持
+    """
+    encoding = (content_encoding or "").lower()
+    if encoding in ("", "identity"):
+        data = body
+    elif encoding in ("gzip", "deflate"):
+        wbits = 31 if encoding == "gzip" else 15
+        decompressor = zlib.decompressobj(wbits)
+        try:
+            data = decompressor.decompress(body, MAX_REPORT_SIZE + 1)
+        except zlib.error as e:
+            raise ValueError(f"解压失败: {e}")
+    else:
+        raise ValueError(f"不支持的编码: {encoding}")
+    if len(data) > MAX_REPORT_SIZE:
+        raise ReportTooLarge("上报数据过大")
+    return data
+
+
+@router.get("", response_model=List[NodeInfo])
+async def get_nodes(current_user: User = Depends(get_current_user)):
+    """
+    获取所有节点（本机 + 已上报的 Agent）
+    """
+    return await node_registry.list_nodes()
+
+
+@router.post("/ingest", response_model=MessageResponse)
+async def ingest_report(
+    request: Request,
+    x_agent_token: Optional[str] = Header(None),
+    content_encoding: Optional[str] = Header(None)
+):
+    """
+    接收 Agent 批量上报
+    
+    请求体为 NodeReport JSON，可使用 gzip 压缩；需携带 X-Agent-Token。
+    压缩前后超过大小限制均返回 413
+    """
+    if not verify_agent_token(x_agent_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Agent 密钥无效"
+        )
+    
+    try:
+        body = await read_report_body(request, content_encoding)
+        data = decode_report_body(body, content_encoding)
+        report = NodeReport.model_validate_json(data)
+    except ReportTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"上报数据无效: {e}"
+        )
+    
+    count = node_registry.ingest(report)
+    return MessageResponse(message=f"已接收 {count} 条采样", success=True)
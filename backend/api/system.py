@@ -2,24 +2,45 @@
 系统监控 API 路由
 提供系统状态信息
 """
-from fastapi import APIRouter, Depends
+import time
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
+from repository.database import get_db
 from model.user import User
-from schema.schemas import SystemStatus
+from schema.schemas import SystemStatus, MetricHistory, ProcessInfo
 from service.auth_service import get_current_user
-from service.system_service import get_system_status
+from service.broadcast_service import SSE_HEARTBEAT
+from service.system_service import get_sampler, get_system_status
+from service.history_service import parse_duration
+from service.node_service import get_node_status, get_node_history
 
 router = APIRouter(prefix="/api/system", tags=["系统监控"])
 
 
 @router.get("/status", response_model=SystemStatus)
-async def get_status(current_user: User = Depends(get_current_user)):
+async def get_status(
+    node: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     """
     获取系统状态信息
     
-    返回 CPU、内存、磁盘使用率
+    返回 CPU、内存、磁盘使用率（后台采样器的最新快照）
+    
+    Args:
+        node: 节点名，不传为本机
     """
-    return get_system_status()
+    node_status = await get_node_status(node)
+    if node_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="节点不存在或暂无数据"
+        )
+    return node_status
 
 
 @router.get("/status/public", response_model=SystemStatus)
@@ -29,4 +50,106 @@ async def get_status_public():
     
     用于仪表盘公开展示（可选功能）
     """
-    return get_system_status()
+    return await get_system_status()
+
+
+@router.get("/history", response_model=MetricHistory)
+async def get_history(
+    metric: str = "cpu_percent",
+    time_range: str = Query("1h", alias="range"),
+    step: Optional[str] = None,
+    node: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取指标历史
+    
+    Args:
+        metric: 指标名，如 cpu_percent / memory_percent / disk_percent
+        range: 查询时长，如 "15m"、"24h"、"30d"
+        step: 点间隔，如 "1m"；不传则使用可覆盖该时长的最细粒度
+        node: 节点名，不传为本机
+    """
+    history = get_node_history(node)
+    if history is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="节点不存在"
+        )
+    
+    try:
+        seconds = parse_duration(time_range)
+        step_seconds = parse_duration(step) if step else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    now = time.time()
+    try:
+        actual_step, points = history.query(metric, now - seconds, now, step_seconds)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的指标: {metric}"
+        )
+    
+    return MetricHistory(metric=metric, step=actual_step, points=points)
+
+
+@router.get("/processes", response_model=List[ProcessInfo])
+async def get_processes(
+    top: int = Query(20, ge=1, le=200),
+    sort: str = Query("cpu", pattern="^(cpu|mem)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取资源占用最高的进程
+    
+    进程表由后台采样器增量刷新，本接口只读缓存；长时间无人查询后的首次请求
+    返回上次的结果（stale 为 true，从未查询过时为空），约两个采样周期后恢复为实时结果
+    
+    Args:
+        top: 返回数量
+        sort: 排序方式 cpu / mem
+    """
+    return get_sampler().processes.top(top, sort)
+
+
+@router.get("/stream")
+async def stream_status(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    系统状态实时推送（Server-Sent Events）
+    
+    每次后台采样后推送一条 SystemStatus，空闲时发送心跳注释。
+    消费慢的客户端只会收到最新一条，不会堆积
+    """
+    # 鉴权完成后立即归还数据库连接，避免长连接占满连接池
+    db.close()
+    
+    broadcaster = get_sampler().broadcaster
+
+    async def event_stream():
+        queue = broadcaster.subscribe()
+        try:
+            current = await get_system_status()
+            yield f"retry: 3000\ndata: {current.model_dump_json()}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT)
+                    yield f"data: {data}\n\n"
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,80 @@
+"""
+告警规则判定基准
+随机生成规则（含按挂载点的磁盘规则），模拟 1s 采样周期逐次判定，
+输出每个周期的耗时分布，应远小于采样间隔
+
+用法:
+    cd backend && python -m benchmarks.bench_alerts [--rules 1000] [--ticks 3600]
+"""
+import time
+import random
+import argparse
+import statistics
+from types import SimpleNamespace
+
+from schema.schemas import DiskUsage, SystemStatus
+from service.alert_service import ALERT_METRICS, COMPARATORS, DISK_METRICS, AlertEngine
+
+MOUNTS = ("/", "/mnt/nas", "/mnt/backup", "/srv/media")
+
+
+def make_rules(count: int, rng: random.Random) -> list:
+    rules = []
+    for i in range(count):
+        metric = rng.choice(ALERT_METRICS)
+        rules.append(SimpleNamespace(
+            id=i + 1, user_id=1, name=f"rule-{i}", metric=metric,
+            target=rng.choice(MOUNTS) if metric in DISK_METRICS and rng.random() < 0.5 else None,
+            comparator=rng.choice(list(COMPARATORS)), threshold=rng.uniform(0, 100),
+            for_seconds=rng.choice((0, 5, 60)), sink="log", webhook_url=None, enabled=True
+        ))
+    return rules
+
+
+def make_status(rng: random.Random) -> SystemStatus:
+    disks = []
+    for mount in MOUNTS:
+        percent = rng.uniform(0, 100)
+        disks.append(DiskUsage(
+            mountpoint=mount, device="/dev/sda1", fstype="ext4",
+            total=100, used=int(percent), free=100 - int(percent), percent=percent
+        ))
+    return SystemStatus(
+        cpu_percent=rng.uniform(0, 100), memory_percent=rng.uniform(0, 100),
+        memory_used=rng.randrange(1 << 34), memory_total=1 << 34,
+        disk_percent=disks[0].percent, disk_used=disks[0].used, disk_total=disks[0].total,
+        disks=disks
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="告警规则判定基准")
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = AlertEngine()
+    engine.load(make_rules(args.rules, rng))
+    # 采样数据预先生成，只计入判定本身的耗时
+    samples = [make_status(rng) for _ in range(min(args.ticks, 100))]
+
+    durations, events = [], 0
+    for tick in range(args.ticks):
+        status = samples[tick % len(samples)]
+        started = time.perf_counter()
+        events += len(engine.evaluate(float(tick), status))
+        durations.append(time.perf_counter() - started)
+
+    durations.sort()
+    ms = [d * 1000 for d in durations]
+    print(f"规则 {args.rules} 条，{args.ticks} 个周期，共 {events} 个事件")
+    print(
+        f"每周期耗时 ms: 中位数 {statistics.median(ms):.3f}  "
+        f"p99 {ms[int(len(ms) * 0.99) - 1]:.3f}  最大 {ms[-1]:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Docker 客户端延迟 / 吞吐基准
+默认在进程内启动一个模拟守护进程（固定容器数、每次 API 调用固定延迟），
+也可通过 --docker-host 指向真实的 Docker；
+输出容器列表冷 / 热启动的耗时与 API 调用次数，以及并发列表请求的吞吐
+
+用法:
+    cd backend && python -m benchmarks.bench_docker [--containers 80] [--delay 0.002]
+    cd backend && python -m benchmarks.bench_docker --docker-host unix:///var/run/docker.sock
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Optional
+
+from aiohttp import web
+
+from service.docker_client import AsyncDockerClient
+from service.docker_service import DockerService
+
+FAKE_PORT = 23751
+
+
+def fake_daemon(count: int, delay: float) -> web.Application:
+    """模拟守护进程：/version、/_ping、/containers/json、/containers/{id}/json、/images/json"""
+    images = [{"Id": f"sha256:{i:064x}", "RepoTags": [f"img{i}:latest"] if i % 5 else []} for i in range(count)]
+    containers = [
+        {
+            "Id": f"{i:04x}" * 16,
+            "Names": [f"/c{i}"],
+            "Image": f"img{i}:latest",
+            "ImageID": images[i]["Id"],
+            "State": "running" if i % 3 else "exited",
+            "Status": "Up 2 hours" if i % 3 else "Exited (0) 1 hour ago",
+            "Created": 1700000000 + i,
+            "Ports": [{"IP": "0.0.0.0", "PrivatePort": 80, "PublicPort": 8000 + i, "Type": "tcp"}],
+            "Labels": {"com.docker.compose.project": f"stack{i % 15}"} if i % 4 else {},
+        }
+        for i in range(count)
+    ]
+    by_id = {c["Id"]: c for c in containers}
+
+    async def version(request):
+        return web.json_response({"ApiVersion": "1.43", "Version": "24.0.0"})
+
+    async def ping(request):
+        return web.Response(text="OK")
+
+    async def container_list(request):
+        await asyncio.sleep(delay)
+        running = request.query.get("all") not in ("1", "true", "True")
+        return web.json_response([c for c in containers if not running or c["State"] == "running"])
+
+    async def container_inspect(request):
+        await asyncio.sleep(delay)
+        c = by_id.get(request.match_info["id"])
+        if c is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        return web.json_response({
+            "Id": c["Id"], "Name": c["Names"][0], "Image": c["ImageID"], "Created": "2023-11-14T22:13:20Z",
+            "State": {"Status": c["State"], "Running": c["State"] == "running"},
+            "Config": {"Image": c["Image"], "Labels": c["Labels"]},
+            "NetworkSettings": {"Ports": {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(c["Ports"][0]["PublicPort"])}]}},
+        })
+
+    async def image_list(request):
+        await asyncio.sleep(delay)
+        return web.json_response(images)
+
+    app = web.Application()
+    app.router.add_get("/version", version)
+    app.router.add_get("/v{v}/version", version)
+    app.router.add_get("/_ping", ping)
+    app.router.add_get("/v{v}/_ping", ping)
+    app.router.add_get("/v{v}/containers/json", container_list)
+    app.router.add_get("/v{v}/containers/{id}/json", container_inspect)
+    app.router.add_get("/v{v}/images/json", image_list)
+    return app
+
+
+class CountingClient(AsyncDockerClient):
+    """统计发往守护进程的请求数"""
+
+    calls = 0
+
+    async def _request(self, *args, **kwargs):
+        self.calls += 1
+        return await super()._request(*args, **kwargs)
+
+
+async def timed(api: CountingClient, label: str, coro_factory):
+    api.calls = 0
+    started = time.perf_counter()
+    result = await coro_factory()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{elapsed:8.1f} ms  API 调用 {api.calls}  {label}")
+    return result
+
+
+async def throughput(service: DockerService, concurrency: int, seconds: float):
+    """concurrency 个并发请求方持续获取容器列表"""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await service.fetch_containers()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    print(
+        f"并发 {concurrency:3d}: {len(ms) / seconds:8.1f} 次/秒  "
+        f"中位数 {statistics.median(ms):.1f} ms  p99 {ms[int(len(ms) * 0.99) - 1]:.1f} ms"
+    )
+
+
+async def run(args):
+    runner: Optional[web.AppRunner] = None
+    base_url = args.docker_host
+    if base_url is None:
+        runner = web.AppRunner(fake_daemon(args.containers, args.delay))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", FAKE_PORT).start()
+        base_url = f"tcp://127.0.0.1:{FAKE_PORT}"
+        print(f"模拟守护进程：{args.containers} 个容器，每次调用延迟 {args.delay * 1000:g} ms")
+
+    api = CountingClient(base_url)
+    service = DockerService(api, name="bench")
+    try:
+        await api.ping()
+        containers = await timed(api, "容器列表（冷启动）", service.fetch_containers)
+        await timed(api, "容器列表（镜像映射已缓存）", service.fetch_containers)
+        if containers:
+            await timed(api, "单个容器", lambda: service.get_container(containers[0].id))
+        print(f"共 {len(containers)} 个容器")
+        for concurrency in args.concurrency:
+            await throughput(service, concurrency, args.seconds)
+    finally:
+        await service.close()
+        if runner is not None:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Docker 客户端延迟 / 吞吐基准")
+    parser.add_argument("--docker-host", default=None, help="真实 Docker 地址，不指定时使用模拟守护进程")
+    parser.add_argument("--containers", type=int, default=80)
+    parser.add_argument("--delay", type=float, default=0.002, help="模拟守护进程每次调用的延迟（秒）")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--seconds", type=float, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
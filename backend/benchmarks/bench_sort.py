@@ -0,0 +1,85 @@
+"""
+批量排序接口基准
+在临时 SQLite 库中创建 1000 张卡片与 1000 个分组，经 TestClient 调用
+/api/cards/sort/batch 与 /api/groups/sort/batch，输出 10 / 100 / 1000 项时的
+耗时中位数与 SQL 语句数
+
+用法:
+    cd backend && python -m benchmarks.bench_sort [--repeat 7]
+"""
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+import statistics
+
+# 数据库地址在导入应用前指定，不触碰 data/ 下的正式数据库
+_workdir = tempfile.mkdtemp(prefix="jun-panel-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/bench.db"
+os.environ.setdefault("METRICS_DIR", os.path.join(_workdir, "metrics"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from main import app  # noqa: E402
+from model.card import Card  # noqa: E402
+from model.group import Group  # noqa: E402
+from model.user import User  # noqa: E402
+from repository.database import SessionLocal, engine  # noqa: E402
+from service.auth_service import get_current_user  # noqa: E402
+
+SIZES = (10, 100, 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量排序接口基准")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *_: statements.__setitem__(0, statements[0] + 1))
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        admin = db.query(User).first()
+        target_group = Group(user_id=admin.id, name="target")
+        db.add(target_group)
+        db.add_all([Card(user_id=admin.id, title=f"card-{i}", sort_order=i) for i in range(max(SIZES))])
+        db.add_all([Group(user_id=admin.id, name=f"group-{i}", sort_order=i) for i in range(max(SIZES))])
+        db.commit()
+        target_group_id = target_group.id
+        card_ids = [row.id for row in db.query(Card.id).order_by(Card.id)]
+        group_ids = [row.id for row in db.query(Group.id).filter(Group.id != target_group_id).order_by(Group.id)]
+        db.refresh(admin)
+        db.expunge(admin)
+        db.close()
+        app.dependency_overrides[get_current_user] = lambda: admin
+
+        rng = random.Random(1)
+        print(f"{'项数':>6}  {'接口':6}  {'中位数':>10}  SQL 语句数")
+        for size in SIZES:
+            for name, path, ids in (
+                ("cards", "/api/cards/sort/batch", card_ids),
+                ("groups", "/api/groups/sort/batch", group_ids),
+            ):
+                durations = []
+                for _ in range(args.repeat):
+                    order = rng.sample(ids[:size], size)
+                    items = [
+                        {"id": item_id, "sort_order": index,
+                         **({"group_id": target_group_id} if name == "cards" else {})}
+                        for index, item_id in enumerate(order)
+                    ]
+                    statements[0] = 0
+                    started = time.perf_counter()
+                    response = client.put(path, json={"items": items})
+                    durations.append(time.perf_counter() - started)
+                    assert response.status_code == 200, response.text
+                print(f"{size:>6}  {name:6}  {statistics.median(durations) * 1000:>7.2f} ms  {statements[0]}")
+
+
+if __name__ == "__main__":
+    main()
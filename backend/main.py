@@ -13,7 +13,14 @@ from repository.database import init_db, get_db, SessionLocal
 from model.user import User
 from model.setting import Setting
 from service.auth_service import get_password_hash
-from api import cards, groups, system, docker, settings, upload, health
+from service.system_service import get_sampler
+from service.history_service import metrics_history
+from service.alert_service import alert_engine, close_sinks
+from service.docker_service import docker_hosts
+from service.health_service import health_checker, health_prober
+from service.uptime_service import uptime_history
+from repository.metrics_store import MetricsStore
+from api import cards, groups, system, docker, settings, upload, health, nodes, alerts
 
 # 配置日志
 logging.basicConfig(
@@ -68,12 +75,28 @@ async def lifespan(app: FastAPI):
     logger.info("Jun-Panel 正在启动...")
     init_db()
     create_default_admin()
+    alert_engine.reload()
+    # 恢复持久化的指标历史后再开始采样
+    try:
+        metrics_history.attach_store(MetricsStore(metrics_history.metrics, metrics_history.tiers))
+    except OSError as e:
+        logger.error(f"指标历史存储不可用，仅保留内存历史: {e}")
+    get_sampler().start()
+    docker_hosts.start_watchers()
+    uptime_history.load()
+    health_prober.start()
     logger.info("Jun-Panel 启动完成！")
     
     yield
     
     # 关闭时执行
     logger.info("Jun-Panel 正在关闭...")
+    await get_sampler().stop()
+    await docker_hosts.close()
+    await health_prober.stop()
+    await health_checker.close()
+    await close_sinks()
+    metrics_history.close()
 
 
 # 创建 FastAPI 应用
@@ -102,6 +125,8 @@ app.include_router(docker.router)
 app.include_router(settings.router)
 app.include_router(upload.router)
 app.include_router(health.router)
+app.include_router(nodes.router)
+app.include_router(alerts.router)
 
 # 静态文件服务（上传的文件）
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/uploads")
@@ -6,5 +6,9 @@ from model.user import User
 from model.group import Group
 from model.card import Card
 from model.setting import Setting
+from model.alert_rule import AlertRule
+from model.health_bucket import HealthBucket
+from model.health_probe import HealthProbe
+from model.sort_version import SortVersion
 
-__all__ = ["User", "Group", "Card", "Setting"]
+__all__ = ["User", "Group", "Card", "Setting", "AlertRule", "HealthBucket", "HealthProbe", "SortVersion"]
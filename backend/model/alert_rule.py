@@ -0,0 +1,40 @@
+"""
+告警规则模型定义
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy.orm import relationship
+from repository.database import Base
+
+
+class AlertRule(Base):
+    """
+    告警规则表
+    指标持续满足阈值条件一段时间后触发告警，条件恢复后发送恢复通知；
+    容器事件规则在容器退出 / OOM 时触发，容器再次启动后恢复
+    """
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    name = Column(String(100), nullable=False)
+    
+    # 触发条件：metric comparator threshold 持续 for_seconds 秒
+    metric = Column(String(50), nullable=False)  # SystemStatus 字段名，如 disk_percent；或容器事件 container_die / container_oom
+    target = Column(String(255), nullable=True)  # 磁盘指标的挂载点 / 容器事件的容器名，留空为根分区 / 全部容器
+    comparator = Column(String(2), nullable=False, default=">")  # > / >= / < / <=
+    threshold = Column(Float, nullable=False)
+    for_seconds = Column(Integer, default=0)
+    
+    # 通知方式
+    sink = Column(String(20), default="log")  # log / webhook
+    webhook_url = Column(String(500), nullable=True)
+    
+    enabled = Column(Boolean, default=True)
+    
+    # 时间戳
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # 关联关系
+    user = relationship("User", back_populates="alert_rules")
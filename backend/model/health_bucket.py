@@ -0,0 +1,29 @@
+"""
+健康检查历史模型定义
+"""
+from sqlalchemy import Column, Integer, String, Float, Text, UniqueConstraint
+from repository.database import Base
+
+
+class HealthBucket(Base):
+    """
+    健康检查历史桶表
+    每个地址每小时、每天各一行，记录探测次数、在线次数与延迟分位数草图
+    """
+    __tablename__ = "health_buckets"
+    __table_args__ = (
+        UniqueConstraint("url", "resolution", "start", name="uq_health_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), nullable=False)
+    resolution = Column(Integer, nullable=False)  # 桶时长（秒）：3600 / 86400
+    start = Column(Integer, nullable=False)  # 桶起点（unix 秒）
+
+    # 探测统计
+    total = Column(Integer, default=0)
+    up = Column(Integer, default=0)
+    latency_sum = Column(Float, default=0.0)  # ms，仅统计在线的探测
+
+    # 延迟草图：{"桶下标": 计数} 的 JSON
+    sketch = Column(Text, default="{}")
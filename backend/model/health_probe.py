@@ -0,0 +1,29 @@
+"""
+健康探测配置模型定义
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Float
+from repository.database import Base
+
+
+class HealthProbe(Base):
+    """
+    健康探测配置表
+    按地址指定探测方式，未配置的地址使用默认的 GET 探测
+    """
+    __tablename__ = "health_probes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), unique=True, nullable=False)
+    
+    # 探测方式：tcp（仅建立连接）/ head（HEAD，不支持时回退 GET）/ get
+    mode = Column(String(10), nullable=False, default="get")
+    timeout = Column(Float, nullable=True)  # 秒，为空时使用该方式的默认超时
+    
+    # 判定条件（仅 head / get）
+    expect_status = Column(String(100), nullable=True)  # 如 "200-299,401"，为空时任意响应均视为在线
+    body_match = Column(String(200), nullable=True)  # 响应体须包含的文本（仅 get）
+    
+    # 时间戳
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
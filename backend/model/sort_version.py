@@ -0,0 +1,18 @@
+"""
+排序版本模型定义
+"""
+from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey
+from repository.database import Base
+
+
+class SortVersion(Base):
+    """
+    排序版本表
+    每个用户的卡片、分组各一行，记录不体现在 updated_at 上的修改（如删除）的时间；
+    排序时先写入该行，同一用户的并发排序在此串行
+    """
+    __tablename__ = "sort_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    scope = Column(String(20), primary_key=True)  # 表名：cards / groups
+    version = Column(BigInteger, nullable=False, default=0)  # 毫秒时间戳
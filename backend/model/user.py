@@ -28,3 +28,4 @@ class User(Base):
     groups = relationship("Group", back_populates="user", cascade="all, delete-orphan")
     cards = relationship("Card", back_populates="user", cascade="all, delete-orphan")
     setting = relationship("Setting", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    alert_rules = relationship("AlertRule", back_populates="user", cascade="all, delete-orphan")
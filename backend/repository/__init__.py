@@ -2,5 +2,6 @@
 Repository 包初始化
 """
 from repository.database import get_db, init_db, Base, engine, SessionLocal
+from repository.metrics_store import MetricsStore
 
-__all__ = ["get_db", "init_db", "Base", "engine", "SessionLocal"]
+__all__ = ["get_db", "init_db", "Base", "engine", "SessionLocal", "MetricsStore"]
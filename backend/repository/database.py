@@ -9,9 +9,6 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 # 数据库文件路径（支持环境变量配置）
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/jun-panel.db")
 
-# 确保数据目录存在
-os.makedirs("data", exist_ok=True)
-
 # 创建数据库引擎
 engine = create_engine(
     DATABASE_URL,
@@ -42,6 +39,8 @@ def init_db():
     初始化数据库表结构
     在应用启动时调用
     """
+    # 确保数据目录存在（不在导入时创建，Agent 等不使用数据库的入口不产生副作用）
+    os.makedirs("data", exist_ok=True)
     # NOTE: 需要先导入所有模型才能创建表
-    from model import user, card, group, setting  # noqa: F401
+    from model import user, card, group, setting, alert_rule, health_bucket, health_probe, sort_version  # noqa: F401
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,136 @@
+"""
+指标历史持久化存储
+每个降采样层级对应一个定长的内存映射环形文件，写入即定宽二进制记录，
+与 SQLite 业务库分离，重启后直接按记录读回内存
+"""
+import os
+import mmap
+import struct
+import logging
+from typing import Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 指标文件目录（支持环境变量配置）
+METRICS_DIR = os.getenv("METRICS_DIR", "data/metrics")
+
+MAGIC = b"JPMS"
+VERSION = 1
+HEADER_SIZE = 4096
+
+# 文件头：magic, version, metric_count, resolution, capacity, head, size
+_HEADER = struct.Struct("<4sHHIIII")
+# 头部中 head/size 字段的偏移，追加记录时只更新这两个字段
+_CURSOR = struct.Struct("<II")
+_CURSOR_OFFSET = _HEADER.size - _CURSOR.size
+
+
+class RingFile:
+    """
+    内存映射环形文件
+
+    文件大小在创建时一次性分配：4KB 文件头 + capacity 条定宽记录。
+    记录格式为 <时间戳 double> + 每个指标的 <min, avg, max float>，
+    追加时只写一条记录和文件头的游标，写放大接近于零
+    """
+
+    def __init__(self, path: str, resolution: int, capacity: int, metrics: Sequence[str]):
+        self.path = path
+        self.resolution = resolution
+        self.capacity = capacity
+        self.metrics = tuple(metrics)
+        self._record = struct.Struct("<d" + "fff" * len(self.metrics))
+        self._names = ",".join(self.metrics).encode()
+        if _HEADER.size + len(self._names) > HEADER_SIZE:
+            raise ValueError("指标名过长，无法写入文件头")
+
+        size = HEADER_SIZE + capacity * self._record.size
+        exists = os.path.exists(path) and os.path.getsize(path) == size
+        self._file = open(path, "r+b" if exists else "w+b")
+        if not exists:
+            self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+        self.head = 0
+        self.size = 0
+        if not (exists and self._read_header()):
+            self._write_header()
+
+    def _read_header(self) -> bool:
+        """校验并读取文件头，格式不一致时返回 False（文件将被重置）"""
+        magic, version, count, resolution, capacity, head, size = _HEADER.unpack_from(self._mm, 0)
+        names = bytes(self._mm[_HEADER.size:_HEADER.size + len(self._names)])
+        if (
+            magic != MAGIC or version != VERSION or count != len(self.metrics)
+            or resolution != self.resolution or capacity != self.capacity
+            or names != self._names or head >= capacity or size > capacity
+        ):
+            logger.warning(f"指标文件格式不匹配，将重新创建: {self.path}")
+            return False
+        self.head = head
+        self.size = size
+        return True
+
+    def _write_header(self):
+        self.head = 0
+        self.size = 0
+        self._mm[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        _HEADER.pack_into(
+            self._mm, 0, MAGIC, VERSION, len(self.metrics),
+            self.resolution, self.capacity, 0, 0
+        )
+        self._mm[_HEADER.size:_HEADER.size + len(self._names)] = self._names
+
+    def append(self, ts: float, values: Sequence[float]):
+        """
+        追加一条记录
+
+        Args:
+            ts: 时间戳
+            values: 按指标顺序展开的 min, avg, max
+        """
+        self._record.pack_into(self._mm, HEADER_SIZE + self.head * self._record.size, ts, *values)
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        _CURSOR.pack_into(self._mm, _CURSOR_OFFSET, self.head, self.size)
+
+    def records(self) -> Iterator[Tuple[float, ...]]:
+        """按时间顺序（最旧在前）读取全部记录"""
+        start = (self.head - self.size) % self.capacity
+        for i in range(self.size):
+            offset = HEADER_SIZE + (start + i) % self.capacity * self._record.size
+            yield self._record.unpack_from(self._mm, offset)
+
+    def close(self):
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+
+
+class MetricsStore:
+    """
+    指标历史存储
+    每个层级一个 RingFile，文件名形如 history-60s.bin
+    """
+
+    def __init__(
+        self,
+        metrics: Sequence[str],
+        tiers: Sequence[Tuple[int, int]],
+        directory: str = METRICS_DIR
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.files: List[RingFile] = [
+            RingFile(os.path.join(directory, f"history-{res}s.bin"), res, cap, metrics)
+            for res, cap in tiers
+        ]
+
+    def append(self, tier: int, ts: float, values: Sequence[float]):
+        """向指定层级追加一条记录"""
+        self.files[tier].append(ts, values)
+
+    def close(self):
+        """刷盘并关闭全部文件"""
+        for f in self.files:
+            f.close()
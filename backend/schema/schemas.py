@@ -125,6 +125,7 @@ class CardResponse(CardBase):
     user_id: int
     group_id: Optional[int]
     created_at: datetime
+    preferred_url: Optional[str] = None  # route=auto 时自动选出的地址
 
     class Config:
         from_attributes = True
@@ -184,6 +185,35 @@ class SettingResponse(SettingBase):
 
 # ==================== 系统状态相关 Schema ====================
 
+class NetworkIO(BaseModel):
+    """网卡吞吐速率"""
+    interface: str
+    bytes_sent_per_sec: float
+    bytes_recv_per_sec: float
+    packets_sent_per_sec: float
+    packets_recv_per_sec: float
+
+
+class DiskIO(BaseModel):
+    """磁盘读写速率"""
+    device: str
+    read_bytes_per_sec: float
+    write_bytes_per_sec: float
+    read_iops: float
+    write_iops: float
+
+
+class DiskUsage(BaseModel):
+    """挂载点容量"""
+    mountpoint: str
+    device: str
+    fstype: str
+    total: int  # bytes
+    used: int  # bytes
+    free: int  # bytes
+    percent: float
+
+
 class SystemStatus(BaseModel):
     """系统状态信息"""
     cpu_percent: float
@@ -193,6 +223,37 @@ class SystemStatus(BaseModel):
     disk_percent: float
     disk_used: int  # bytes
     disk_total: int  # bytes
+    cpu_per_core: List[float] = []
+    network: List[NetworkIO] = []  # 按网卡
+    disk_io: List[DiskIO] = []  # 按磁盘
+    disks: List[DiskUsage] = []  # 按挂载点
+
+
+class ProcessInfo(BaseModel):
+    """进程资源占用"""
+    pid: int
+    name: str
+    username: Optional[str] = None
+    status: str
+    cpu_percent: float  # 多核时可能超过 100
+    memory_percent: float
+    memory_rss: int  # bytes
+    stale: bool = False  # 进程表长时间未刷新，数值为上次的结果
+
+
+class MetricPoint(BaseModel):
+    """指标历史数据点（降采样后的 min/avg/max）"""
+    timestamp: float  # unix 秒
+    min: float
+    avg: float
+    max: float
+
+
+class MetricHistory(BaseModel):
+    """指标历史查询结果"""
+    metric: str
+    step: int  # 实际点间隔（秒）
+    points: List[MetricPoint] = []
 
 
 # ==================== Docker 相关 Schema ====================
@@ -206,6 +267,51 @@ class DockerContainer(BaseModel):
     state: str  # running, exited, paused, etc.
     created: str
     ports: dict = {}
+    host: Optional[str] = None  # 所在 Docker 主机
+    stale: bool = False  # 主机暂不可用，数据为上次成功获取的结果
+    project: Optional[str] = None  # compose 项目名（com.docker.compose.project 标签）
+    service: Optional[str] = None  # compose 服务名
+
+
+class DockerDiskUsageEntry(BaseModel):
+    """Docker 磁盘占用条目（镜像 / 容器 / 卷 / 构建缓存）"""
+    id: str
+    name: str
+    size: int  # bytes
+    in_use: bool
+
+
+class DockerDiskUsageCategory(BaseModel):
+    """Docker 磁盘占用分类汇总"""
+    total_count: int
+    active_count: int
+    size: int  # bytes
+    reclaimable: int  # bytes，可通过 prune 释放
+    items: List[DockerDiskUsageEntry] = []  # 按占用从大到小
+
+
+class DockerDiskUsage(BaseModel):
+    """Docker 磁盘占用（docker system df）"""
+    host: str
+    images: DockerDiskUsageCategory
+    containers: DockerDiskUsageCategory
+    volumes: DockerDiskUsageCategory
+    build_cache: DockerDiskUsageCategory
+    total_size: int  # bytes
+    total_reclaimable: int  # bytes
+    updated_at: float  # unix 秒
+    stale: bool = False  # 已过期，后台正在刷新
+
+
+class DockerHostInfo(BaseModel):
+    """Docker 主机状态"""
+    name: str
+    url: str
+    available: bool
+    state: str  # closed / open / half_open
+    error: Optional[str] = None  # 最近一次失败原因
+    container_count: Optional[int] = None
+    last_sync: Optional[float] = None  # 最近一次成功获取容器列表的 unix 秒
 
 
 class DockerContainerAction(BaseModel):
@@ -213,6 +319,212 @@ class DockerContainerAction(BaseModel):
     action: str = Field(..., pattern="^(start|stop|restart|pause|unpause)$")
 
 
+class DockerBatchAction(BaseModel):
+    """Docker 批量容器操作"""
+    ids: List[str] = Field(..., min_length=1, max_length=200)
+    action: str = Field(..., pattern="^(start|stop|restart|pause|unpause)$")
+    concurrency: Optional[int] = Field(None, ge=1)  # 为空时使用服务端默认值
+
+
+class DockerStackAction(BaseModel):
+    """Docker compose 栈批量操作"""
+    stacks: List[str] = Field(..., min_length=1, max_length=100)
+    action: str = Field(..., pattern="^(start|stop|restart|pause|unpause)$")
+    concurrency: Optional[int] = Field(None, ge=1)  # 为空时使用服务端默认值
+
+
+class DockerStack(BaseModel):
+    """Docker compose 栈"""
+    name: str
+    host: Optional[str] = None
+    state: str  # running / degraded / stopped
+    total: int
+    running: int
+    services: List[str] = []
+    ports: List[str] = []  # 已绑定的宿主机端口
+    containers: List[str] = []  # 容器 ID
+    stale: bool = False
+
+
+class ContainerActionResult(BaseModel):
+    """单个容器的操作结果"""
+    id: str
+    success: bool
+    error: Optional[str] = None
+
+
+class BatchActionResponse(BaseModel):
+    """批量操作结果（按请求顺序）"""
+    action: str
+    succeeded: int
+    failed: int
+    results: List[ContainerActionResult]
+
+
+class ContainerStats(BaseModel):
+    """容器资源占用"""
+    id: str
+    name: str
+    cpu_percent: float  # 按主机全部核心计，可超过 100
+    memory_usage: int  # bytes，不含页缓存
+    memory_limit: int
+    memory_percent: float
+    network_rx: int  # 累计 bytes
+    network_tx: int
+    block_read: int  # 累计 bytes
+    block_write: int
+
+
+# ==================== 告警相关 Schema ====================
+
+class AlertRuleBase(BaseModel):
+    """告警规则基础信息"""
+    name: str = Field(..., min_length=1, max_length=100)
+    metric: str
+    target: Optional[str] = Field(None, max_length=255)  # 挂载点 / 容器名
+    comparator: str = Field(">", pattern="^(>|>=|<|<=)$")
+    threshold: float
+    for_seconds: int = Field(0, ge=0)
+    sink: str = "log"
+    webhook_url: Optional[str] = None
+    enabled: bool = True
+
+
+class AlertRuleCreate(AlertRuleBase):
+    """创建告警规则请求"""
+    pass
+
+
+class AlertRuleUpdate(BaseModel):
+    """更新告警规则请求"""
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    metric: Optional[str] = None
+    target: Optional[str] = Field(None, max_length=255)
+    comparator: Optional[str] = Field(None, pattern="^(>|>=|<|<=)$")
+    threshold: Optional[float] = None
+    for_seconds: Optional[int] = Field(None, ge=0)
+    sink: Optional[str] = None
+    webhook_url: Optional[str] = None
+    enabled: Optional[bool] = None
+
+
+class AlertRuleResponse(AlertRuleBase):
+    """告警规则响应数据"""
+    id: int
+    user_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AlertEvent(BaseModel):
+    """告警事件（触发 / 恢复）"""
+    rule_id: int
+    rule_name: str
+    user_id: int
+    metric: str
+    target: Optional[str] = None  # 挂载点 / 容器名
+    comparator: str
+    threshold: float
+    value: float
+    state: str  # firing / resolved
+    timestamp: float  # unix 秒
+
+
+# ==================== 多节点相关 Schema ====================
+
+class NodeSample(BaseModel):
+    """节点上报的单次采样"""
+    timestamp: float  # unix 秒
+    status: SystemStatus
+
+
+class NodeReport(BaseModel):
+    """Agent 批量上报数据"""
+    node: str = Field(..., min_length=1, max_length=64, pattern=r"^[A-Za-z0-9._-]+$")
+    samples: List[NodeSample] = []
+    containers: Optional[List[DockerContainer]] = None  # Docker 不可用时为空
+
+
+class NodeInfo(BaseModel):
+    """节点概览"""
+    name: str
+    is_local: bool = False
+    online: bool
+    last_seen: Optional[float] = None  # unix 秒
+    status: Optional[SystemStatus] = None
+    container_count: Optional[int] = None
+
+
+# ==================== 健康检查相关 Schema ====================
+
+class ServiceCheckRequest(BaseModel):
+    """服务检查请求"""
+    urls: List[str]
+    timeout: int = 5
+
+
+class ServiceStatus(BaseModel):
+    """单个服务状态"""
+    url: str
+    is_online: bool
+    status_code: Optional[int] = None
+    response_time: Optional[float] = None  # ms
+    error: Optional[str] = None
+    checked_at: Optional[float] = None  # unix 秒
+
+
+class HealthCheckResponse(BaseModel):
+    """健康检查响应"""
+    results: List[ServiceStatus]
+    checked_at: str
+
+
+class HealthProbeBase(BaseModel):
+    """健康探测配置基础信息"""
+    url: str = Field(..., min_length=1, max_length=500)
+    mode: str = Field("get", pattern="^(tcp|head|get)$")
+    timeout: Optional[float] = Field(None, gt=0, le=60)  # 秒
+    expect_status: Optional[str] = Field(None, max_length=100)  # 如 "200-299,401"
+    body_match: Optional[str] = Field(None, max_length=200)
+
+
+class HealthProbeCreate(HealthProbeBase):
+    """创建健康探测配置请求"""
+    pass
+
+
+class HealthProbeUpdate(BaseModel):
+    """更新健康探测配置请求"""
+    mode: Optional[str] = Field(None, pattern="^(tcp|head|get)$")
+    timeout: Optional[float] = Field(None, gt=0, le=60)
+    expect_status: Optional[str] = Field(None, max_length=100)
+    body_match: Optional[str] = Field(None, max_length=200)
+
+
+class HealthProbeResponse(HealthProbeBase):
+    """健康探测配置响应数据"""
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class UptimeSummary(BaseModel):
+    """服务在线率与延迟分位数汇总"""
+    url: str
+    range: str  # 如 24h / 7d / 30d
+    total: int  # 探测次数
+    up: int  # 在线次数
+    uptime_percent: Optional[float] = None  # 无探测记录时为空
+    avg: Optional[float] = None  # ms
+    p50: Optional[float] = None  # ms
+    p95: Optional[float] = None  # ms
+    p99: Optional[float] = None  # ms
+
+
 # ==================== 排序相关 Schema ====================
 
 class SortItem(BaseModel):
@@ -225,6 +537,14 @@ class SortItem(BaseModel):
 class SortRequest(BaseModel):
     """批量排序请求"""
     items: List[SortItem]
+    version: Optional[int] = None  # 上次排序返回的版本，已过期时拒绝排序；为空时不校验
+
+
+class SortResponse(BaseModel):
+    """批量排序响应"""
+    message: str
+    success: bool = True
+    version: int  # 毫秒时间戳，下次排序时带上，未被其他页面修改时无需重新拉取
 
 
 # ==================== 通用响应 Schema ====================
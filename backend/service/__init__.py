@@ -10,8 +10,8 @@ from service.auth_service import (
     authenticate_user,
     create_user
 )
-from service.system_service import get_system_status, format_bytes
-from service.docker_service import docker_service
+from service.system_service import get_system_status, format_bytes, get_sampler
+from service.docker_service import docker_service, docker_hosts
 
 __all__ = [
     "verify_password",
@@ -23,5 +23,7 @@ __all__ = [
     "create_user",
     "get_system_status",
     "format_bytes",
-    "docker_service"
+    "get_sampler",
+    "docker_service",
+    "docker_hosts"
 ]
@@ -0,0 +1,389 @@
+"""
+告警服务
+在每个采样周期对全部启用的规则做增量判定，Docker 容器事件到达时判定容器事件规则，
+触发 / 恢复事件交给可插拔的通知渠道
+"""
+import os
+import asyncio
+import logging
+import operator
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from schema.schemas import AlertEvent, SystemStatus
+from service.history_service import HISTORY_METRICS
+
+if TYPE_CHECKING:
+    from model.alert_rule import AlertRule
+
+logger = logging.getLogger(__name__)
+
+# 可用于告警的指标
+ALERT_METRICS = HISTORY_METRICS
+
+# 可按挂载点（规则的 target）读取的磁盘指标 -> DiskUsage 字段
+DISK_METRICS = {
+    "disk_percent": "percent",
+    "disk_used": "used",
+}
+
+# 容器事件规则：Docker 事件 -> 指标名
+# target 为容器名（留空匹配全部容器），比较值为退出码（oom 事件为 1），
+# 事件满足条件时立即触发，容器再次启动或被删除时恢复
+CONTAINER_EVENT_METRICS = {
+    "die": "container_die",
+    "oom": "container_oom",
+}
+
+# 支持 target 的指标
+TARGET_METRICS = set(DISK_METRICS) | set(CONTAINER_EVENT_METRICS.values())
+
+# 告警日志文件
+ALERT_LOG_PATH = os.getenv("ALERT_LOG_PATH", "data/alerts.log")
+
+COMPARATORS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class AlertSink(ABC):
+    """通知渠道基类"""
+
+    @abstractmethod
+    async def send(self, event: AlertEvent, rule: "CompiledRule"):
+        """发送一条告警事件"""
+
+    async def close(self):
+        """释放渠道持有的连接等资源"""
+
+
+class LogSink(AlertSink):
+    """追加写入 JSON Lines 告警日志"""
+
+    def __init__(self, path: str = ALERT_LOG_PATH):
+        self.path = path
+
+    def _write(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def send(self, event: AlertEvent, rule: "CompiledRule"):
+        target = f"[{event.target}]" if event.target else ""
+        logger.warning(
+            f"告警[{event.state}] {event.rule_name}: {event.metric}{target}={event.value} "
+            f"{event.comparator} {event.threshold}"
+        )
+        await asyncio.to_thread(self._write, event.model_dump_json())
+
+
+class WebhookSink(AlertSink):
+    """
+    以 JSON POST 推送到规则配置的 webhook 地址
+
+    共享会话复用 keep-alive 连接与 DNS 缓存，告警集中触发时不会反复建连
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ttl_dns_cache=300, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self):
+        """关闭共享会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def send(self, event: AlertEvent, rule: "CompiledRule"):
+        if not rule.webhook_url:
+            logger.warning(f"告警规则 {rule.id} 未配置 webhook 地址")
+            return
+        try:
+            async with self._get_session().post(
+                rule.webhook_url,
+                data=event.model_dump_json(),
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status >= 400:
+                    logger.warning(f"告警 webhook 返回 HTTP {response.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"告警 webhook 发送失败: {e}")
+
+
+# 通知渠道注册表，可通过 register_sink 扩展
+ALERT_SINKS: Dict[str, AlertSink] = {
+    "log": LogSink(),
+    "webhook": WebhookSink(),
+}
+
+
+def register_sink(name: str, sink: AlertSink):
+    """注册自定义通知渠道"""
+    ALERT_SINKS[name] = sink
+
+
+async def close_sinks():
+    """关闭全部通知渠道（应用关闭时调用）"""
+    for sink in ALERT_SINKS.values():
+        try:
+            await sink.close()
+        except Exception as e:
+            logger.warning(f"关闭告警通知渠道失败: {e}")
+
+
+class CompiledRule:
+    """
+    已编译的规则及其判定状态
+
+    pending_since 记录条件开始满足的时间，持续 for_seconds 后进入 firing；
+    容器事件规则不使用 pending_since，down 记录各容器的触发时间与比较值
+    """
+
+    __slots__ = (
+        "id", "user_id", "name", "metric", "target", "comparator", "compare", "threshold",
+        "for_seconds", "sink", "webhook_url", "pending_since", "firing", "last_value", "down"
+    )
+
+    def __init__(self, rule: "AlertRule"):
+        self.id = rule.id
+        self.user_id = rule.user_id
+        self.name = rule.name
+        self.metric = rule.metric
+        self.target = rule.target or None
+        self.comparator = rule.comparator
+        self.compare = COMPARATORS[rule.comparator]
+        self.threshold = rule.threshold
+        self.for_seconds = rule.for_seconds or 0
+        self.sink = rule.sink
+        self.webhook_url = rule.webhook_url
+        self.pending_since: Optional[float] = None
+        self.firing = False
+        self.last_value: Optional[float] = None
+        # (主机, 容器名) -> (触发时间, 比较值)
+        self.down: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+    @property
+    def key(self) -> Tuple[str, Optional[str]]:
+        return self.metric, self.target
+
+    @property
+    def is_event(self) -> bool:
+        return self.metric in CONTAINER_EVENT_METRICS.values()
+
+    def same_condition(self, other: "CompiledRule") -> bool:
+        """触发条件是否一致（一致时重载规则可保留判定状态）"""
+        return (
+            self.metric == other.metric and self.target == other.target
+            and self.comparator == other.comparator
+            and self.threshold == other.threshold and self.for_seconds == other.for_seconds
+        )
+
+    def event(self, state: str, value: float, ts: float, target: Optional[str] = None) -> AlertEvent:
+        return AlertEvent(
+            rule_id=self.id,
+            rule_name=self.name,
+            user_id=self.user_id,
+            metric=self.metric,
+            target=target or self.target,
+            comparator=self.comparator,
+            threshold=self.threshold,
+            value=value,
+            state=state,
+            timestamp=ts
+        )
+
+    def active_events(self) -> List[AlertEvent]:
+        """当前触发中的事件，容器事件规则每个容器一条"""
+        if self.is_event:
+            return [self.event("firing", value, ts, name) for (_, name), (ts, value) in self.down.items()]
+        if self.firing:
+            return [self.event("firing", self.last_value, self.pending_since)]
+        return []
+
+
+class AlertEngine:
+    """
+    告警引擎
+
+    每个采样周期只读取一次所需指标，再逐条规则做 O(1) 状态转移，
+    总开销 O(规则数)，不回溯历史数据；容器事件规则只在 Docker 事件到达时判定
+    """
+
+    def __init__(self):
+        self._rules: List[CompiledRule] = []
+        self._threshold_rules: List[CompiledRule] = []
+        self._event_rules: List[CompiledRule] = []
+        self._keys: List[Tuple[str, Optional[str]]] = []
+        self._tasks = set()
+
+    @property
+    def rules(self) -> List[CompiledRule]:
+        return self._rules
+
+    @staticmethod
+    def supports(metric: str) -> bool:
+        return metric in ALERT_METRICS or metric in CONTAINER_EVENT_METRICS.values()
+
+    def load(self, rules: List["AlertRule"]):
+        """装载规则，条件未变的规则保留 pending / firing 状态"""
+        previous = {r.id: r for r in self._rules}
+        compiled = []
+        for rule in rules:
+            if not rule.enabled or not self.supports(rule.metric) or rule.comparator not in COMPARATORS:
+                continue
+            if rule.target and rule.metric not in TARGET_METRICS:
+                continue
+            c = CompiledRule(rule)
+            old = previous.get(c.id)
+            if old is not None and old.same_condition(c):
+                c.pending_since, c.firing, c.last_value = old.pending_since, old.firing, old.last_value
+                c.down = old.down
+            compiled.append(c)
+        self._rules = compiled
+        self._threshold_rules = [r for r in compiled if not r.is_event]
+        self._event_rules = [r for r in compiled if r.is_event]
+        self._keys = list({r.key for r in self._threshold_rules})
+
+    def reload(self):
+        """从数据库重新装载全部规则"""
+        # 延迟导入：采样器（及 Agent）依赖本模块，但只有中心面板读取规则
+        from repository.database import SessionLocal
+        from model.alert_rule import AlertRule
+
+        db = SessionLocal()
+        try:
+            self.load(db.query(AlertRule).all())
+        finally:
+            db.close()
+        logger.info(f"已装载 {len(self._rules)} 条告警规则")
+
+    def _read_values(self, status: SystemStatus) -> Dict[Tuple[str, Optional[str]], float]:
+        """读取本周期规则用到的指标，指定的挂载点不存在时缺省"""
+        values = {}
+        disks = None
+        for metric, target in self._keys:
+            if target is None:
+                values[(metric, None)] = float(getattr(status, metric))
+                continue
+            if disks is None:
+                disks = {d.mountpoint: d for d in status.disks}
+            disk = disks.get(target)
+            if disk is not None:
+                values[(metric, target)] = float(getattr(disk, DISK_METRICS[metric]))
+        return values
+
+    def evaluate(self, ts: float, status: SystemStatus) -> List[AlertEvent]:
+        """
+        对一次采样做增量判定
+
+        挂载点暂时缺失（如外接盘被卸载）的规则保持原状态
+
+        Returns:
+            本次状态发生变化的事件
+        """
+        values = self._read_values(status)
+        events = []
+        for rule in self._threshold_rules:
+            value = values.get(rule.key)
+            if value is None:
+                continue
+            rule.last_value = value
+            if rule.compare(value, rule.threshold):
+                if rule.pending_since is None:
+                    rule.pending_since = ts
+                if not rule.firing and ts - rule.pending_since >= rule.for_seconds:
+                    rule.firing = True
+                    events.append(rule.event("firing", value, ts))
+            else:
+                rule.pending_since = None
+                if rule.firing:
+                    rule.firing = False
+                    events.append(rule.event("resolved", value, ts))
+        return events
+
+    def container_event(
+        self,
+        ts: float,
+        host: str,
+        action: str,
+        name: str,
+        exit_code: Optional[int] = None
+    ) -> List[AlertEvent]:
+        """
+        判定一条 Docker 容器事件
+
+        Args:
+            ts: 事件时间
+            host: Docker 主机名
+            action: 事件类型，如 die / oom / start / destroy
+            name: 容器名
+            exit_code: die 事件的退出码
+
+        Returns:
+            本次状态发生变化的事件
+        """
+        events = []
+        key = (host, name)
+        if action in ("start", "destroy"):
+            for rule in self._event_rules:
+                if rule.down.pop(key, None) is not None:
+                    rule.firing = bool(rule.down)
+                    events.append(rule.event("resolved", 0.0, ts, name))
+            return events
+
+        metric = CONTAINER_EVENT_METRICS.get(action)
+        if metric is None:
+            return events
+        value = float(exit_code or 0) if action == "die" else 1.0
+        for rule in self._event_rules:
+            if rule.metric != metric or (rule.target and rule.target != name):
+                continue
+            if not rule.compare(value, rule.threshold) or key in rule.down:
+                continue
+            rule.down[key] = (ts, value)
+            rule.firing = True
+            rule.last_value = value
+            events.append(rule.event("firing", value, ts, name))
+        return events
+
+    def dispatch(self, events: List[AlertEvent]):
+        """异步发送事件（需在事件循环中调用），不阻塞采样循环"""
+        rules = {r.id: r for r in self._rules}
+        for event in events:
+            rule = rules.get(event.rule_id)
+            sink = ALERT_SINKS.get(rule.sink) if rule else None
+            if sink is None:
+                continue
+            task = asyncio.create_task(self._send(sink, event, rule))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _send(sink: AlertSink, event: AlertEvent, rule: CompiledRule):
+        try:
+            await sink.send(event, rule)
+        except Exception as e:
+            logger.error(f"告警通知发送失败: {e}")
+
+    def active(self, user_id: Optional[int] = None) -> List[CompiledRule]:
+        """当前处于触发状态的规则"""
+        return [r for r in self._rules if r.firing and (user_id is None or r.user_id == user_id)]
+
+    def active_events(self, user_id: Optional[int] = None) -> List[AlertEvent]:
+        """当前触发中的告警事件"""
+        return [event for rule in self.active(user_id) for event in rule.active_events()]
+
+
+# 全局单例
+alert_engine = AlertEngine()
@@ -0,0 +1,45 @@
+"""
+广播服务
+单一生产者向多个订阅者推送消息，供 SSE 等长连接使用
+"""
+import os
+import asyncio
+from typing import Any, Set
+
+# SSE 心跳间隔（秒），防止反向代理因空闲断开连接
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+
+
+class Broadcaster:
+    """
+    单生产者多订阅者广播器
+
+    每个订阅者只有容量为 1 的队列：消费慢时旧消息被新消息覆盖（只保留最新值），
+    因此无论订阅者多慢，内存占用都不会无限增长。
+    所有方法都应在事件循环线程中调用
+    """
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        """当前订阅者数量"""
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """注册订阅者，返回其消息队列"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """注销订阅者"""
+        self._subscribers.discard(queue)
+
+    def publish(self, message: Any):
+        """向所有订阅者推送消息，未消费的旧消息直接丢弃"""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
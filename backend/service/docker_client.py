@@ -0,0 +1,500 @@
+"""
+异步 Docker Engine API 客户端
+基于 aiohttp，通过 unix socket（或 TCP）复用长连接访问 Docker 守护进程
+"""
+import os
+import ssl
+import json
+import time
+import struct
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+
+# 客户端支持的最高 API 版本，与守护进程协商后取较小值
+MAX_API_VERSION = "1.43"
+
+# 连接池大小（同时进行的请求数上限）
+DOCKER_POOL_SIZE = int(os.getenv("DOCKER_POOL_SIZE", "20"))
+
+# 普通请求超时（秒）
+DOCKER_TIMEOUT = float(os.getenv("DOCKER_TIMEOUT", "30"))
+
+# /system/df 超时（秒），大量镜像 / 卷时守护进程需要逐个计算大小
+DOCKER_DF_TIMEOUT = float(os.getenv("DOCKER_DF_TIMEOUT", "300"))
+
+# 建立连接超时（秒），远程主机不可达时尽快失败
+DOCKER_CONNECT_TIMEOUT = float(os.getenv("DOCKER_CONNECT_TIMEOUT", "3"))
+
+# TLS 证书目录（ca.pem / cert.pem / key.pem），与 docker CLI 的 DOCKER_CERT_PATH 一致
+DOCKER_CERT_PATH = os.getenv("DOCKER_CERT_PATH") or os.path.expanduser("~/.docker")
+
+# 事件流无数据的最长时间（秒），超时后重新订阅并全量同步；
+# 守护进程没有心跳，半开连接（如 NAT 丢弃、远程主机掉电）只能靠读超时发现
+DOCKER_EVENTS_IDLE_TIMEOUT = float(os.getenv("DOCKER_EVENTS_IDLE_TIMEOUT", "300"))
+
+# 守护进程断开后的首次重试间隔与最大重试间隔（秒），每次探测失败翻倍
+DOCKER_BACKOFF_BASE = float(os.getenv("DOCKER_BACKOFF_BASE", "1"))
+DOCKER_BACKOFF_MAX = float(os.getenv("DOCKER_BACKOFF_MAX", "60"))
+
+# 日志流单次读取的最大字节数，大帧按此拆分，保证每个读者的内存占用恒定
+LOG_CHUNK_SIZE = 64 * 1024
+
+# 多路复用日志帧头：stream(1) + 保留(3) + 长度(4, 大端)
+_FRAME_HEADER = struct.Struct(">BxxxL")
+_LOG_STREAMS = {0: "stdin", 1: "stdout", 2: "stderr"}
+
+
+class DockerError(Exception):
+    """Docker 守护进程不可达或返回错误"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class DockerNotFound(DockerError):
+    """资源不存在（HTTP 404）"""
+
+
+class DockerUnavailable(DockerError):
+    """熔断中，请求未发出直接失败"""
+
+
+class DockerStreamIdle(DockerError):
+    """流式响应超过读超时没有收到数据"""
+
+
+class CircuitBreaker:
+    """
+    守护进程连接熔断器
+
+    closed：连接正常，请求直接放行；
+    open：连接失败，退避期内请求立即失败，不再尝试连接；
+    half_open：退避期满，只放行一个探测请求，成功则恢复 closed，失败则退避时间翻倍后回到 open
+
+    初始为 open 且立即可探测，首个请求即作为探测
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, base_delay: float = DOCKER_BACKOFF_BASE, max_delay: float = DOCKER_BACKOFF_MAX):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = self.OPEN
+        self.failures = 0
+        self.retry_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.state == self.CLOSED
+
+    def allow(self) -> bool:
+        """是否放行请求；退避期满时转为 half_open 并放行本次请求作为探测"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() >= self.retry_at:
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("Docker 守护进程已连接")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def release(self):
+        """探测请求被取消（未得出结果），允许下一个请求重新探测"""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+    def record_failure(self):
+        # 已处于 open 时的失败来自断开前发出的请求，不重复累计
+        if self.state == self.OPEN:
+            return
+        self.failures += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        self.retry_at = time.monotonic() + delay
+        if self.state == self.CLOSED:
+            logger.warning(f"Docker 守护进程连接失败，{delay:g} 秒后重试")
+        self.state = self.OPEN
+
+
+def tls_context(cert_path: str = DOCKER_CERT_PATH) -> ssl.SSLContext:
+    """
+    按证书目录创建 TLS 上下文
+
+    目录中有 ca.pem 时用其校验守护进程证书，有 cert.pem / key.pem 时作为客户端证书
+    """
+    ca = os.path.join(cert_path, "ca.pem")
+    context = ssl.create_default_context(cafile=ca if os.path.exists(ca) else None)
+    cert, key = os.path.join(cert_path, "cert.pem"), os.path.join(cert_path, "key.pem")
+    if os.path.exists(cert) and os.path.exists(key):
+        context.load_cert_chain(cert, key)
+    return context
+
+
+def _version_tuple(version: str):
+    return tuple(int(part) for part in version.split("."))
+
+
+class AsyncDockerClient:
+    """
+    异步 Docker 客户端
+
+    整个应用共享一个 ClientSession 与连接器，keep-alive 连接在请求间复用；
+    首次请求时与守护进程协商 API 版本
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_DOCKER_HOST,
+        pool_size: int = DOCKER_POOL_SIZE,
+        tls: Optional[ssl.SSLContext] = None
+    ):
+        """
+        Args:
+            base_url: unix:///path、tcp://host:port 或 https://host:port
+            tls: TLS 上下文，https:// 地址未指定时按 DOCKER_CERT_PATH 创建
+        """
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.tls = tls
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._api_version: Optional[str] = None
+        self.breaker = CircuitBreaker()
+
+        if base_url.startswith("unix://"):
+            self._socket_path: Optional[str] = base_url[len("unix://"):]
+            self._http_base = "http://docker"
+        elif base_url.startswith(("tcp://", "http://", "https://")):
+            self._socket_path = None
+            if base_url.startswith("https://") and self.tls is None:
+                self.tls = tls_context()
+            scheme = "https://" if self.tls is not None else "http://"
+            self._http_base = scheme + base_url.split("://", 1)[1].rstrip("/")
+        else:
+            raise ValueError(f"不支持的 Docker 地址: {base_url}")
+
+    @classmethod
+    def from_env(cls) -> "AsyncDockerClient":
+        """按 DOCKER_HOST / DOCKER_TLS_VERIFY 环境变量创建客户端"""
+        base_url = os.getenv("DOCKER_HOST") or DEFAULT_DOCKER_HOST
+        tls = tls_context() if os.getenv("DOCKER_TLS_VERIFY") and not base_url.startswith("unix://") else None
+        return cls(base_url, tls=tls)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            if self._socket_path is not None:
+                connector = aiohttp.UnixConnector(
+                    path=self._socket_path, limit=self.pool_size, keepalive_timeout=30
+                )
+            else:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_size, keepalive_timeout=30,
+                    ssl=self.tls if self.tls is not None else True
+                )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _prefix(self) -> str:
+        """带 API 版本的路径前缀"""
+        if self._api_version is None:
+            data = await self._request("GET", "/version")
+            server = data.get("ApiVersion", MAX_API_VERSION)
+            self._api_version = min(server, MAX_API_VERSION, key=_version_tuple)
+        return f"/v{self._api_version}"
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """发送请求并解析 JSON 响应（无内容时返回 None）"""
+        self._check_breaker()
+        try:
+            async with self._get_session().request(
+                method,
+                self._http_base + path,
+                params=params,
+                timeout=aiohttp.ClientTimeout(
+                    total=timeout or DOCKER_TIMEOUT, sock_connect=DOCKER_CONNECT_TIMEOUT
+                )
+            ) as response:
+                self.breaker.record_success()
+                body = await response.read()
+                if response.status >= 400:
+                    raise self._error(response.status, body)
+                if not body:
+                    return None
+                if response.content_type == "application/json":
+                    return json.loads(body)
+                return body.decode(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            raise self._connection_error(e) from e
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            raise DockerUnavailable("Docker 守护进程不可用")
+
+    def _connection_error(self, e: Exception) -> DockerError:
+        """
+        转换连接异常；连接失败时记入熔断器
+
+        建立连接超时计入；请求超时不计入：守护进程可能只是处理慢（如 stop 等待容器退出）
+        """
+        if isinstance(e, aiohttp.ConnectionTimeoutError):
+            self.breaker.record_failure()
+        elif isinstance(e, (aiohttp.ClientConnectionError, OSError)) and not isinstance(e, asyncio.TimeoutError):
+            self.breaker.record_failure()
+        elif self.breaker.state == CircuitBreaker.HALF_OPEN:
+            self.breaker.record_failure()
+        return DockerError(f"无法连接 Docker 守护进程: {e!r}")
+
+    @staticmethod
+    def _error(status: int, body: bytes) -> DockerError:
+        try:
+            message = json.loads(body).get("message", "")
+        except (ValueError, AttributeError):
+            message = body.decode(errors="replace")
+        cls = DockerNotFound if status == 404 else DockerError
+        return cls(f"HTTP {status}: {message}", status)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """发送带版本前缀的 API 请求"""
+        return await self._request(method, await self._prefix() + path, params, timeout)
+
+    @staticmethod
+    def _filters(filters: Optional[Dict[str, Any]]) -> Optional[str]:
+        return json.dumps(filters) if filters else None
+
+    # ==================== 常用接口 ====================
+
+    async def ping(self) -> bool:
+        """检查守护进程是否可达"""
+        await self._request("GET", "/_ping", timeout=5)
+        return True
+
+    async def containers(self, all: bool = True, filters: Optional[Dict[str, Any]] = None) -> list:
+        """GET /containers/json"""
+        params = {"all": "1" if all else "0"}
+        if filters:
+            params["filters"] = self._filters(filters)
+        return await self.request("GET", "/containers/json", params)
+
+    async def images(self) -> list:
+        """GET /images/json"""
+        return await self.request("GET", "/images/json")
+
+    async def inspect_container(self, container_id: str) -> dict:
+        """GET /containers/{id}/json"""
+        return await self.request("GET", f"/containers/{container_id}/json")
+
+    async def container_action(self, container_id: str, action: str, timeout: Optional[int] = None):
+        """
+        POST /containers/{id}/{action}
+
+        Args:
+            action: start / stop / restart / pause / unpause
+            timeout: stop / restart 等待容器退出的秒数
+        """
+        params = {"t": str(timeout)} if timeout is not None else None
+        # 请求超时需覆盖守护进程等待容器退出的时间
+        await self.request(
+            "POST", f"/containers/{container_id}/{action}", params,
+            timeout=DOCKER_TIMEOUT + (timeout or 0)
+        )
+
+    async def container_stats(self, container_id: str) -> dict:
+        """
+        GET /containers/{id}/stats 单次快照
+
+        one-shot 模式下守护进程不再等待约 1 秒采集 precpu_stats，CPU 占用需由调用方按两次快照计算
+        """
+        return await self.request(
+            "GET", f"/containers/{container_id}/stats", {"stream": "false", "one-shot": "true"}
+        )
+
+    async def system_df(self) -> dict:
+        """GET /system/df 磁盘占用（耗时可能较长）"""
+        return await self.request("GET", "/system/df", timeout=DOCKER_DF_TIMEOUT)
+
+    async def _open_stream(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        read_timeout: Optional[float] = None
+    ) -> aiohttp.ClientResponse:
+        """
+        打开长连接流式响应（不设总超时），收到响应头后返回
+
+        Args:
+            read_timeout: 两次收到数据之间的最长间隔，为空时不限
+
+        调用方负责在读取结束后关闭响应
+        """
+        prefix = await self._prefix()
+        self._check_breaker()
+        try:
+            response = await self._get_session().get(
+                self._http_base + prefix + path,
+                params=params,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=DOCKER_CONNECT_TIMEOUT, sock_read=read_timeout
+                )
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            raise self._connection_error(e) from e
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        if response.status >= 400:
+            body = await response.read()
+            response.release()
+            raise self._error(response.status, body)
+        return response
+
+    async def events(self, filters: Optional[Dict[str, Any]] = None) -> "EventStream":
+        """
+        订阅 /events 事件流
+
+        返回时订阅已建立（响应头已收到），之后发生的事件都会出现在流中；
+        超过 DOCKER_EVENTS_IDLE_TIMEOUT 没有事件时流抛出 DockerStreamIdle
+        """
+        params = {"filters": self._filters(filters)} if filters else None
+        return EventStream(await self._open_stream("/events", params, DOCKER_EVENTS_IDLE_TIMEOUT))
+
+    async def container_logs(
+        self,
+        container_id: str,
+        tail: Optional[int] = None,
+        follow: bool = False,
+        since: Optional[int] = None,
+        timestamps: bool = False
+    ) -> "LogStream":
+        """
+        GET /containers/{id}/logs
+
+        Args:
+            tail: 只返回最后 N 行，为空时返回全部
+            follow: 是否持续跟随新日志
+            since: 起始 unix 时间戳
+            timestamps: 每行是否带时间戳前缀
+        """
+        params = {
+            "stdout": "1",
+            "stderr": "1",
+            "follow": "1" if follow else "0",
+            "tail": str(tail) if tail is not None else "all",
+            "timestamps": "1" if timestamps else "0",
+        }
+        if since is not None:
+            params["since"] = str(since)
+        response = await self._open_stream(f"/containers/{container_id}/logs", params)
+
+        # API 1.42+ 通过 Content-Type 区分多路复用流与 TTY 原始流，旧版本需查看容器配置
+        if response.content_type == "application/vnd.docker.multiplexed-stream":
+            multiplexed = True
+        elif response.content_type == "application/vnd.docker.raw-stream":
+            multiplexed = False
+        else:
+            try:
+                attrs = await self.inspect_container(container_id)
+            except DockerError:
+                response.close()
+                raise
+            multiplexed = not (attrs.get("Config") or {}).get("Tty", False)
+        return LogStream(response, multiplexed)
+
+
+class EventStream:
+    """Docker 事件流，逐行解析 JSON；连接断开时抛出 DockerError，读超时抛出 DockerStreamIdle"""
+
+    def __init__(self, response: aiohttp.ClientResponse):
+        self._response = response
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        try:
+            async for line in self._response.content:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        except asyncio.TimeoutError as e:
+            raise DockerStreamIdle("事件流空闲超时") from e
+        except (aiohttp.ClientError, OSError) as e:
+            raise DockerError(f"事件流中断: {e!r}") from e
+        raise DockerError("事件流已关闭")
+
+    def close(self):
+        self._response.close()
+
+
+class LogStream:
+    """
+    容器日志流
+
+    增量解析多路复用帧，逐块产出 (stream, bytes)；每次最多读取 LOG_CHUNK_SIZE 字节，
+    消费方不读取时底层连接停止接收，由 TCP 流控把背压传回守护进程
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, multiplexed: bool):
+        self._response = response
+        self._multiplexed = multiplexed
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[str, bytes]]:
+        content = self._response.content
+        try:
+            if not self._multiplexed:
+                # TTY 容器的日志是未分流的原始字节流
+                async for chunk in content.iter_chunked(LOG_CHUNK_SIZE):
+                    yield "stdout", chunk
+                return
+
+            while True:
+                try:
+                    header = await content.readexactly(_FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    return
+                stream, remaining = _FRAME_HEADER.unpack(header)
+                name = _LOG_STREAMS.get(stream, "stdout")
+                while remaining:
+                    try:
+                        chunk = await content.readexactly(min(remaining, LOG_CHUNK_SIZE))
+                    except asyncio.IncompleteReadError as e:
+                        if e.partial:
+                            yield name, e.partial
+                        return
+                    remaining -= len(chunk)
+                    yield name, chunk
+        except (aiohttp.ClientError, OSError) as e:
+            raise DockerError(f"日志流中断: {e!r}") from e
+
+    def close(self):
+        self._response.close()
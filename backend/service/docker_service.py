@@ -2,47 +2,556 @@
 Docker 容器管理服务
 与 Docker API 交互，实现容器的查询和控制
 """
+import os
+import re
+import time
+import codecs
+import asyncio
 import logging
-from typing import List, Optional
-import docker
-from docker.errors import DockerException, NotFound, APIError
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
-from schema.schemas import DockerContainer
+from schema.schemas import (
+    ContainerActionResult, ContainerStats, DockerContainer, DockerDiskUsage, DockerDiskUsageCategory,
+    DockerDiskUsageEntry, DockerHostInfo, DockerStack
+)
+from service.alert_service import alert_engine
+from service.docker_client import (
+    DOCKER_CERT_PATH, AsyncDockerClient, DockerError, DockerNotFound, DockerStreamIdle, DockerUnavailable,
+    LogStream, tls_context
+)
 
 logger = logging.getLogger(__name__)
 
+# 多主机配置，逗号分隔的 名称=地址，如 "nas=unix:///var/run/docker.sock,box1=https://10.0.0.2:2376"；
+# https 主机的证书优先读取 DOCKER_CERT_PATH/<名称>/，未配置时只使用 DOCKER_HOST
+DOCKER_HOSTS = os.getenv("DOCKER_HOSTS", "")
+
+# 未配置 DOCKER_HOSTS 时默认主机的名称
+DOCKER_HOST_NAME = os.getenv("DOCKER_HOST_NAME", "local")
+
+# 聚合查询时单个主机的最长等待时间（秒），超时或失败的主机返回上次结果
+DOCKER_FANOUT_TIMEOUT = float(os.getenv("DOCKER_FANOUT_TIMEOUT", "5"))
+
+# 镜像标签缓存有效期（秒），镜像重新打标签后最迟在该时长后生效
+IMAGE_TAGS_TTL = 60
+
+# 事件流断开后的重连间隔（秒）
+EVENTS_RETRY_INTERVAL = 5
+
+# 完整容器 ID（事件中的 ID 均为完整 ID）
+FULL_CONTAINER_ID = re.compile(r"[0-9a-f]{64}")
+
+# 需要刷新容器表的事件
+CONTAINER_EVENTS = {
+    "create", "start", "restart", "die", "stop", "kill", "pause", "unpause",
+    "rename", "update", "oom",
+}
+
+# compose 项目 / 服务标签
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+
+# all=False 时视为运行中的状态（与 docker ps 一致）
+RUNNING_STATES = {"running", "paused", "restarting"}
+
+# 支持的容器操作及 stop / restart 等待容器退出的秒数
+CONTAINER_ACTIONS: Dict[str, Optional[int]] = {
+    "start": None,
+    "stop": 10,
+    "restart": 10,
+    "pause": None,
+    "unpause": None,
+}
+
+# 批量操作时同时进行的容器操作数上限
+DOCKER_ACTION_CONCURRENCY = int(os.getenv("DOCKER_ACTION_CONCURRENCY", "6"))
+
+# 磁盘占用缓存有效期（秒），过期后先返回旧结果并在后台刷新
+DOCKER_DF_TTL = float(os.getenv("DOCKER_DF_TTL", "600"))
+
+# 单行日志的最大长度（字符），超长的行按此拆分，避免无换行输出占满内存
+MAX_LOG_LINE = 16 * 1024
+
+# 同时进行的容器 stats 请求数上限
+DOCKER_STATS_CONCURRENCY = int(os.getenv("DOCKER_STATS_CONCURRENCY", "16"))
+
+# 容器资源占用缓存有效期（秒）；一轮 stats 请求可能耗时 1s 以上，不跟随 1s 的系统采样周期
+STATS_TTL = float(os.getenv("DOCKER_STATS_TTL", "2"))
+
+
+def short_image_id(image_id: str) -> str:
+    """短镜像 ID（与 docker images 显示一致）"""
+    if image_id.startswith("sha256:"):
+        return image_id[:17]
+    return image_id[:10]
+
+
+def image_name(image_id: str, tags: Dict[str, List[str]]) -> str:
+    """镜像显示名：优先第一个标签，无标签时使用短 ID"""
+    image_tags = tags.get(image_id)
+    return image_tags[0] if image_tags else short_image_id(image_id)
+
+
+def container_from_summary(
+    summary: dict,
+    tags: Dict[str, List[str]],
+    host: Optional[str] = None
+) -> DockerContainer:
+    """
+    由 /containers/json 摘要构建 DockerContainer
+
+    Args:
+        summary: 容器摘要
+        tags: 镜像 ID -> 标签映射
+        host: 所在主机名
+    """
+    # 解析端口映射（仅保留已绑定宿主机端口的条目）
+    ports: Dict[str, List[str]] = {}
+    for p in summary.get("Ports") or []:
+        if p.get("PublicPort"):
+            host_ports = ports.setdefault(f"{p['PrivatePort']}/{p.get('Type', 'tcp')}", [])
+            host_port = str(p["PublicPort"])
+            if host_port not in host_ports:
+                host_ports.append(host_port)
+
+    names = summary.get("Names") or []
+    created = summary.get("Created")
+    state = summary.get("State") or "unknown"
+    labels = summary.get("Labels") or {}
+    return DockerContainer(
+        id=summary["Id"][:12],
+        name=names[0].lstrip("/") if names else summary["Id"][:12],
+        image=image_name(summary.get("ImageID", ""), tags),
+        status=state,
+        state=state,
+        created=(
+            datetime.fromtimestamp(created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            if isinstance(created, (int, float)) else str(created or "")
+        ),
+        ports=ports,
+        host=host,
+        project=labels.get(COMPOSE_PROJECT_LABEL),
+        service=labels.get(COMPOSE_SERVICE_LABEL)
+    )
+
+
+def container_from_inspect(
+    attrs: dict,
+    tags: Dict[str, List[str]],
+    host: Optional[str] = None
+) -> DockerContainer:
+    """
+    由 /containers/{id}/json 详情构建 DockerContainer
+
+    Args:
+        attrs: 容器详情
+        tags: 镜像 ID -> 标签映射
+        host: 所在主机名
+    """
+    ports: Dict[str, List[str]] = {}
+    for port, bindings in ((attrs.get("NetworkSettings") or {}).get("Ports") or {}).items():
+        if bindings:
+            host_ports = []
+            for b in bindings:
+                if b.get("HostPort") and b["HostPort"] not in host_ports:
+                    host_ports.append(b["HostPort"])
+            ports[port] = host_ports
+
+    state = (attrs.get("State") or {}).get("Status", "unknown")
+    labels = (attrs.get("Config") or {}).get("Labels") or {}
+    return DockerContainer(
+        id=attrs["Id"][:12],
+        name=attrs.get("Name", "").lstrip("/"),
+        image=image_name(attrs.get("Image", ""), tags),
+        status=state,
+        state=state,
+        created=attrs.get("Created", ""),
+        ports=ports,
+        host=host,
+        project=labels.get(COMPOSE_PROJECT_LABEL),
+        service=labels.get(COMPOSE_SERVICE_LABEL)
+    )
+
+
+def _cpu_sample(cpu_stats: dict) -> Optional[Tuple[int, int]]:
+    """提取 (容器累计 CPU 时间, 主机累计 CPU 时间)，数据不完整时返回 None"""
+    total = (cpu_stats.get("cpu_usage") or {}).get("total_usage")
+    system = cpu_stats.get("system_cpu_usage")
+    if not total or not system:
+        return None
+    return total, system
+
+
+def container_stats_from_raw(
+    container: DockerContainer,
+    raw: dict,
+    previous: Optional[Tuple[int, int]]
+) -> ContainerStats:
+    """
+    由 /containers/{id}/stats 快照构建 ContainerStats（计算方式与 docker stats 一致）
+
+    Args:
+        container: 容器信息
+        raw: stats 快照
+        previous: 上一次的 CPU 计数，为空时退回快照自带的 precpu_stats
+    """
+    cpu_stats = raw.get("cpu_stats") or {}
+    current = _cpu_sample(cpu_stats)
+    previous = previous or _cpu_sample(raw.get("precpu_stats") or {})
+    cpu_percent = 0.0
+    if current and previous:
+        cpu_delta = current[0] - previous[0]
+        system_delta = current[1] - previous[1]
+        online_cpus = (
+            cpu_stats.get("online_cpus")
+            or len((cpu_stats.get("cpu_usage") or {}).get("percpu_usage") or [])
+            or 1
+        )
+        if cpu_delta > 0 and system_delta > 0:
+            cpu_percent = cpu_delta / system_delta * online_cpus * 100
+
+    # 内存占用扣除页缓存（cgroup v2 为 inactive_file，v1 为 total_inactive_file）
+    memory = raw.get("memory_stats") or {}
+    memory_detail = memory.get("stats") or {}
+    cache = memory_detail.get("inactive_file", memory_detail.get("total_inactive_file", 0))
+    memory_usage = max(0, memory.get("usage", 0) - cache)
+    memory_limit = memory.get("limit", 0)
+
+    networks = (raw.get("networks") or {}).values()
+
+    block_read = block_write = 0
+    for entry in (raw.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            block_read += entry.get("value", 0)
+        elif op == "write":
+            block_write += entry.get("value", 0)
+
+    return ContainerStats(
+        id=container.id,
+        name=container.name,
+        cpu_percent=round(cpu_percent, 2),
+        memory_usage=memory_usage,
+        memory_limit=memory_limit,
+        memory_percent=round(memory_usage / memory_limit * 100, 2) if memory_limit else 0.0,
+        network_rx=sum(n.get("rx_bytes", 0) for n in networks),
+        network_tx=sum(n.get("tx_bytes", 0) for n in networks),
+        block_read=block_read,
+        block_write=block_write
+    )
+
+
+async def iter_log_lines(logs: LogStream) -> AsyncIterator[Tuple[str, str]]:
+    """
+    将日志流按行切分，逐行产出 (stream, line)
+
+    stdout / stderr 各自维护未完成行和增量 UTF-8 解码器，帧边界切断的行或多字节字符可正确拼接；
+    任一时刻只保留不超过 MAX_LOG_LINE 的未完成行
+    """
+    pending: Dict[str, str] = {}
+    decoders: Dict[str, codecs.IncrementalDecoder] = {}
+    async for stream, chunk in logs:
+        decoder = decoders.get(stream)
+        if decoder is None:
+            decoder = decoders[stream] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        text = pending.pop(stream, "") + decoder.decode(chunk)
+        lines = text.split("\n")
+        for line in lines[:-1]:
+            yield stream, line.rstrip("\r")
+        rest = lines[-1]
+        while len(rest) > MAX_LOG_LINE:
+            yield stream, rest[:MAX_LOG_LINE]
+            rest = rest[MAX_LOG_LINE:]
+        if rest:
+            pending[stream] = rest
+    for stream, rest in pending.items():
+        yield stream, rest
+
+
+def group_stacks(containers: List[DockerContainer]) -> List[DockerStack]:
+    """
+    按 compose 项目标签将容器分组为栈（单次遍历，无额外 Docker 调用）
+
+    不属于任何 compose 项目的容器不计入；不同主机上的同名项目视为不同的栈
+
+    Returns:
+        按主机、栈名排序的栈列表
+    """
+    stacks: Dict[Tuple[Optional[str], str], DockerStack] = {}
+    for c in containers:
+        if not c.project:
+            continue
+        stack = stacks.get((c.host, c.project))
+        if stack is None:
+            stack = stacks[(c.host, c.project)] = DockerStack(
+                name=c.project, host=c.host, state="stopped", total=0, running=0
+            )
+        stack.total += 1
+        if c.state == "running":
+            stack.running += 1
+        if c.service and c.service not in stack.services:
+            stack.services.append(c.service)
+        for host_ports in c.ports.values():
+            for port in host_ports:
+                if port not in stack.ports:
+                    stack.ports.append(port)
+        stack.containers.append(c.id)
+        stack.stale = stack.stale or c.stale
+
+    for stack in stacks.values():
+        if stack.running == stack.total:
+            stack.state = "running"
+        elif stack.running:
+            stack.state = "degraded"
+        stack.services.sort()
+        stack.ports.sort(key=int)
+    return [stacks[key] for key in sorted(stacks, key=lambda k: (k[0] or "", k[1]))]
+
+
+def _size(value: Optional[int]) -> int:
+    """守护进程未计算的大小为 -1 或缺失，按 0 处理"""
+    return value if value and value > 0 else 0
+
+
+def _category(entries: List[DockerDiskUsageEntry], size: int, reclaimable: int) -> DockerDiskUsageCategory:
+    return DockerDiskUsageCategory(
+        total_count=len(entries),
+        active_count=sum(1 for e in entries if e.in_use),
+        size=size,
+        reclaimable=reclaimable,
+        items=sorted(entries, key=lambda e: e.size, reverse=True)
+    )
+
+
+def disk_usage_from_df(df: dict, host: str) -> DockerDiskUsage:
+    """
+    由 /system/df 结果汇总磁盘占用，可回收空间的算法与 docker system df 一致
+
+    Args:
+        df: /system/df 响应
+        host: 主机名
+    """
+    # 镜像：共享层只计一次，总大小取 LayersSize；被容器使用的镜像独占部分不可回收
+    images = df.get("Images") or []
+    image_entries = [
+        DockerDiskUsageEntry(
+            id=short_image_id(img["Id"]),
+            name=(img.get("RepoTags") or [short_image_id(img["Id"])])[0],
+            size=_size(img.get("Size")),
+            in_use=img.get("Containers", 0) > 0
+        )
+        for img in images
+    ]
+    images_size = _size(df.get("LayersSize"))
+    images_used = sum(
+        _size(img.get("Size")) - _size(img.get("SharedSize"))
+        for img in images if img.get("Containers", 0) > 0
+    )
+
+    # 容器：可写层，未运行容器的可写层可回收
+    containers = df.get("Containers") or []
+    container_entries = [
+        DockerDiskUsageEntry(
+            id=c["Id"][:12],
+            name=(c.get("Names") or ["/" + c["Id"][:12]])[0].lstrip("/"),
+            size=_size(c.get("SizeRw")),
+            in_use=c.get("State") == "running"
+        )
+        for c in containers
+    ]
+
+    # 卷：未被任何容器引用的卷可回收
+    volume_entries = [
+        DockerDiskUsageEntry(
+            id=v["Name"],
+            name=v["Name"],
+            size=_size((v.get("UsageData") or {}).get("Size")),
+            in_use=(v.get("UsageData") or {}).get("RefCount", 0) > 0
+        )
+        for v in df.get("Volumes") or []
+    ]
+
+    # 构建缓存：共享记录已计入其他记录，未使用且非共享的可回收
+    build_cache = [b for b in df.get("BuildCache") or [] if not b.get("Shared")]
+    cache_entries = [
+        DockerDiskUsageEntry(
+            id=b["ID"][:12],
+            name=b.get("Description") or b.get("Type") or b["ID"][:12],
+            size=_size(b.get("Size")),
+            in_use=bool(b.get("InUse"))
+        )
+        for b in build_cache
+    ]
+
+    categories = {
+        "images": _category(image_entries, images_size, max(0, images_size - images_used)),
+        "containers": _category(
+            container_entries,
+            sum(e.size for e in container_entries),
+            sum(e.size for e in container_entries if not e.in_use)
+        ),
+        "volumes": _category(
+            volume_entries,
+            sum(e.size for e in volume_entries),
+            sum(e.size for e in volume_entries if not e.in_use)
+        ),
+        "build_cache": _category(
+            cache_entries,
+            sum(e.size for e in cache_entries),
+            sum(e.size for e in cache_entries if not e.in_use)
+        ),
+    }
+    return DockerDiskUsage(
+        host=host,
+        total_size=sum(c.size for c in categories.values()),
+        total_reclaimable=sum(c.reclaimable for c in categories.values()),
+        updated_at=time.time(),
+        **categories
+    )
+
+
+class ContainerCache:
+    """
+    容器表内存缓存
+    由事件流增量维护，保存 /containers/json 的摘要数据
+    """
+
+    def __init__(self):
+        self._containers: Dict[str, dict] = {}
+        self._synced = False
+
+    @property
+    def synced(self) -> bool:
+        """是否已完成全量同步且事件流仍在线"""
+        return self._synced
+
+    def reset(self, summaries: List[dict]):
+        """全量替换（初次同步或重连后）"""
+        self._containers = {c["Id"]: c for c in summaries}
+        self._synced = True
+
+    def invalidate(self):
+        """事件流断开，缓存不再可信"""
+        self._synced = False
+
+    def upsert(self, summary: dict):
+        self._containers[summary["Id"]] = summary
+
+    def remove(self, container_id: str):
+        self._containers.pop(container_id, None)
+
+    def list(self, all_containers: bool = True) -> List[dict]:
+        summaries = list(self._containers.values())
+        if not all_containers:
+            summaries = [c for c in summaries if c.get("State") in RUNNING_STATES]
+        return sorted(summaries, key=lambda c: c.get("Created", 0), reverse=True)
+
 
 class DockerService:
     """
     Docker 服务类
-    封装 Docker SDK 操作，提供容器管理功能
+    基于异步 Docker 客户端提供容器管理功能，所有守护进程调用都不阻塞事件循环
     """
     
-    def __init__(self):
-        """初始化 Docker 客户端"""
-        self._client: Optional[docker.DockerClient] = None
+    def __init__(self, api: Optional[AsyncDockerClient] = None, name: str = DOCKER_HOST_NAME):
+        """
+        初始化 Docker 客户端
+        
+        Args:
+            api: 主机对应的客户端，为空时按 DOCKER_HOST 创建
+            name: 主机名，用于标记容器所属主机
+        """
+        self.api = api or AsyncDockerClient.from_env()
+        self.name = name
+        self.last_error: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        self._last_containers: List[DockerContainer] = []
+        self._image_tags_cache: Dict[str, List[str]] = {}
+        self._image_tags_time = 0.0
+        self._cache = ContainerCache()
+        self._watcher: Optional[asyncio.Task] = None
+        self._stats: List[ContainerStats] = []
+        self._stats_time = 0.0
+        self._stats_refresh: Optional[asyncio.Task] = None
+        self._stats_semaphore = asyncio.Semaphore(DOCKER_STATS_CONCURRENCY)
+        self._cpu_previous: Dict[str, Tuple[int, int]] = {}
+        self._disk_usage: Optional[DockerDiskUsage] = None
+        self._disk_usage_time = 0.0
+        self._disk_usage_refresh: Optional[asyncio.Task] = None
     
-    @property
-    def client(self) -> Optional[docker.DockerClient]:
+    async def is_available(self) -> bool:
         """
-        懒加载 Docker 客户端
-        避免在 Docker 不可用时影响其他功能
+        检查 Docker 是否可用
+
+        连接正常时直接返回；断开后由熔断器按指数退避放行探测，
+        退避期内立即返回 False，避免在 Docker 不可用时拖慢其他功能
         """
-        if self._client is None:
-            try:
-                self._client = docker.from_env()
-                # 测试连接
-                self._client.ping()
-            except DockerException as e:
-                logger.warning(f"Docker 连接失败: {e}")
-                self._client = None
-        return self._client
+        if self.api.breaker.available:
+            return True
+        try:
+            await self.api.ping()
+        except DockerError:
+            return False
+        return True
     
-    def is_available(self) -> bool:
-        """检查 Docker 是否可用"""
-        return self.client is not None
+    async def close(self):
+        """停止事件监听并关闭连接池"""
+        await self.stop_watcher()
+        await self.api.close()
     
-    def list_containers(self, all_containers: bool = True) -> List[DockerContainer]:
+    async def _image_tags(self, image_ids: Set[str]) -> Dict[str, List[str]]:
+        """
+        获取镜像 ID -> 标签映射
+
+        整张映射一次 /images/json 拉取后缓存；出现未知镜像或缓存过期时才重新拉取
+        """
+        now = time.monotonic()
+        if (
+            not image_ids.issubset(self._image_tags_cache)
+            or now - self._image_tags_time > IMAGE_TAGS_TTL
+        ):
+            images = await self.api.images()
+            self._image_tags_cache = {img["Id"]: img.get("RepoTags") or [] for img in images}
+            self._image_tags_time = now
+        return self._image_tags_cache
+
+    async def fetch_containers(self, all_containers: bool = True) -> List[DockerContainer]:
+        """
+        获取容器列表，失败时抛出 DockerError
+
+        直接使用 /containers/json 的摘要数据，加上缓存的镜像标签映射，
+        每次列表只需 1~2 次 Docker API 调用，与容器数量无关；
+        事件监听已启动并同步时直接读取内存容器表
+        """
+        if not await self.is_available():
+            raise DockerUnavailable("Docker 守护进程不可用")
+        
+        try:
+            if self._cache.synced:
+                summaries = self._cache.list(all_containers)
+            else:
+                summaries = await self.api.containers(all=all_containers)
+            tags = await self._image_tags({c.get("ImageID", "") for c in summaries})
+        except DockerError as e:
+            self.last_error = str(e)
+            raise
+        
+        containers = [container_from_summary(c, tags, self.name) for c in summaries]
+        self.last_error = None
+        if all_containers:
+            self._last_containers = containers
+            self.last_sync = time.time()
+        return containers
+    
+    def stale_containers(self, all_containers: bool = True) -> List[DockerContainer]:
+        """上次成功获取的完整列表（标记为过期），主机不可用时代替实时结果"""
+        return [
+            c.model_copy(update={"stale": True}) for c in self._last_containers
+            if all_containers or c.state in RUNNING_STATES
+        ]
+    
+    async def list_containers(self, all_containers: bool = True) -> List[DockerContainer]:
         """
         获取所有容器列表
         
@@ -50,39 +559,17 @@ class DockerService:
             all_containers: 是否包含已停止的容器
         
         Returns:
-            DockerContainer 对象列表
+            DockerContainer 对象列表，Docker 不可用时为空
         """
-        if not self.is_available():
-            return []
-        
         try:
-            containers = self.client.containers.list(all=all_containers)
-            result = []
-            
-            for container in containers:
-                # 解析端口映射
-                ports = {}
-                if container.ports:
-                    for port, bindings in container.ports.items():
-                        if bindings:
-                            ports[port] = [b["HostPort"] for b in bindings if b.get("HostPort")]
-                
-                result.append(DockerContainer(
-                    id=container.short_id,
-                    name=container.name,
-                    image=container.image.tags[0] if container.image.tags else container.image.short_id,
-                    status=container.status,
-                    state=container.attrs.get("State", {}).get("Status", "unknown"),
-                    created=container.attrs.get("Created", ""),
-                    ports=ports
-                ))
-            
-            return result
-        except DockerException as e:
+            return await self.fetch_containers(all_containers)
+        except DockerUnavailable:
+            return []
+        except DockerError as e:
             logger.error(f"获取容器列表失败: {e}")
             return []
     
-    def get_container(self, container_id: str) -> Optional[DockerContainer]:
+    async def get_container(self, container_id: str) -> Optional[DockerContainer]:
         """
         获取单个容器信息
         
@@ -92,97 +579,512 @@ class DockerService:
         Returns:
             DockerContainer 对象，不存在返回 None
         """
-        if not self.is_available():
+        if not await self.is_available():
             return None
         
         try:
-            container = self.client.containers.get(container_id)
-            ports = {}
-            if container.ports:
-                for port, bindings in container.ports.items():
-                    if bindings:
-                        ports[port] = [b["HostPort"] for b in bindings if b.get("HostPort")]
-            
-            return DockerContainer(
-                id=container.short_id,
-                name=container.name,
-                image=container.image.tags[0] if container.image.tags else container.image.short_id,
-                status=container.status,
-                state=container.attrs.get("State", {}).get("Status", "unknown"),
-                created=container.attrs.get("Created", ""),
-                ports=ports
-            )
-        except NotFound:
+            attrs = await self.api.inspect_container(container_id)
+            tags = await self._image_tags({attrs.get("Image", "")})
+            return container_from_inspect(attrs, tags, self.name)
+        except DockerNotFound:
             return None
-        except DockerException as e:
+        except DockerError as e:
             logger.error(f"获取容器信息失败: {e}")
             return None
     
-    def start_container(self, container_id: str) -> bool:
-        """启动容器"""
-        if not self.is_available():
+    # ==================== 资源占用 ====================
+
+    async def get_stats(self) -> List[ContainerStats]:
+        """
+        获取全部运行中容器的资源占用
+
+        结果缓存 STATS_TTL 秒；缓存过期时只发起一次刷新，并发请求共享同一次刷新结果
+        """
+        if not await self.is_available():
+            return []
+        if time.monotonic() - self._stats_time < STATS_TTL:
+            return self._stats
+        if self._stats_refresh is None:
+            self._stats_refresh = asyncio.create_task(self._refresh_stats())
+            self._stats_refresh.add_done_callback(self._clear_stats_refresh)
+        # shield：单个请求断开不取消共享的刷新任务
+        return await asyncio.shield(self._stats_refresh)
+
+    def _clear_stats_refresh(self, task: asyncio.Task):
+        self._stats_refresh = None
+
+    async def _refresh_stats(self) -> List[ContainerStats]:
+        """并发拉取全部运行中容器的 stats 快照"""
+        containers = [c for c in await self.list_containers(all_containers=False) if c.state == "running"]
+        results = await asyncio.gather(*(self._container_stats(c) for c in containers))
+        stats = [s for s in results if s is not None]
+
+        # 清理已停止容器的 CPU 计数
+        running = {c.id for c in containers}
+        self._cpu_previous = {k: v for k, v in self._cpu_previous.items() if k in running}
+        self._stats = stats
+        self._stats_time = time.monotonic()
+        return stats
+
+    async def _container_stats(self, container: DockerContainer) -> Optional[ContainerStats]:
+        """拉取单个容器的 stats 快照（受并发数限制），失败时返回 None"""
+        async with self._stats_semaphore:
+            try:
+                raw = await self.api.container_stats(container.id)
+            except DockerError as e:
+                logger.warning(f"获取容器 {container.name} 资源占用失败: {e}")
+                return None
+        stats = container_stats_from_raw(container, raw, self._cpu_previous.get(container.id))
+        current = _cpu_sample(raw.get("cpu_stats") or {})
+        if current:
+            self._cpu_previous[container.id] = current
+        return stats
+
+    # ==================== 磁盘占用 ====================
+
+    async def get_disk_usage(self, refresh: bool = False) -> DockerDiskUsage:
+        """
+        获取磁盘占用，失败时抛出 DockerError
+
+        /system/df 在大主机上可能耗时数秒至数分钟：结果缓存 DOCKER_DF_TTL 秒，
+        过期后立即返回旧结果（stale 为 true）并在后台刷新；
+        同一时间最多只有一次扫描，并发请求共享同一次结果
+
+        Args:
+            refresh: 强制等待一次新的扫描
+        """
+        if not await self.is_available():
+            raise DockerUnavailable("Docker 守护进程不可用")
+        if self._disk_usage is None or refresh:
+            # shield：单个请求断开不取消共享的扫描任务
+            return await asyncio.shield(self._start_disk_usage_refresh())
+        if time.monotonic() - self._disk_usage_time > DOCKER_DF_TTL:
+            self._start_disk_usage_refresh()
+            return self._disk_usage.model_copy(update={"stale": True})
+        return self._disk_usage
+
+    def _start_disk_usage_refresh(self) -> asyncio.Task:
+        """启动后台扫描（已有扫描进行中时直接返回该任务）"""
+        if self._disk_usage_refresh is None:
+            self._disk_usage_refresh = asyncio.create_task(self._refresh_disk_usage())
+            self._disk_usage_refresh.add_done_callback(self._clear_disk_usage_refresh)
+        return self._disk_usage_refresh
+
+    def _clear_disk_usage_refresh(self, task: asyncio.Task):
+        self._disk_usage_refresh = None
+        # 后台刷新无人等待时由此取走异常，避免 "exception was never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"获取 Docker 磁盘占用失败: {task.exception()}")
+
+    async def _refresh_disk_usage(self) -> DockerDiskUsage:
+        usage = disk_usage_from_df(await self.api.system_df(), self.name)
+        self._disk_usage = usage
+        self._disk_usage_time = time.monotonic()
+        return usage
+
+    # ==================== 容器日志 ====================
+
+    async def open_logs(
+        self,
+        container_id: str,
+        tail: Optional[int] = 100,
+        follow: bool = False,
+        since: Optional[int] = None,
+        timestamps: bool = False
+    ) -> LogStream:
+        """
+        打开容器日志流，容器不存在时抛出 DockerNotFound
+
+        调用方需在读取结束后调用 close() 释放连接
+        """
+        return await self.api.container_logs(
+            container_id, tail=tail, follow=follow, since=since, timestamps=timestamps
+        )
+
+    # ==================== 事件监听 ====================
+
+    def start_watcher(self):
+        """启动后台事件监听任务，维护内存容器表（需在事件循环中调用）"""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch_events())
+
+    async def stop_watcher(self):
+        """停止事件监听"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        self._cache.invalidate()
+
+    async def _resync(self):
+        """全量同步容器表"""
+        self._cache.reset(await self.api.containers(all=True))
+
+    async def _refresh_container(self, container_ref: str):
+        """
+        重新拉取单个容器摘要，容器已不存在时从表中移除
+
+        Args:
+            container_ref: 容器完整 ID，或用户传入的名称 / ID 前缀
+        """
+        container_id = container_ref
+        if not FULL_CONTAINER_ID.fullmatch(container_ref):
+            # 由十六进制字符组成的名称（如 "cafe"）会被 id 过滤器当作其他容器的 ID 前缀，
+            # 先按守护进程的解析规则取得完整 ID
+            try:
+                container_id = (await self.api.inspect_container(container_ref))["Id"]
+            except DockerNotFound:
+                return
+        summaries = await self.api.containers(all=True, filters={"id": [container_id]})
+        summary = next((c for c in summaries if c["Id"] == container_id), None)
+        if summary is not None:
+            self._cache.upsert(summary)
+        else:
+            self._cache.remove(container_id)
+
+    async def _apply_event(self, event: dict):
+        """根据单条事件更新容器表，并交给告警引擎判定容器事件规则"""
+        action = (event.get("Action") or event.get("status") or "").split(":")[0]
+        actor = event.get("Actor") or {}
+        container_id = actor.get("ID") or event.get("id")
+        if not container_id:
+            return
+        self._alert_event(event, action, container_id, actor.get("Attributes") or {})
+        if action == "destroy":
+            self._cache.remove(container_id)
+        elif action in CONTAINER_EVENTS:
+            await self._refresh_container(container_id)
+
+    def _alert_event(self, event: dict, action: str, container_id: str, attributes: dict):
+        try:
+            exit_code = int(attributes["exitCode"]) if "exitCode" in attributes else None
+        except ValueError:
+            exit_code = None
+        alerts = alert_engine.container_event(
+            event.get("time") or time.time(),
+            self.name,
+            action,
+            attributes.get("name") or container_id[:12],
+            exit_code
+        )
+        if alerts:
+            alert_engine.dispatch(alerts)
+
+    async def _watch_events(self):
+        """
+        事件监听循环
+
+        先订阅事件流再全量同步，保证两者之间的变化不会丢失；
+        断线后标记缓存失效（列表回退为实时查询），等待后重连并重新同步；
+        事件流空闲超时（可能是半开连接）时立即重连并全量同步，缓存最多滞后一个超时周期
+        """
+        idle = False
+        while True:
+            if not await self.is_available():
+                await asyncio.sleep(EVENTS_RETRY_INTERVAL)
+                continue
+            try:
+                events = await self.api.events(filters={"type": ["container"]})
+            except DockerError as e:
+                logger.warning(f"Docker 事件订阅失败: {e}")
+                await asyncio.sleep(EVENTS_RETRY_INTERVAL)
+                continue
+            try:
+                await self._resync()
+                if not idle:
+                    logger.info("Docker 事件监听已连接，容器表已同步")
+                idle = False
+                async for event in events:
+                    await self._apply_event(event)
+            except DockerStreamIdle:
+                logger.debug("Docker 事件流空闲超时，重新订阅")
+                idle = True
+                continue
+            except DockerError as e:
+                logger.warning(f"Docker 事件流中断: {e}")
+            finally:
+                self._cache.invalidate()
+                events.close()
+            await asyncio.sleep(EVENTS_RETRY_INTERVAL)
+
+    # ==================== 容器操作 ====================
+
+    async def _perform_action(self, container_id: str, action: str):
+        """
+        执行容器操作，失败时抛出 DockerError
+
+        成功后立即刷新该容器，避免紧随其后的列表请求早于事件到达
+        """
+        await self.api.container_action(container_id, action, CONTAINER_ACTIONS[action])
+        if self._cache.synced:
+            try:
+                await self._refresh_container(container_id)
+            except Exception as e:
+                # 操作本身已成功，刷新失败只影响缓存，等待事件流修正
+                logger.warning(f"刷新容器状态失败: {e!r}")
+
+    async def _container_action(self, container_id: str, action: str) -> bool:
+        """执行容器操作，返回是否成功"""
+        if not await self.is_available():
             return False
         
         try:
-            container = self.client.containers.get(container_id)
-            container.start()
-            return True
-        except (NotFound, APIError) as e:
-            logger.error(f"启动容器失败: {e}")
+            await self._perform_action(container_id, action)
+        except DockerError as e:
+            logger.error(f"容器 {action} 失败: {e}")
             return False
+        return True
     
-    def stop_container(self, container_id: str) -> bool:
-        """停止容器"""
-        if not self.is_available():
-            return False
+    async def batch_action(
+        self,
+        container_ids: List[str],
+        action: str,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[ContainerActionResult]:
+        """
+        并发对多个容器执行同一操作，按完成顺序逐个产出结果
+
+        同时进行的操作数受 concurrency 限制（默认 DOCKER_ACTION_CONCURRENCY）；
+        迭代提前结束（如客户端断开）时，尚未开始的操作会被取消
         
+        Args:
+            container_ids: 容器 ID 或名称列表（重复项只执行一次）
+            action: start / stop / restart / pause / unpause
+            concurrency: 并发数上限
+        """
+        semaphore = asyncio.Semaphore(min(concurrency or DOCKER_ACTION_CONCURRENCY, DOCKER_ACTION_CONCURRENCY))
+
+        async def run(container_id: str) -> ContainerActionResult:
+            async with semaphore:
+                try:
+                    await self._perform_action(container_id, action)
+                    return ContainerActionResult(id=container_id, success=True)
+                except DockerError as e:
+                    logger.error(f"容器 {container_id} {action} 失败: {e}")
+                    return ContainerActionResult(id=container_id, success=False, error=str(e))
+                except Exception as e:
+                    # 非预期的异常（如响应格式异常）同样逐个报告，不中断其余容器
+                    logger.exception(f"容器 {container_id} {action} 失败")
+                    return ContainerActionResult(id=container_id, success=False, error=repr(e))
+
+        tasks = [asyncio.create_task(run(c)) for c in dict.fromkeys(container_ids)]
         try:
-            container = self.client.containers.get(container_id)
-            container.stop(timeout=10)
-            return True
-        except (NotFound, APIError) as e:
-            logger.error(f"停止容器失败: {e}")
-            return False
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def start_container(self, container_id: str) -> bool:
+        """启动容器"""
+        return await self._container_action(container_id, "start")
     
-    def restart_container(self, container_id: str) -> bool:
+    async def stop_container(self, container_id: str) -> bool:
+        """停止容器"""
+        return await self._container_action(container_id, "stop")
+    
+    async def restart_container(self, container_id: str) -> bool:
         """重启容器"""
-        if not self.is_available():
-            return False
-        
-        try:
-            container = self.client.containers.get(container_id)
-            container.restart(timeout=10)
-            return True
-        except (NotFound, APIError) as e:
-            logger.error(f"重启容器失败: {e}")
-            return False
+        return await self._container_action(container_id, "restart")
     
-    def pause_container(self, container_id: str) -> bool:
+    async def pause_container(self, container_id: str) -> bool:
         """暂停容器"""
-        if not self.is_available():
-            return False
-        
-        try:
-            container = self.client.containers.get(container_id)
-            container.pause()
-            return True
-        except (NotFound, APIError) as e:
-            logger.error(f"暂停容器失败: {e}")
-            return False
+        return await self._container_action(container_id, "pause")
     
-    def unpause_container(self, container_id: str) -> bool:
+    async def unpause_container(self, container_id: str) -> bool:
         """恢复容器"""
-        if not self.is_available():
-            return False
-        
+        return await self._container_action(container_id, "unpause")
+
+    def info(self) -> DockerHostInfo:
+        """主机连接状态概览"""
+        return DockerHostInfo(
+            name=self.name,
+            url=self.api.base_url,
+            available=self.api.breaker.available,
+            state=self.api.breaker.state,
+            error=self.last_error,
+            container_count=len(self._last_containers) if self.last_sync is not None else None,
+            last_sync=self.last_sync
+        )
+
+
+def parse_docker_hosts(spec: str) -> Dict[str, str]:
+    """
+    解析 DOCKER_HOSTS 配置
+
+    Returns:
+        主机名 -> 地址，保持配置顺序
+    """
+    hosts: Dict[str, str] = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"DOCKER_HOSTS 配置格式错误: {entry}")
+        hosts[name.strip()] = url.strip()
+    return hosts
+
+
+class DockerHosts:
+    """
+    多 Docker 主机
+
+    每个主机一个 DockerService（独立的连接池、熔断器、容器表与事件监听），
+    聚合查询并发访问全部主机，单个主机慢或不可用时返回其上次结果，不拖慢其他主机
+    """
+
+    def __init__(self, services: List[DockerService]):
+        if not services:
+            raise ValueError("至少需要一个 Docker 主机")
+        self._services: Dict[str, DockerService] = {s.name: s for s in services}
+
+    @property
+    def default(self) -> DockerService:
+        """默认主机（配置中的第一个）"""
+        return next(iter(self._services.values()))
+
+    @property
+    def services(self) -> List[DockerService]:
+        return list(self._services.values())
+
+    def get(self, name: str) -> Optional[DockerService]:
+        return self._services.get(name)
+
+    def start_watchers(self):
+        """启动全部主机的事件监听（需在事件循环中调用）"""
+        for service in self._services.values():
+            service.start_watcher()
+
+    async def close(self):
+        """停止全部主机的事件监听并关闭连接池"""
+        await asyncio.gather(*(s.close() for s in self._services.values()))
+
+    async def any_available(self) -> bool:
+        """是否至少有一个主机可用"""
+        return any(await asyncio.gather(*(s.is_available() for s in self._services.values())))
+
+    async def list_containers(self, all_containers: bool = True) -> List[DockerContainer]:
+        """并发获取全部主机的容器并按配置顺序合并"""
+        results = await asyncio.gather(
+            *(self._list_host(s, all_containers) for s in self._services.values())
+        )
+        return [c for containers in results for c in containers]
+
+    @staticmethod
+    async def _list_host(service: DockerService, all_containers: bool) -> List[DockerContainer]:
         try:
-            container = self.client.containers.get(container_id)
-            container.unpause()
-            return True
-        except (NotFound, APIError) as e:
-            logger.error(f"恢复容器失败: {e}")
-            return False
+            return await asyncio.wait_for(service.fetch_containers(all_containers), DOCKER_FANOUT_TIMEOUT)
+        except asyncio.TimeoutError:
+            service.last_error = f"请求超时（{DOCKER_FANOUT_TIMEOUT:g} 秒）"
+        except DockerError as e:
+            service.last_error = str(e)
+        return service.stale_containers(all_containers)
+
+    async def fetch_containers(
+        self, services: Optional[List[DockerService]] = None
+    ) -> Tuple[List[DockerContainer], Dict[str, DockerError]]:
+        """
+        并发获取实时容器列表，不使用过期结果（用于需要准确状态的操作）
+
+        Args:
+            services: 要查询的主机，为空时查询全部主机
+
+        Returns:
+            (成功主机的容器列表, 主机名 -> 失败原因)
+        """
+        services = services if services is not None else self.services
+
+        async def fetch(service: DockerService) -> List[DockerContainer]:
+            try:
+                return await asyncio.wait_for(service.fetch_containers(), DOCKER_FANOUT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise DockerError(f"请求超时（{DOCKER_FANOUT_TIMEOUT:g} 秒）")
+
+        results = await asyncio.gather(*(fetch(s) for s in services), return_exceptions=True)
+        containers: List[DockerContainer] = []
+        errors: Dict[str, DockerError] = {}
+        for service, result in zip(services, results):
+            if isinstance(result, DockerError):
+                errors[service.name] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                containers.extend(result)
+        return containers, errors
+
+    async def batch_action(
+        self,
+        targets: Dict[str, List[str]],
+        action: str,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[ContainerActionResult]:
+        """
+        在多个主机上并发执行批量操作，按完成顺序合并产出结果
+
+        每个主机的并发数各自受 concurrency 限制；迭代提前结束时取消全部主机上尚未开始的操作；
+        某个主机的批量操作意外中止时，其尚未产出结果的容器逐个报告为失败
+
+        Args:
+            targets: 主机名 -> 容器 ID 列表
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def drain(service: DockerService, ids: List[str]):
+            pending = dict.fromkeys(ids)
+            try:
+                async for result in service.batch_action(ids, action, concurrency):
+                    pending.pop(result.id, None)
+                    queue.put_nowait(result)
+            except Exception as e:
+                logger.exception(f"主机 {service.name} 批量 {action} 中止")
+                for container_id in pending:
+                    queue.put_nowait(ContainerActionResult(id=container_id, success=False, error=repr(e)))
+            finally:
+                queue.put_nowait(None)
+
+        tasks = [
+            asyncio.create_task(drain(self._services[name], ids))
+            for name, ids in targets.items() if ids
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                result = await queue.get()
+                if result is None:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def info(self) -> List[DockerHostInfo]:
+        return [s.info() for s in self._services.values()]
+
+
+def create_docker_hosts(spec: str = DOCKER_HOSTS) -> DockerHosts:
+    """按 DOCKER_HOSTS 创建主机集合，未配置时只包含 DOCKER_HOST 对应的默认主机"""
+    hosts = parse_docker_hosts(spec)
+    if not hosts:
+        return DockerHosts([DockerService(name=DOCKER_HOST_NAME)])
+    
+    services = []
+    for name, url in hosts.items():
+        tls = None
+        if url.startswith("https://"):
+            cert_path = os.path.join(DOCKER_CERT_PATH, name)
+            tls = tls_context(cert_path if os.path.isdir(cert_path) else DOCKER_CERT_PATH)
+        services.append(DockerService(AsyncDockerClient(url, tls=tls), name))
+    return DockerHosts(services)
 
 
 # 全局单例
-docker_service = DockerService()
+docker_hosts = create_docker_hosts()
+
+# 默认主机，单主机场景与 Agent 直接使用
+docker_service = docker_hosts.default
@@ -0,0 +1,532 @@
+"""
+服务健康检查
+整个应用共享一个带连接池的 HTTP 会话，探测并发受全局信号量限制；
+每个地址可配置探测方式：仅 TCP 连接、HEAD（不支持时回退 GET）或 GET 并校验状态码与响应内容；
+后台调度器按间隔探测全部卡片地址，页面只读取缓存结果，
+卡片地址与已配置探测方式的地址的结果计入在线率历史
+"""
+import os
+import time
+import heapq
+import random
+import asyncio
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from repository.database import SessionLocal
+from model.card import Card
+from model.health_probe import HealthProbe
+from schema.schemas import ServiceStatus
+from service.uptime_service import UPTIME_FLUSH_INTERVAL, UptimeHistory, uptime_history
+
+logger = logging.getLogger(__name__)
+
+# 同时进行的探测数上限（全局）
+HEALTH_CONCURRENCY = int(os.getenv("HEALTH_CONCURRENCY", "32"))
+
+# 每个目标主机的并发连接数上限
+HEALTH_LIMIT_PER_HOST = int(os.getenv("HEALTH_LIMIT_PER_HOST", "4"))
+
+# DNS 缓存有效期（秒）
+HEALTH_DNS_TTL = int(os.getenv("HEALTH_DNS_TTL", "300"))
+
+# 后台探测间隔（秒）与随机抖动比例，抖动使各目标的探测时间错开
+HEALTH_INTERVAL = float(os.getenv("HEALTH_INTERVAL", "60"))
+HEALTH_JITTER = 0.1
+
+# 各探测方式的默认超时（秒）
+HEALTH_TIMEOUT = float(os.getenv("HEALTH_TIMEOUT", "5"))
+HEALTH_TIMEOUTS = {
+    "tcp": float(os.getenv("HEALTH_TCP_TIMEOUT", "2")),
+    "head": float(os.getenv("HEALTH_HEAD_TIMEOUT", "3")),
+    "get": HEALTH_TIMEOUT,
+}
+
+# HEAD 返回这些状态码时视为不支持 HEAD，改用 GET
+HEAD_FALLBACK_STATUS = (405, 501)
+
+# 校验响应内容时最多读取的响应体大小
+BODY_MATCH_LIMIT = 256 * 1024
+
+# 从数据库重新加载卡片地址的间隔（秒）
+HEALTH_TARGETS_REFRESH = 30
+
+# 非卡片地址（如健康面板自定义的服务）超过该时长无人查询后停止探测（秒）
+HEALTH_WATCH_TTL = 600
+
+# 同时关注的非卡片地址数上限，超出时淘汰最久未查询的地址
+HEALTH_WATCH_MAX = int(os.getenv("HEALTH_WATCH_MAX", "64"))
+
+# 调度器检查到期目标的间隔（秒）
+HEALTH_TICK = 1.0
+
+# 响应体不超过该大小时读完以复用连接，更大的响应直接断开
+KEEPALIVE_BODY_LIMIT = 64 * 1024
+
+
+class ProbeSpec(NamedTuple):
+    """探测方式（可哈希，相同地址与方式的并发探测合并为一次）"""
+    mode: str = "get"
+    timeout: float = HEALTH_TIMEOUT
+    expect_status: Optional[Tuple[Tuple[int, int], ...]] = None
+    body_match: Optional[str] = None
+
+    def accepts(self, status_code: int) -> bool:
+        """状态码是否符合预期，未配置时任意响应均视为在线"""
+        return self.expect_status is None or any(lo <= status_code <= hi for lo, hi in self.expect_status)
+
+
+def parse_status_ranges(value: Optional[str]) -> Optional[Tuple[Tuple[int, int], ...]]:
+    """
+    解析状态码范围
+
+    Args:
+        value: 如 "200"、"200-299,401"
+
+    Raises:
+        ValueError: 格式不合法
+    """
+    if not value or not value.strip():
+        return None
+    ranges = []
+    for part in value.split(","):
+        lo, dash, hi = part.strip().partition("-")
+        try:
+            lo_code, hi_code = int(lo), int(hi if dash else lo)
+        except ValueError:
+            raise ValueError(f"无效的状态码范围: {value}")
+        if not 100 <= lo_code <= hi_code <= 599:
+            raise ValueError(f"无效的状态码范围: {value}")
+        ranges.append((lo_code, hi_code))
+    return tuple(ranges)
+
+
+def default_spec(url: str, timeout: Optional[float] = None) -> ProbeSpec:
+    """未配置的地址：tcp:// 地址只建立连接，其余使用 GET"""
+    mode = "tcp" if url.startswith("tcp://") else "get"
+    return ProbeSpec(mode, timeout or HEALTH_TIMEOUTS[mode])
+
+
+def spec_from_probe(probe: HealthProbe) -> ProbeSpec:
+    """由探测配置生成探测方式"""
+    return ProbeSpec(
+        mode=probe.mode,
+        timeout=probe.timeout or HEALTH_TIMEOUTS[probe.mode],
+        expect_status=parse_status_ranges(probe.expect_status),
+        body_match=probe.body_match or None
+    )
+
+
+def check_probe_url(url: str, mode: str):
+    """
+    校验地址能否以该方式探测
+
+    Raises:
+        ValueError: tcp 探测缺少主机或端口，HEAD / GET 探测不是 http / https 地址
+    """
+    if mode == "tcp":
+        tcp_address(url)
+    elif not url.startswith(("http://", "https://")) or not urlsplit(url).hostname:
+        raise ValueError("HEAD / GET 探测仅支持 http / https 地址")
+
+
+def tcp_address(url: str) -> Tuple[str, int]:
+    """
+    解析 TCP 探测的主机与端口
+
+    支持 tcp://host:port，http / https 地址缺省端口为 80 / 443
+
+    Raises:
+        ValueError: 缺少主机或端口
+    """
+    parts = urlsplit(url)
+    try:
+        port = parts.port or {"http": 80, "https": 443}.get(parts.scheme)
+    except ValueError:
+        port = None
+    if not parts.hostname or not port:
+        raise ValueError(f"无法解析主机与端口: {url}")
+    return parts.hostname, port
+
+
+class HealthChecker:
+    """
+    健康检查器
+
+    共享会话复用 keep-alive 连接、DNS 缓存与 TLS 会话；
+    相同 URL 的并发探测合并为一次，多个页面同时检查时不会重复请求
+    """
+
+    def __init__(self, concurrency: int = HEALTH_CONCURRENCY):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight: Dict[Tuple[str, ProbeSpec], asyncio.Task] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,  # 总并发由信号量控制
+                limit_per_host=HEALTH_LIMIT_PER_HOST,
+                ttl_dns_cache=HEALTH_DNS_TTL,
+                keepalive_timeout=60,
+                ssl=False  # 内网服务多为自签名证书
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """关闭共享会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def check(self, url: str, spec: Optional[ProbeSpec] = None) -> ServiceStatus:
+        """检查单个服务，同一地址以相同方式正在检查时共享其结果"""
+        key = (url, spec or default_spec(url))
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._probe(*key))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield：单个请求断开不取消共享的探测
+        return await asyncio.shield(task)
+
+    async def check_many(self, targets: List[Tuple[str, ProbeSpec]]) -> List[ServiceStatus]:
+        """批量检查，重复的目标只探测一次，结果按请求顺序返回"""
+        unique = list(dict.fromkeys(targets))
+        results = await asyncio.gather(*(self.check(url, spec) for url, spec in unique))
+        by_target = dict(zip(unique, results))
+        return [by_target[target] for target in targets]
+
+    async def _probe(self, url: str, spec: ProbeSpec) -> ServiceStatus:
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                if spec.mode == "tcp":
+                    return await self._probe_tcp(url, spec, start)
+                return await self._probe_http(url, spec, start)
+            except asyncio.TimeoutError:
+                return ServiceStatus(url=url, is_online=False, error="Timeout", checked_at=time.time())
+            except aiohttp.ClientError as e:
+                return ServiceStatus(url=url, is_online=False, error=str(e), checked_at=time.time())
+            except Exception as e:
+                return ServiceStatus(url=url, is_online=False, error=str(e), checked_at=time.time())
+
+    @staticmethod
+    async def _probe_tcp(url: str, spec: ProbeSpec, start: float) -> ServiceStatus:
+        """只完成 TCP 握手，不发送任何数据"""
+        host, port = tcp_address(url)
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), spec.timeout)
+        elapsed = (time.perf_counter() - start) * 1000
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass  # 对端已重置连接，握手成功即视为在线
+        return ServiceStatus(
+            url=url,
+            is_online=True,
+            response_time=round(elapsed, 2),
+            checked_at=time.time()
+        )
+
+    async def _probe_http(self, url: str, spec: ProbeSpec, start: float) -> ServiceStatus:
+        session = self._get_session()
+        if spec.mode == "head":
+            async with session.head(
+                url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=spec.timeout)
+            ) as response:
+                if response.status not in HEAD_FALLBACK_STATUS:
+                    return await self._judge(url, spec, response, start)
+        # GET（或 HEAD 不支持时回退），HEAD 已用掉的时间计入超时
+        remaining = max(spec.timeout - (time.perf_counter() - start), 0.1)
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=remaining)) as response:
+            return await self._judge(url, spec, response, start)
+
+    async def _judge(self, url: str, spec: ProbeSpec, response: aiohttp.ClientResponse,
+                     start: float) -> ServiceStatus:
+        """按状态码与响应内容判定是否在线"""
+        elapsed = (time.perf_counter() - start) * 1000
+        error = None
+        if not spec.accepts(response.status):
+            error = f"状态码 {response.status} 不符合预期"
+        elif spec.body_match and response.method == "GET":
+            if not await self._body_contains(response, spec.body_match.encode()):
+                error = f"响应内容不包含 {spec.body_match}"
+        elif (response.method == "GET" and response.content_length is not None
+              and response.content_length <= KEEPALIVE_BODY_LIMIT):
+            await response.read()
+        return ServiceStatus(
+            url=url,
+            is_online=error is None,
+            status_code=response.status,
+            response_time=round(elapsed, 2),
+            error=error,
+            checked_at=time.time()
+        )
+
+    @staticmethod
+    async def _body_contains(response: aiohttp.ClientResponse, needle: bytes) -> bool:
+        """流式查找响应内容，找到即停止，最多读取 BODY_MATCH_LIMIT"""
+        tail = b""
+        received = 0
+        async for chunk in response.content.iter_chunked(16 * 1024):
+            data = tail + chunk
+            if needle in data:
+                return True
+            tail = data[-(len(needle) - 1):] if len(needle) > 1 else b""
+            received += len(chunk)
+            if received >= BODY_MATCH_LIMIT:
+                break
+        return False
+
+
+class ProbeTarget:
+    """探测目标及其最新结果"""
+
+    __slots__ = ("url", "from_cards", "last_requested", "next_due", "result")
+
+    def __init__(self, url: str, from_cards: bool):
+        self.url = url
+        self.from_cards = from_cards
+        # 卡片地址不依赖查询续期；移出卡片后若近期无人查询则立即停止探测
+        self.last_requested = 0.0 if from_cards else time.monotonic()
+        self.next_due = 0.0
+        self.result: Optional[ServiceStatus] = None
+
+
+def load_probe_specs() -> Dict[str, ProbeSpec]:
+    """全部探测配置，配置有误的地址跳过"""
+    db = SessionLocal()
+    try:
+        probes = db.query(HealthProbe).all()
+    finally:
+        db.close()
+    specs = {}
+    for probe in probes:
+        try:
+            specs[probe.url] = spec_from_probe(probe)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"忽略无效的探测配置 {probe.url}: {e}")
+    return specs
+
+
+def load_card_urls() -> Set[str]:
+    """全部用户卡片的内外网地址（http / https / tcp）"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Card.internal_url, Card.external_url).all()
+    finally:
+        db.close()
+    return {
+        url.strip() for row in rows for url in row
+        if url and url.strip().startswith(("http://", "https://", "tcp://"))
+    }
+
+
+class HealthProber:
+    """
+    后台健康探测调度器
+
+    目标来自全部卡片地址，以及页面按需查询的其他地址；
+    每个目标按 interval ± 抖动独立调度（最小堆），结果常驻内存，
+    查询只读缓存，出站探测量与打开的页面数无关
+    """
+
+    def __init__(self, checker: HealthChecker, history: UptimeHistory, interval: float = HEALTH_INTERVAL):
+        self.checker = checker
+        self.history = history
+        self.interval = interval
+        self._targets: Dict[str, ProbeTarget] = {}
+        self._specs: Dict[str, ProbeSpec] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._probes = set()
+        self._targets_loaded = 0.0
+        self._flushed = time.monotonic()
+        self._version = 0
+        self._snapshot: Tuple[int, List[ServiceStatus]] = (-1, [])
+
+    def _schedule(self, target: ProbeTarget, delay: float):
+        target.next_due = time.monotonic() + delay
+        heapq.heappush(self._heap, (target.next_due, target.url))
+
+    def _next_delay(self) -> float:
+        return self.interval * random.uniform(1 - HEALTH_JITTER, 1 + HEALTH_JITTER)
+
+    def _add(self, url: str, from_cards: bool, delay: float) -> ProbeTarget:
+        target = self._targets[url] = ProbeTarget(url, from_cards)
+        self._schedule(target, delay)
+        return target
+
+    def sync_card_targets(self, urls: Set[str]):
+        """
+        同步卡片地址：新增的地址在几秒内分散完成首次探测，
+        已删除且近期无人查询的地址停止探测
+        """
+        now = time.monotonic()
+        for url in urls:
+            target = self._targets.get(url)
+            if target is None:
+                self._add(url, True, random.uniform(0, min(self.interval, 5)))
+            else:
+                target.from_cards = True
+        for url, target in list(self._targets.items()):
+            if url not in urls and target.from_cards:
+                target.from_cards = False
+        self._expire(now)
+
+    def watch(self, urls: Iterable[str]):
+        """
+        按需关注非卡片地址，新地址立即探测
+
+        只接受可探测的 http / https / tcp 地址；
+        非卡片地址超过 HEALTH_WATCH_MAX 时淘汰最久未查询的地址
+        """
+        now = time.monotonic()
+        added = False
+        for url in urls:
+            target = self._targets.get(url)
+            if target is not None:
+                target.last_requested = now
+                continue
+            try:
+                check_probe_url(url, self.spec_for(url).mode)
+            except ValueError:
+                continue
+            self._add(url, False, 0)
+            added = True
+        if added:
+            self._evict()
+
+    def _evict(self):
+        watched = [t for t in self._targets.values() if not t.from_cards]
+        if len(watched) <= HEALTH_WATCH_MAX:
+            return
+        watched.sort(key=lambda t: t.last_requested)
+        for target in watched[:len(watched) - HEALTH_WATCH_MAX]:
+            del self._targets[target.url]
+        self._version += 1
+
+    def _expire(self, now: float):
+        expired = [
+            url for url, t in self._targets.items()
+            if not t.from_cards and now - t.last_requested > HEALTH_WATCH_TTL
+        ]
+        for url in expired:
+            del self._targets[url]
+        if expired:
+            self._version += 1
+
+    def status(self, urls: Optional[List[str]] = None) -> List[ServiceStatus]:
+        """
+        读取缓存的探测结果
+
+        Args:
+            urls: 只返回这些地址（未探测过的地址自动加入调度）；为空时返回全部卡片地址
+        """
+        if urls is not None:
+            self.watch(urls)
+            targets = (self._targets.get(url) for url in dict.fromkeys(urls))
+            return [t.result for t in targets if t is not None and t.result is not None]
+
+        version, results = self._snapshot
+        if version != self._version:
+            results = [t.result for t in self._targets.values() if t.from_cards and t.result is not None]
+            self._snapshot = (self._version, results)
+        return results
+
+    def result(self, url: str) -> Optional[ServiceStatus]:
+        """地址最近一次的探测结果，未探测过时为空"""
+        target = self._targets.get(url)
+        return target.result if target is not None else None
+
+    def spec_for(self, url: str, timeout: Optional[float] = None) -> ProbeSpec:
+        """地址的探测方式，未配置时使用默认方式（可指定超时）"""
+        spec = self._specs.get(url)
+        return spec if spec is not None else default_spec(url, timeout)
+
+    def reload_specs(self):
+        """从数据库重新装载探测配置，下次探测生效"""
+        self._specs = load_probe_specs()
+
+    def card_urls(self) -> List[str]:
+        """当前探测的全部卡片地址"""
+        return [url for url, t in self._targets.items() if t.from_cards]
+
+    def is_tracked(self, url: str) -> bool:
+        """是否记录在线率历史：卡片地址或已配置探测方式的地址"""
+        target = self._targets.get(url)
+        return (target is not None and target.from_cards) or url in self._specs
+
+    async def _probe(self, target: ProbeTarget):
+        try:
+            target.result = await self.checker.check(target.url, self.spec_for(target.url))
+            self._version += 1
+            # 按需关注的任意地址不写入历史，避免历史表随查询过的地址无限增长
+            if self.is_tracked(target.url):
+                self.history.record(target.result)
+        finally:
+            if self._targets.get(target.url) is target:
+                self._schedule(target, self._next_delay())
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            if now - self._targets_loaded >= HEALTH_TARGETS_REFRESH:
+                self._targets_loaded = now
+                try:
+                    self._specs = await asyncio.to_thread(load_probe_specs)
+                    self.sync_card_targets(await asyncio.to_thread(load_card_urls))
+                except Exception as e:
+                    logger.error(f"加载健康检查目标失败: {e}")
+                else:
+                    now = time.monotonic()
+
+            if now - self._flushed >= UPTIME_FLUSH_INTERVAL:
+                self._flushed = now
+                await self._flush()
+
+            while self._heap and self._heap[0][0] <= now:
+                due, url = heapq.heappop(self._heap)
+                target = self._targets.get(url)
+                # 已删除或已重新调度的目标留在堆中的旧条目直接丢弃
+                if target is None or target.next_due != due:
+                    continue
+                task = asyncio.create_task(self._probe(target))
+                self._probes.add(task)
+                task.add_done_callback(self._probes.discard)
+
+            await asyncio.sleep(HEALTH_TICK)
+
+    async def _flush(self):
+        try:
+            await asyncio.to_thread(self.history.flush)
+        except Exception as e:
+            logger.error(f"写入在线率历史失败: {e}")
+
+    def start(self):
+        """启动后台探测任务（需在事件循环中调用）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"健康检查调度器已启动，间隔 {self.interval:g}s")
+
+    async def stop(self):
+        """停止后台探测任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._probes):
+            task.cancel()
+        await self._flush()
+
+
+# 全局单例
+health_checker = HealthChecker()
+health_prober = HealthProber(health_checker, uptime_history)
@@ -0,0 +1,328 @@
+"""
+系统指标历史服务
+基于定长 array 环形缓冲区保存指标历史，并按 1s/1m/1h 三级做 min/avg/max 降采样
+"""
+import re
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from repository.metrics_store import MetricsStore
+from schema.schemas import MetricPoint, SystemStatus
+
+logger = logging.getLogger(__name__)
+
+# 记录历史的指标（SystemStatus 字段名）
+HISTORY_METRICS = (
+    "cpu_percent",
+    "memory_percent",
+    "memory_used",
+    "disk_percent",
+    "disk_used",
+)
+
+# 降采样层级：(分辨率秒数, 容量)
+# 1s × 3600 = 1 小时，1m × 1440 = 24 小时，1h × 720 = 30 天
+HISTORY_TIERS = (
+    (1, 3600),
+    (60, 1440),
+    (3600, 720),
+)
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_DURATION_PATTERN = re.compile(r"^(\d+)([smhd]?)$")
+
+
+def parse_duration(value: str) -> int:
+    """
+    解析时长字符串
+
+    Args:
+        value: 如 "90"、"30s"、"5m"、"1h"、"7d"
+
+    Returns:
+        秒数
+
+    Raises:
+        ValueError: 格式不合法
+    """
+    match = _DURATION_PATTERN.match(value.strip().lower())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"无效的时长: {value}")
+    return int(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+
+
+class RingSeries:
+    """
+    定长环形序列
+    时间戳与 min/avg/max 分别存放在连续的 array 中，内存占用固定
+    """
+
+    __slots__ = ("capacity", "_ts", "_min", "_avg", "_max", "_head", "_size")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._min = array("f", bytes(4 * capacity))
+        self._avg = array("f", bytes(4 * capacity))
+        self._max = array("f", bytes(4 * capacity))
+        self._head = 0  # 下一个写入位置
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, ts: float, vmin: float, vavg: float, vmax: float):
+        """追加一个数据点，写满后覆盖最旧的数据"""
+        i = self._head
+        self._ts[i] = ts
+        self._min[i] = vmin
+        self._avg[i] = vavg
+        self._max[i] = vmax
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _physical(self, i: int) -> int:
+        """逻辑下标（0 为最旧）转换为物理下标"""
+        return (self._head - self._size + i) % self.capacity
+
+    def timestamp(self, i: int) -> float:
+        return self._ts[self._physical(i)]
+
+    def oldest(self) -> Optional[float]:
+        return self.timestamp(0) if self._size else None
+
+    def range(self, start: float, end: float) -> List[Tuple[float, float, float, float]]:
+        """
+        查询 [start, end] 区间内的数据点
+
+        二分定位起点后顺序读取，复杂度 O(log n + 返回点数)
+        """
+        lo = bisect_left(_TimestampView(self), start)
+        result = []
+        for i in range(lo, self._size):
+            p = self._physical(i)
+            ts = self._ts[p]
+            if ts > end:
+                break
+            result.append((ts, self._min[p], self._avg[p], self._max[p]))
+        return result
+
+
+class _TimestampView:
+    """按逻辑下标访问时间戳，供 bisect 使用"""
+
+    __slots__ = ("_series",)
+
+    def __init__(self, series: RingSeries):
+        self._series = series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __getitem__(self, i: int) -> float:
+        return self._series.timestamp(i)
+
+
+class _Bucket:
+    """降采样累加器（当前未完成的时间桶）"""
+
+    __slots__ = ("start", "vmin", "vmax", "total", "count")
+
+    def __init__(self):
+        self.start = 0.0
+        self.vmin = 0.0
+        self.vmax = 0.0
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: float):
+        if self.count == 0:
+            self.vmin = self.vmax = value
+        else:
+            self.vmin = min(self.vmin, value)
+            self.vmax = max(self.vmax, value)
+        self.total += value
+        self.count += 1
+
+    def point(self) -> Tuple[float, float, float, float]:
+        return (self.start, self.vmin, self.total / self.count, self.vmax)
+
+
+class _Tier:
+    """单个降采样层级：环形序列 + 当前时间桶"""
+
+    __slots__ = ("resolution", "series", "bucket")
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.series = RingSeries(capacity)
+        self.bucket = _Bucket()
+
+    def add(self, ts: float, value: float) -> Optional[Tuple[float, float, float, float]]:
+        """写入一个值，时间桶结束时返回刚落入环形序列的数据点"""
+        start = ts - ts % self.resolution
+        bucket = self.bucket
+        flushed = None
+        if bucket.count and bucket.start != start:
+            flushed = bucket.point()
+            self.series.append(*flushed)
+            bucket.count = 0
+            bucket.total = 0.0
+        bucket.start = start
+        bucket.add(value)
+        return flushed
+
+
+class MetricsHistory:
+    """
+    指标历史存储
+    每个指标持有 1s/1m/1h 三个层级，写入 O(层级数)，查询 O(返回点数)
+    """
+
+    def __init__(self, metrics=HISTORY_METRICS, tiers=HISTORY_TIERS):
+        self.metrics = tuple(metrics)
+        self.tiers = tuple(tiers)
+        self._tiers: Dict[str, List[_Tier]] = {
+            metric: [_Tier(res, cap) for res, cap in self.tiers] for metric in self.metrics
+        }
+        self._store: Optional[MetricsStore] = None
+        self._lock = threading.Lock()
+
+    def attach_store(self, store: MetricsStore):
+        """
+        挂载持久化存储
+
+        先把文件中的记录读回各层级的环形序列，之后每个时间桶落盘时同步追加一条记录
+        """
+        with self._lock:
+            for k, ring_file in enumerate(store.files):
+                loaded = 0
+                for record in ring_file.records():
+                    ts = record[0]
+                    for i, metric in enumerate(self.metrics):
+                        self._tiers[metric][k].series.append(ts, *record[1 + 3 * i:4 + 3 * i])
+                    loaded += 1
+                logger.info(f"已恢复 {ring_file.resolution}s 粒度历史 {loaded} 条")
+            self._store = store
+
+    def close(self):
+        """关闭持久化存储"""
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+    def record(self, ts: float, status: SystemStatus):
+        """记录一次采样"""
+        with self._lock:
+            self._record_locked(ts, status)
+
+    def record_many(self, samples: Iterable[Tuple[float, SystemStatus]]):
+        """批量记录多次采样（按时间顺序），整批只加一次锁"""
+        with self._lock:
+            for ts, status in samples:
+                self._record_locked(ts, status)
+
+    def _record_locked(self, ts: float, status: SystemStatus):
+        values = [float(getattr(status, metric)) for metric in self.metrics]
+        for k in range(len(self.tiers)):
+            flushed = [
+                self._tiers[metric][k].add(ts, value)
+                for metric, value in zip(self.metrics, values)
+            ]
+            if self._store is not None and flushed[0] is not None:
+                self._store.append(k, flushed[0][0], [v for point in flushed for v in point[1:]])
+
+    def _select_tier(self, metric: str, start: float, step: Optional[int]) -> _Tier:
+        """
+        选择查询层级：
+        覆盖查询起点的层级中，取分辨率不超过 step 的最粗层级；
+        未指定 step 时取覆盖起点的最细层级。
+        没有层级能覆盖起点时（查询时长超过已有历史），取最早数据最早的层级，
+        即保存历史最长的层级
+        """
+        tiers = self._tiers[metric]
+        filled = [t for t in tiers if t.series.oldest() is not None]
+        covering = [t for t in filled if t.series.oldest() <= start]
+        if not covering:
+            # min 在并列时返回靠前（更细）的层级
+            return min(filled, key=lambda t: t.series.oldest()) if filled else tiers[0]
+        if step is None:
+            return covering[0]
+        fitting = [t for t in covering if t.resolution <= step]
+        return fitting[-1] if fitting else covering[0]
+
+    def query(
+        self,
+        metric: str,
+        start: float,
+        end: float,
+        step: Optional[int] = None
+    ) -> Tuple[int, List[MetricPoint]]:
+        """
+        查询指标历史
+
+        Args:
+            metric: 指标名
+            start: 起始时间戳（秒）
+            end: 结束时间戳（秒）
+            step: 期望的点间隔（秒），大于层级分辨率时再做合并
+
+        Returns:
+            (实际步长, 数据点列表)
+
+        Raises:
+            KeyError: 指标不存在
+        """
+        if metric not in self._tiers:
+            raise KeyError(metric)
+
+        with self._lock:
+            tier = self._select_tier(metric, start, step)
+            points = tier.series.range(start, end)
+            bucket = tier.bucket
+            if bucket.count and start <= bucket.start <= end:
+                points.append(bucket.point())
+
+        if step is None or step <= tier.resolution:
+            return tier.resolution, [
+                MetricPoint(timestamp=ts, min=vmin, avg=vavg, max=vmax)
+                for ts, vmin, vavg, vmax in points
+            ]
+
+        # 按 step 再次合并
+        merged: List[MetricPoint] = []
+        current = _Bucket()
+        for ts, vmin, vavg, vmax in points:
+            bucket_start = ts - ts % step
+            if current.count and current.start != bucket_start:
+                merged.append(_merged_point(current))
+                current = _Bucket()
+            if current.count == 0:
+                current.start = bucket_start
+                current.vmin, current.vmax = vmin, vmax
+            else:
+                current.vmin = min(current.vmin, vmin)
+                current.vmax = max(current.vmax, vmax)
+            current.total += vavg
+            current.count += 1
+        if current.count:
+            merged.append(_merged_point(current))
+        return step, merged
+
+
+def _merged_point(bucket: _Bucket) -> MetricPoint:
+    return MetricPoint(
+        timestamp=bucket.start,
+        min=bucket.vmin,
+        avg=bucket.total / bucket.count,
+        max=bucket.vmax
+    )
+
+
+# 全局单例
+metrics_history = MetricsHistory()
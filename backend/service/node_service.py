@@ -0,0 +1,136 @@
+"""
+多节点服务
+接收各节点 Agent 上报的采样数据，维护节点最新状态与内存历史
+"""
+import os
+import hmac
+import time
+import socket
+import threading
+from typing import Dict, List, Optional
+
+from schema.schemas import DockerContainer, NodeInfo, NodeReport, SystemStatus
+from service.history_service import MetricsHistory, metrics_history
+from service.system_service import get_system_status
+
+# 本机节点名
+LOCAL_NODE = os.getenv("NODE_NAME", "local")
+
+# Agent 上报共享密钥，未配置时不接受上报
+AGENT_TOKEN = os.getenv("AGENT_TOKEN", "")
+
+# 超过该时长（秒）未上报的节点视为离线
+NODE_TIMEOUT = float(os.getenv("NODE_TIMEOUT", "30"))
+
+
+def verify_agent_token(token: Optional[str]) -> bool:
+    """校验 Agent 上报密钥"""
+    if not AGENT_TOKEN or not token:
+        return False
+    # 按字节比较：str 含非 ASCII 字符时 compare_digest 会抛 TypeError
+    return hmac.compare_digest(token.encode(), AGENT_TOKEN.encode())
+
+
+class RemoteNode:
+    """远程节点状态"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.last_seen: Optional[float] = None
+        self.last_sample: float = 0.0
+        self.status: Optional[SystemStatus] = None
+        self.containers: Optional[List[DockerContainer]] = None
+        self.history = MetricsHistory()
+
+    @property
+    def online(self) -> bool:
+        return self.last_seen is not None and time.time() - self.last_seen < NODE_TIMEOUT
+
+    def info(self) -> NodeInfo:
+        return NodeInfo(
+            name=self.name,
+            online=self.online,
+            last_seen=self.last_seen,
+            status=self.status,
+            container_count=len(self.containers) if self.containers is not None else None
+        )
+
+
+class NodeRegistry:
+    """
+    节点注册表
+    每次上报整批写入节点历史（一次加锁），乱序或重复的采样直接丢弃
+    """
+
+    def __init__(self):
+        self._nodes: Dict[str, RemoteNode] = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, report: NodeReport) -> int:
+        """
+        写入一次上报
+
+        Returns:
+            实际写入的采样数
+        """
+        with self._lock:
+            node = self._nodes.get(report.node)
+            if node is None:
+                node = self._nodes[report.node] = RemoteNode(report.node)
+
+        samples = sorted(
+            (s for s in report.samples if s.timestamp > node.last_sample),
+            key=lambda s: s.timestamp
+        )
+        if samples:
+            node.history.record_many((s.timestamp, s.status) for s in samples)
+            node.last_sample = samples[-1].timestamp
+            node.status = samples[-1].status
+        if report.containers is not None:
+            node.containers = report.containers
+        node.last_seen = time.time()
+        return len(samples)
+
+    def get(self, name: str) -> Optional[RemoteNode]:
+        return self._nodes.get(name)
+
+    async def list_nodes(self) -> List[NodeInfo]:
+        """本机在前，其余按名称排序"""
+        local = NodeInfo(
+            name=LOCAL_NODE,
+            is_local=True,
+            online=True,
+            last_seen=time.time(),
+            status=await get_system_status()
+        )
+        return [local] + [self._nodes[name].info() for name in sorted(self._nodes)]
+
+
+def is_local_node(node: Optional[str]) -> bool:
+    """未指定节点或指定本机节点"""
+    return node is None or node == LOCAL_NODE
+
+
+async def get_node_status(node: Optional[str]) -> Optional[SystemStatus]:
+    """获取指定节点最新状态，节点不存在返回 None"""
+    if is_local_node(node):
+        return await get_system_status()
+    remote = node_registry.get(node)
+    return remote.status if remote else None
+
+
+def get_node_history(node: Optional[str]) -> Optional[MetricsHistory]:
+    """获取指定节点的历史存储，节点不存在返回 None"""
+    if is_local_node(node):
+        return metrics_history
+    remote = node_registry.get(node)
+    return remote.history if remote else None
+
+
+def default_node_name() -> str:
+    """Agent 默认节点名（主机名）"""
+    return os.getenv("NODE_NAME") or socket.gethostname()
+
+
+# 全局单例
+node_registry = NodeRegistry()
@@ -0,0 +1,120 @@
+"""
+卡片地址自动选路
+根据后台健康探测的缓存结果与访问者所在网络，为每张卡片选出可用且最快的地址，
+不发起任何出站请求
+"""
+import os
+import ipaddress
+import logging
+from typing import Callable, List, Optional
+
+from fastapi import Request
+
+from model.card import Card
+from schema.schemas import ServiceStatus
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_networks(value: str) -> List:
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning(f"忽略无效的网段: {item}")
+    return networks
+
+
+# 额外视为局域网的网段（逗号分隔，如 Tailscale 的 100.64.0.0/10）；私有地址与回环地址始终视为局域网
+LAN_NETWORKS = _parse_networks(os.getenv("LAN_NETWORKS", ""))
+
+# 可信反向代理的地址或网段（逗号分隔）；只有直连方属于其中时才读取 X-Forwarded-For，
+# 未配置时忽略转发头，以直连地址判断访问者
+TRUSTED_PROXIES = _parse_networks(os.getenv("TRUSTED_PROXIES", ""))
+
+
+def is_lan_address(host: Optional[str]) -> bool:
+    """地址是否属于局域网"""
+    try:
+        ip = ipaddress.ip_address((host or "").strip())
+    except ValueError:
+        return False
+    return ip.is_private or ip.is_loopback or ip.is_link_local or any(ip in net for net in LAN_NETWORKS)
+
+
+def is_trusted_proxy(host: Optional[str]) -> bool:
+    """地址是否属于配置的可信反向代理"""
+    try:
+        ip = ipaddress.ip_address((host or "").strip())
+    except ValueError:
+        return False
+    return any(ip in net for net in TRUSTED_PROXIES)
+
+
+def client_address(request: Request) -> Optional[str]:
+    """
+    访问者地址
+
+    直连方为可信反向代理时，从 X-Forwarded-For 右侧起跳过可信代理，
+    取第一个不可信的地址（最左侧的值可由客户端任意伪造）；
+    其他直连方忽略转发头，防止伪造
+    """
+    peer = request.client.host if request.client else None
+    if not is_trusted_proxy(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not is_trusted_proxy(hop):
+                return hop
+        return hops[0] if hops else peer
+    return (request.headers.get("x-real-ip") or "").strip() or peer
+
+
+def is_lan_client(request: Request) -> bool:
+    """访问者是否位于局域网"""
+    return is_lan_address(client_address(request))
+
+
+def preferred_url(
+    card: Card,
+    lan: bool,
+    use_external: bool,
+    result_of: Callable[[str], Optional[ServiceStatus]]
+) -> Optional[str]:
+    """
+    选出卡片应使用的地址
+
+    局域网访问者两个地址都能到达，选在线且探测延迟更低的；
+    外部访问者通常无法直达内网地址，外网地址在线即选外网；
+    没有可用的探测结果时沿用手动的内外网设置
+
+    Args:
+        card: 卡片
+        lan: 访问者是否位于局域网
+        use_external: 用户手动设置的内外网模式
+        result_of: 读取地址缓存探测结果的函数
+    """
+    internal, external = card.internal_url or None, card.external_url or None
+    if not internal or not external:
+        return internal or external
+
+    fallback = external if use_external else internal
+    live = []
+    for order, url in enumerate((internal, external)):
+        result = result_of(url.strip())
+        if result is not None and result.is_online:
+            latency = result.response_time if result.response_time is not None else float("inf")
+            live.append((latency, order, url))
+
+    if lan:
+        # 延迟相同时内网地址优先
+        return min(live)[2] if live else fallback
+    if any(url == external for _, _, url in live):
+        return external
+    return fallback
@@ -0,0 +1,147 @@
+"""
+排序服务
+拖动排序时以一条参数化 UPDATE 批量执行（executemany）写入全部排序项，
+只需一次往返与一个事务，查询数与条目数无关；
+版本号为该用户卡片 / 分组最近的修改时间（毫秒，含删除），用于拒绝基于过期顺序的排序；
+排序先写入版本行取得 SQLite 写锁再读取版本，并发的排序请求不会都通过校验
+"""
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import bindparam, case, func, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from model.card import Card
+from model.group import Group
+from model.sort_version import SortVersion
+from schema.schemas import SortItem
+
+
+class SortError(ValueError):
+    """排序请求不合法"""
+
+
+class SortConflict(SortError):
+    """排序基于的版本已过期（其他页面修改过）"""
+
+
+def _to_version(value: datetime) -> int:
+    """updated_at（不带时区的 UTC 时间）转换为毫秒版本号"""
+    seconds = int(value.replace(microsecond=0, tzinfo=timezone.utc).timestamp())
+    return seconds * 1000 + value.microsecond // 1000
+
+
+def _from_version(version: int) -> datetime:
+    """毫秒版本号转换为 updated_at，往返无精度损失"""
+    return datetime.fromtimestamp(version // 1000, timezone.utc).replace(
+        microsecond=version % 1000 * 1000, tzinfo=None
+    )
+
+
+def current_version(db: Session, model, user_id: int) -> int:
+    """该用户全部卡片或分组中最近的修改或删除时间（毫秒），没有记录时为 0"""
+    latest = db.query(func.max(model.updated_at)).filter(model.user_id == user_id).scalar()
+    touched = db.query(SortVersion.version).filter(
+        SortVersion.user_id == user_id, SortVersion.scope == model.__tablename__
+    ).scalar()
+    return max(_to_version(latest) if latest else 0, touched or 0)
+
+
+def touch_version(db: Session, model, user_id: int, version: Optional[int] = None):
+    """
+    推进版本号（调用方负责提交事务）
+
+    删除等不会留下 updated_at 的修改需调用，使之前的版本号失效；
+    该语句同时取得写锁，事务提交前同一用户的其他排序在此等待
+
+    Args:
+        version: 新版本号，为空时取当前时间且大于现有版本；不会使已记录的版本回退
+    """
+    if version is None:
+        version = max(time.time_ns() // 1_000_000, current_version(db, model, user_id) + 1)
+    stmt = insert(SortVersion).values(user_id=user_id, scope=model.__tablename__, version=version)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "scope"],
+        set_={"version": func.max(SortVersion.version, stmt.excluded.version)}
+    )
+    db.execute(stmt)
+
+
+def bulk_sort(
+    db: Session,
+    model,
+    user_id: int,
+    items: List[SortItem],
+    move_groups: bool = False,
+    expected_version: Optional[int] = None
+) -> int:
+    """
+    批量更新排序（调用方负责提交事务）
+
+    每行按 (id, user_id) 匹配，不存在或不属于该用户的 id 被忽略；
+    受影响的行 updated_at 统一写为本次版本对应的时间
+
+    Args:
+        db: 数据库会话
+        model: Card 或 Group
+        user_id: 当前用户 ID
+        items: 排序项，同一 id 出现多次时以最后一次为准
+        move_groups: 是否同时按 group_id 更新所属分组（仅卡片，支持跨组拖动）
+        expected_version: 客户端顺序所基于的版本，为空时不校验
+
+    Returns:
+        新版本号（毫秒时间戳），客户端下次排序时带上即可跳过重新拉取
+
+    Raises:
+        SortConflict: 排序或其他修改已在此版本之后发生
+        SortError: 目标分组不属于该用户
+    """
+    # 先写后读：写锁保证读到的版本在本事务提交前不会被其他请求改变
+    touch_version(db, model, user_id, 0)
+    current = current_version(db, model, user_id)
+    if expected_version is not None and expected_version < current:
+        raise SortConflict("排序已在其他页面修改，请刷新后重试")
+    if not items:
+        return current
+    # 版本号严格递增，不受时钟回拨或同一毫秒内多次写入影响
+    version = max(time.time_ns() // 1_000_000, current + 1)
+
+    table = model.__table__
+    rows = {item.id: {"_id": item.id, "_order": item.sort_order} for item in items}
+    values = {
+        "sort_order": bindparam("_order"),
+        "updated_at": _from_version(version),
+    }
+
+    if move_groups:
+        # group_id 为空表示不改变分组，<= 0 表示移出分组
+        for item in items:
+            row = rows[item.id]
+            row["_move"] = item.group_id is not None
+            row["_group"] = item.group_id if item.group_id and item.group_id > 0 else None
+        group_ids = {row["_group"] for row in rows.values() if row["_group"] is not None}
+        if group_ids:
+            owned = db.query(Group.id).filter(Group.id.in_(group_ids), Group.user_id == user_id).count()
+            if owned != len(group_ids):
+                raise SortError("分组不存在")
+        values["group_id"] = case((bindparam("_move"), bindparam("_group")), else_=table.c.group_id)
+
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("_id"), table.c.user_id == user_id)
+        .values(**values)
+    )
+    db.execute(stmt, list(rows.values()))
+    return version
+
+
+def sort_cards(db: Session, user_id: int, items: List[SortItem], expected_version: Optional[int] = None) -> int:
+    """批量更新卡片排序与所属分组"""
+    return bulk_sort(db, Card, user_id, items, move_groups=True, expected_version=expected_version)
+
+
+def sort_groups(db: Session, user_id: int, items: List[SortItem], expected_version: Optional[int] = None) -> int:
+    """批量更新分组排序"""
+    return bulk_sort(db, Group, user_id, items, expected_version=expected_version)
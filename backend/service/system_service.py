@@ -2,37 +2,83 @@
 系统监控服务
 获取 CPU、内存、磁盘等系统状态信息
 """
+import os
+import time
+import heapq
+import select
+import asyncio
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
 import psutil
-from schema.schemas import SystemStatus
+from schema.schemas import SystemStatus, NetworkIO, DiskIO, DiskUsage, ProcessInfo
+from service.history_service import metrics_history
+from service.broadcast_service import Broadcaster
+from service.alert_service import alert_engine
+
+logger = logging.getLogger(__name__)
+
+# 后台采样间隔（秒），与指标历史最细的 1s 层级一致
+SAMPLE_INTERVAL = float(os.getenv("SYSTEM_SAMPLE_INTERVAL", "1"))
+
+# 不统计的网卡 / 磁盘设备前缀
+IGNORED_INTERFACES = ("lo",)
+IGNORED_DISK_PREFIXES = ("loop", "ram", "zram")
+
+# 额外统计的挂载路径（逗号分隔），用于容器内的 bind mount，如 "/mnt/data,/mnt/media"
+DISK_MOUNTS = [p.strip() for p in os.getenv("DISK_MOUNTS", "").split(",") if p.strip()]
+
+# 挂载点容量刷新间隔（秒），容量变化缓慢，无需每个采样周期都 statvfs
+DISK_USAGE_INTERVAL = float(os.getenv("DISK_USAGE_INTERVAL", "30"))
 
+# 非真实存储的文件系统类型
+VIRTUAL_FSTYPES = {
+    "overlay", "tmpfs", "devtmpfs", "squashfs", "proc", "sysfs", "cgroup", "cgroup2",
+    "devpts", "mqueue", "autofs", "debugfs", "tracefs", "securityfs", "pstore",
+    "bpf", "fusectl", "configfs", "hugetlbfs", "nsfs", "ramfs", "efivarfs", "binfmt_misc",
+}
 
-def get_system_status() -> SystemStatus:
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+# 最近一次查询进程列表后，采样器继续刷新进程表的时长（秒）；无人查看时不扫描进程
+PROCESS_ACTIVE_WINDOW = float(os.getenv("PROCESS_ACTIVE_WINDOW", "60"))
+
+# 进程表超过该时长（秒）未刷新时，各进程的 CPU 基准已失效（新进程则没有基准），
+# 该次刷新只作预热，下一个采样周期的刷新结果才对外提供
+PROCESS_STALE_AFTER = 5.0
+
+
+def collect_system_status() -> SystemStatus:
     """
-    获取当前系统状态信息
-    
+    采集一次系统状态（同步、非阻塞 CPU 采样）
+
+    CPU 使用率使用 interval=None，与上一次调用之间的差值计算，
+    因此需要由采样器按固定周期调用才能得到有意义的数值。
+
     Returns:
         SystemStatus 对象，包含 CPU、内存、磁盘使用率
     """
-    # CPU 使用率（采样间隔 0.5 秒以获取更准确的值）
-    cpu_percent = psutil.cpu_percent(interval=0.5)
-    
+    cpu_percent = psutil.cpu_percent(interval=None)
+    cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
+
     # 内存信息
     memory = psutil.virtual_memory()
     memory_percent = memory.percent
     memory_used = memory.used
     memory_total = memory.total
-    
+
     # 磁盘信息（默认获取根分区）
     try:
         disk = psutil.disk_usage("/")
     except Exception:
         # Windows 系统使用 C 盘
         disk = psutil.disk_usage("C:\\")
-    
+
     disk_percent = disk.percent
     disk_used = disk.used
     disk_total = disk.total
-    
+
     return SystemStatus(
         cpu_percent=cpu_percent,
         memory_percent=memory_percent,
@@ -40,10 +86,376 @@ def get_system_status() -> SystemStatus:
         memory_total=memory_total,
         disk_percent=disk_percent,
         disk_used=disk_used,
-        disk_total=disk_total
+        disk_total=disk_total,
+        cpu_per_core=cpu_per_core
     )
 
 
+def _rate(current: int, previous: int, elapsed: float) -> float:
+    """计数器差值转换为每秒速率，计数器回绕或重置时记为 0"""
+    delta = current - previous
+    return round(delta / elapsed, 2) if delta > 0 else 0.0
+
+
+class IORateTracker:
+    """
+    网络 / 磁盘 IO 速率计算
+    缓存上一次的累计计数器，由相邻两次采样的差值计算速率
+    """
+
+    def __init__(self):
+        self._last_time: Optional[float] = None
+        self._last_net: Dict[str, tuple] = {}
+        self._last_disk: Dict[str, tuple] = {}
+
+    def sample(self, now: float) -> Tuple[List[NetworkIO], List[DiskIO]]:
+        """
+        读取一次计数器并计算速率
+
+        首次调用只记录基准值，返回空列表
+        """
+        net = psutil.net_io_counters(pernic=True) or {}
+        try:
+            disk = psutil.disk_io_counters(perdisk=True) or {}
+        except Exception:
+            # 部分容器环境无法读取磁盘计数器
+            disk = {}
+
+        network: List[NetworkIO] = []
+        disk_io: List[DiskIO] = []
+        if self._last_time is not None and now > self._last_time:
+            elapsed = now - self._last_time
+            for name, c in net.items():
+                prev = self._last_net.get(name)
+                if prev is None or name.startswith(IGNORED_INTERFACES):
+                    continue
+                network.append(NetworkIO(
+                    interface=name,
+                    bytes_sent_per_sec=_rate(c.bytes_sent, prev.bytes_sent, elapsed),
+                    bytes_recv_per_sec=_rate(c.bytes_recv, prev.bytes_recv, elapsed),
+                    packets_sent_per_sec=_rate(c.packets_sent, prev.packets_sent, elapsed),
+                    packets_recv_per_sec=_rate(c.packets_recv, prev.packets_recv, elapsed)
+                ))
+            for name, c in disk.items():
+                prev = self._last_disk.get(name)
+                if prev is None or name.startswith(IGNORED_DISK_PREFIXES):
+                    continue
+                disk_io.append(DiskIO(
+                    device=name,
+                    read_bytes_per_sec=_rate(c.read_bytes, prev.read_bytes, elapsed),
+                    write_bytes_per_sec=_rate(c.write_bytes, prev.write_bytes, elapsed),
+                    read_iops=_rate(c.read_count, prev.read_count, elapsed),
+                    write_iops=_rate(c.write_count, prev.write_count, elapsed)
+                ))
+
+        self._last_time = now
+        self._last_net = net
+        self._last_disk = disk
+        return network, disk_io
+
+
+class DiskUsageTracker:
+    """
+    多挂载点容量统计
+
+    分区列表会缓存，仅在挂载表变化时重新发现：Linux 上对 /proc/self/mountinfo
+    做 poll，内核会在挂载/卸载后报告 POLLPRI；其他平台按容量刷新周期重新发现。
+    所有挂载点的 statvfs 在同一轮中批量完成
+    """
+
+    def __init__(self, extra_paths: List[str] = DISK_MOUNTS, interval: float = DISK_USAGE_INTERVAL):
+        self.extra_paths = extra_paths
+        self.interval = interval
+        self._partitions: Optional[List[Tuple[str, str, str]]] = None
+        self._usage: List[DiskUsage] = []
+        self._last_time = 0.0
+        self._poller = None
+        try:
+            self._mountinfo = open(MOUNTINFO_PATH, "rb")
+            self._poller = select.poll()
+            self._poller.register(self._mountinfo, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            # 非 Linux 平台
+            self._poller = None
+
+    def _mounts_changed(self) -> bool:
+        """挂载表是否发生变化"""
+        if self._poller is None:
+            return True
+        return bool(self._poller.poll(0))
+
+    def _discover(self) -> List[Tuple[str, str, str]]:
+        """
+        发现真实挂载点
+
+        过滤虚拟文件系统与文件级 bind mount（如容器内的 /etc/hosts），
+        同一设备只保留一个挂载点；DISK_MOUNTS 中的路径始终保留
+
+        Returns:
+            (device, mountpoint, fstype) 列表
+        """
+        result = []
+        seen_devices = set()
+        seen_mounts = set()
+        for part in psutil.disk_partitions(all=False):
+            if part.fstype in VIRTUAL_FSTYPES or not os.path.isdir(part.mountpoint):
+                continue
+            if part.device in seen_devices:
+                continue
+            seen_devices.add(part.device)
+            seen_mounts.add(part.mountpoint)
+            result.append((part.device, part.mountpoint, part.fstype))
+        for path in self.extra_paths:
+            if path not in seen_mounts and os.path.isdir(path):
+                seen_mounts.add(path)
+                result.append(("", path, ""))
+        return result
+
+    def sample(self, now: float) -> List[DiskUsage]:
+        """返回各挂载点容量，未到刷新周期且挂载表未变时直接返回缓存"""
+        changed = self._partitions is None or self._mounts_changed()
+        if not changed and now - self._last_time < self.interval:
+            return self._usage
+
+        if changed:
+            self._partitions = self._discover()
+            logger.info(f"发现 {len(self._partitions)} 个挂载点")
+
+        usage = []
+        for device, mountpoint, fstype in self._partitions:
+            try:
+                du = psutil.disk_usage(mountpoint)
+            except OSError:
+                continue
+            usage.append(DiskUsage(
+                mountpoint=mountpoint,
+                device=device,
+                fstype=fstype,
+                total=du.total,
+                used=du.used,
+                free=du.free,
+                percent=du.percent
+            ))
+        self._usage = usage
+        self._last_time = now
+        return usage
+
+
+class ProcessTracker:
+    """
+    进程资源统计
+
+    持久保存 pid -> psutil.Process 映射，cpu_percent(None) 基于同一对象上次调用的差值
+    增量计算，无需阻塞采样；已退出的进程在刷新时剔除。
+    刷新只由采样线程进行，查询只读缓存的进程表并做部分排序（堆），只取 top N
+    """
+
+    def __init__(self):
+        self._procs: Dict[int, psutil.Process] = {}
+        self._rows: List[tuple] = []  # (cpu, rss, pid, name, username, status)
+        self._rows_at = float("-inf")
+        self._memory_total = psutil.virtual_memory().total
+        self._refreshed_at = float("-inf")
+        self._requested_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """最近是否有人查询，决定采样器是否继续刷新"""
+        return time.monotonic() - self._requested_at < PROCESS_ACTIVE_WINDOW
+
+    @property
+    def stale(self) -> bool:
+        """缓存的进程表是否已过期（长时间无人查询后尚未重新刷新）"""
+        return time.monotonic() - self._rows_at > PROCESS_STALE_AFTER
+
+    def refresh(self):
+        """
+        刷新进程表（同步，在采样线程中调用）
+
+        psutil 对每个 Process 对象第一次调用 cpu_percent(None) 恒返回 0；
+        空闲一段时间后的首次刷新只预热全部进程，保留原进程表，
+        下一个采样周期再读取，保证 CPU 排序有效，任何调用方都无需等待
+        """
+        with self._lock:
+            primed = time.monotonic() - self._refreshed_at <= PROCESS_STALE_AFTER
+            rows = self._scan()
+            self._refreshed_at = time.monotonic()
+            if primed:
+                self._rows = rows
+                self._rows_at = self._refreshed_at
+
+    def _scan(self) -> List[tuple]:
+        pids = set(psutil.pids())
+        for pid in self._procs.keys() - pids:
+            del self._procs[pid]
+
+        rows = []
+        for pid in pids:
+            proc = self._procs.get(pid)
+            try:
+                if proc is None:
+                    proc = self._procs[pid] = psutil.Process(pid)
+                with proc.oneshot():
+                    rows.append((
+                        proc.cpu_percent(None),
+                        proc.memory_info().rss,
+                        pid,
+                        proc.name(),
+                        proc.username(),
+                        proc.status()
+                    ))
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._procs.pop(pid, None)
+            except psutil.AccessDenied:
+                continue
+        return rows
+
+    def top(self, n: int, sort: str = "cpu") -> List[ProcessInfo]:
+        """
+        获取资源占用最高的 N 个进程
+
+        只读缓存，不扫描进程；进程表已过期时返回上次的结果（标记为过期，
+        首次查询时为空），采样器随后开始刷新，约两个采样周期后可得到最新结果
+
+        Args:
+            n: 返回数量
+            sort: cpu 或 mem
+        """
+        self._requested_at = time.monotonic()
+        index = 1 if sort == "mem" else 0
+        rows = heapq.nlargest(n, self._rows, key=lambda row: row[index])
+        stale = self.stale
+        return [
+            ProcessInfo(
+                pid=pid,
+                name=name,
+                username=username,
+                status=proc_status,
+                cpu_percent=round(cpu, 1),
+                memory_percent=round(rss / self._memory_total * 100, 2),
+                memory_rss=rss,
+                stale=stale
+            )
+            for cpu, rss, pid, name, username, proc_status in rows
+        ]
+
+
+class SystemSampler:
+    """
+    系统状态后台采样器
+    按固定周期在线程池中采集一次系统状态，存入共享快照；
+    API 请求只读取快照，不再阻塞事件循环。
+    每次采样后将序列化好的快照广播给所有 SSE 订阅者
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        """初始化采样器"""
+        self.interval = interval
+        self._snapshot: Optional[SystemStatus] = None
+        self._task: Optional[asyncio.Task] = None
+        self._io = IORateTracker()
+        self._disks = DiskUsageTracker()
+        self.processes = ProcessTracker()
+        self.broadcaster = Broadcaster()
+        # 采样会推进 IO 计数器与历史桶，同一时刻只允许一个线程采样
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Optional[SystemStatus]:
+        """最近一次采样结果"""
+        return self._snapshot
+
+    def sample(self) -> SystemStatus:
+        """同步采集一次，更新快照并写入历史"""
+        with self._lock:
+            return self._sample_locked()
+
+    def first_snapshot(self) -> SystemStatus:
+        """
+        返回快照，尚无快照时采集一次（阻塞，应在线程中调用）
+
+        与采样线程互斥：若采样线程正在产出首个快照，等待后直接复用，不重复采集
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return self._sample_locked()
+            return self._snapshot
+
+    def _sample_locked(self) -> SystemStatus:
+        now = time.time()
+        snapshot = collect_system_status()
+        snapshot.network, snapshot.disk_io = self._io.sample(now)
+        snapshot.disks = self._disks.sample(now)
+        self._snapshot = snapshot
+        metrics_history.record(now, snapshot)
+        if self.processes.active:
+            self.processes.refresh()
+        return snapshot
+
+    async def _run(self):
+        """采样循环"""
+        while True:
+            try:
+                snapshot = await asyncio.to_thread(self.sample)
+                if self.broadcaster.subscriber_count:
+                    self.broadcaster.publish(snapshot.model_dump_json())
+                events = alert_engine.evaluate(time.time(), snapshot)
+                if events:
+                    alert_engine.dispatch(events)
+            except Exception as e:
+                logger.error(f"系统状态采样失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """启动后台采样任务（需在事件循环中调用）"""
+        if self._task is None or self._task.done():
+            # 预热 CPU / IO 计数器，使首个周期的数值有效
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None, percpu=True)
+            self._io.sample(time.time())
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"系统状态采样器已启动，间隔 {self.interval}s")
+
+    async def stop(self):
+        """停止后台采样任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 全局单例（首次使用时创建，导入本模块不读取挂载表、不查询内存信息）
+_sampler: Optional[SystemSampler] = None
+
+
+def get_sampler() -> SystemSampler:
+    """获取全局采样器，首次调用时创建"""
+    global _sampler
+    if _sampler is None:
+        _sampler = SystemSampler()
+    return _sampler
+
+
+async def get_system_status() -> SystemStatus:
+    """
+    获取当前系统状态信息
+
+    优先返回后台采样器的共享快照；采样器尚未产出数据时在线程池中等待首个快照，不阻塞事件循环
+
+    Returns:
+        SystemStatus 对象，包含 CPU、内存、磁盘使用率
+    """
+    sampler = get_sampler()
+    snapshot = sampler.snapshot
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(sampler.first_snapshot)
+    return snapshot
+
+
 def format_bytes(bytes_value: int) -> str:
     """
     将字节数格式化为人类可读的字符串
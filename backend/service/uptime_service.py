@@ -0,0 +1,281 @@
+"""
+服务在线率历史
+每次后台探测结果累加到按小时 / 按天分桶的计数与延迟分位数草图，
+汇总时只合并覆盖时间范围的少量桶，不扫描原始探测记录；
+变化的桶定期批量写回 SQLite，重启后恢复
+"""
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.dialects.sqlite import insert
+
+from repository.database import SessionLocal
+from model.health_bucket import HealthBucket
+from schema.schemas import ServiceStatus, UptimeSummary
+
+logger = logging.getLogger(__name__)
+
+# 分桶层级：(桶时长秒数, 保留时长秒数)
+# 小时桶保留 25 小时用于 24h 汇总，天桶保留 31 天用于 7d / 30d 汇总
+UPTIME_TIERS = (
+    (3600, 25 * 3600),
+    (86400, 31 * 86400),
+)
+
+# 可查询的最大时长（秒）
+UPTIME_MAX_RANGE = 30 * 86400
+
+# 变化的桶写回数据库的间隔（秒）
+UPTIME_FLUSH_INTERVAL = float(os.getenv("UPTIME_FLUSH_INTERVAL", "60"))
+
+# 延迟草图的相对误差，分位数估计值与真实值相差不超过该比例
+SKETCH_ACCURACY = 0.02
+# 低于该延迟（ms）的样本计入最小的桶
+SKETCH_MIN_VALUE = 0.01
+
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class LatencySketch:
+    """
+    对数分桶的延迟分位数草图（DDSketch）
+
+    样本 v 落入下标 ceil(log_γ v) 的桶，桶内取 2γ^i/(γ+1) 作为估计值，
+    相对误差恒定；只保存非空桶的计数，可直接相加合并
+    """
+
+    __slots__ = ("bins", "count")
+
+    def __init__(self, bins: Optional[Dict[int, int]] = None):
+        self.bins: Dict[int, int] = bins or {}
+        self.count = sum(self.bins.values())
+
+    def add(self, value: float):
+        index = math.ceil(math.log(max(value, SKETCH_MIN_VALUE)) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other: "LatencySketch"):
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += other.count
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """按升序的分位点一次遍历求出估计值"""
+        qs = list(qs)
+        if not self.count:
+            return [None] * len(qs)
+        results = []
+        items = sorted(self.bins.items())
+        position, running = 0, items[0][1]
+        for q in qs:
+            rank = q * (self.count - 1)
+            while running <= rank and position < len(items) - 1:
+                position += 1
+                running += items[position][1]
+            results.append(2 * _GAMMA ** items[position][0] / (_GAMMA + 1))
+        return results
+
+    def dumps(self) -> str:
+        return json.dumps(self.bins, separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, data: Optional[str]) -> "LatencySketch":
+        return cls({int(k): v for k, v in json.loads(data or "{}").items()})
+
+
+class UptimeBucket:
+    """单个时间桶的探测统计"""
+
+    __slots__ = ("start", "total", "up", "latency_sum", "sketch", "dirty")
+
+    def __init__(self, start: int, total: int = 0, up: int = 0,
+                 latency_sum: float = 0.0, sketch: Optional[LatencySketch] = None):
+        self.start = start
+        self.total = total
+        self.up = up
+        self.latency_sum = latency_sum
+        self.sketch = sketch or LatencySketch()
+        self.dirty = False
+
+
+class UptimeHistory:
+    """
+    全部探测地址的在线率历史
+
+    记录与汇总都在事件循环中进行，写回数据库在线程池中执行，
+    两者通过锁交接变化的桶
+    """
+
+    def __init__(self, tiers: Tuple[Tuple[int, int], ...] = UPTIME_TIERS):
+        self.tiers = tiers
+        # (url, 桶时长) -> {桶起点: 桶}，按起点升序插入
+        self._series: Dict[Tuple[str, int], Dict[int, UptimeBucket]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def record(self, status: ServiceStatus):
+        """累加一次探测结果"""
+        ts = status.checked_at or time.time()
+        latency = status.response_time if status.is_online else None
+        with self._lock:
+            for resolution, retention in self.tiers:
+                buckets = self._series[(status.url, resolution)]
+                start = int(ts // resolution * resolution)
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = UptimeBucket(start)
+                    self._prune(buckets, ts - retention)
+                bucket.total += 1
+                if status.is_online:
+                    bucket.up += 1
+                if latency is not None:
+                    bucket.latency_sum += latency
+                    bucket.sketch.add(latency)
+                bucket.dirty = True
+
+    @staticmethod
+    def _prune(buckets: Dict[int, UptimeBucket], cutoff: float):
+        for start in [s for s in buckets if s < cutoff]:
+            del buckets[start]
+
+    def _tier_for(self, seconds: int) -> int:
+        """能覆盖该时长的最细分桶"""
+        for resolution, retention in self.tiers:
+            if retention >= seconds + resolution:
+                return resolution
+        return self.tiers[-1][0]
+
+    def summary(self, url: str, seconds: int, label: str) -> UptimeSummary:
+        """
+        汇总最近一段时间的在线率与延迟分位数
+
+        时间范围按桶对齐，最早的桶可能只有部分落在范围内
+        """
+        resolution = self._tier_for(seconds)
+        cutoff = time.time() - seconds
+        total = up = 0
+        latency_sum = 0.0
+        sketch = LatencySketch()
+        with self._lock:
+            for bucket in self._series.get((url, resolution), {}).values():
+                if bucket.start + resolution <= cutoff:
+                    continue
+                total += bucket.total
+                up += bucket.up
+                latency_sum += bucket.latency_sum
+                sketch.merge(bucket.sketch)
+
+        p50, p95, p99 = sketch.quantiles((0.5, 0.95, 0.99))
+        return UptimeSummary(
+            url=url,
+            range=label,
+            total=total,
+            up=up,
+            uptime_percent=round(up * 100 / total, 3) if total else None,
+            avg=round(latency_sum / sketch.count, 2) if sketch.count else None,
+            p50=round(p50, 2) if p50 is not None else None,
+            p95=round(p95, 2) if p95 is not None else None,
+            p99=round(p99, 2) if p99 is not None else None
+        )
+
+    def load(self):
+        """从数据库恢复保留期内的桶，并删除过期的行"""
+        now = time.time()
+        db = SessionLocal()
+        try:
+            self._delete_expired(db, now)
+            for resolution, _ in self.tiers:
+                rows = db.query(HealthBucket).filter(
+                    HealthBucket.resolution == resolution
+                ).order_by(HealthBucket.start).all()
+                with self._lock:
+                    for row in rows:
+                        self._series[(row.url, resolution)][row.start] = UptimeBucket(
+                            row.start, row.total or 0, row.up or 0, row.latency_sum or 0.0,
+                            LatencySketch.loads(row.sketch)
+                        )
+            db.commit()
+        finally:
+            db.close()
+        logger.info(f"已恢复 {len(self._series)} 条在线率历史")
+
+    def _delete_expired(self, db, now: float):
+        for resolution, retention in self.tiers:
+            db.query(HealthBucket).filter(
+                HealthBucket.resolution == resolution, HealthBucket.start < int(now - retention)
+            ).delete(synchronize_session=False)
+
+    def flush(self) -> int:
+        """
+        将变化的桶批量写回数据库（阻塞，应在线程中调用）
+
+        所有行在一个事务内以一条 INSERT ... ON CONFLICT DO UPDATE 批量提交
+
+        Returns:
+            写入的行数
+        """
+        rows = []
+        now = time.time()
+        retentions = dict(self.tiers)
+        with self._lock:
+            # 不再探测的地址，最后一个桶过期后整体移除
+            for key in [k for k, b in self._series.items() if not b or max(b) < now - retentions[k[1]]]:
+                del self._series[key]
+            for (url, resolution), buckets in self._series.items():
+                for bucket in buckets.values():
+                    if not bucket.dirty:
+                        continue
+                    bucket.dirty = False
+                    rows.append({
+                        "url": url,
+                        "resolution": resolution,
+                        "start": bucket.start,
+                        "total": bucket.total,
+                        "up": bucket.up,
+                        "latency_sum": bucket.latency_sum,
+                        "sketch": bucket.sketch.dumps(),
+                    })
+        if not rows:
+            return 0
+
+        stmt = insert(HealthBucket)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["url", "resolution", "start"],
+            set_={
+                "total": stmt.excluded.total,
+                "up": stmt.excluded.up,
+                "latency_sum": stmt.excluded.latency_sum,
+                "sketch": stmt.excluded.sketch,
+            }
+        )
+        db = SessionLocal()
+        try:
+            db.execute(stmt, rows)
+            self._delete_expired(db, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._mark_dirty(rows)
+            raise
+        finally:
+            db.close()
+        return len(rows)
+
+    def _mark_dirty(self, rows: List[dict]):
+        """写入失败时恢复变化标记，下次重试"""
+        with self._lock:
+            for row in rows:
+                bucket = self._series.get((row["url"], row["resolution"]), {}).get(row["start"])
+                if bucket is not None:
+                    bucket.dirty = True
+
+
+# 全局单例
+uptime_history = UptimeHistory()
@@ -0,0 +1,8 @@
+"""
+测试配置
+后端模块以 backend 目录为根导入（如 from service.xxx import ...）
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
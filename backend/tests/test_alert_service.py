@@ -0,0 +1,93 @@
+"""
+告警规则判定：挂载点选择、容器事件规则与规则校验
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from api.alerts import validate_rule
+from service.alert_service import AlertEngine
+from schema.schemas import DiskUsage, SystemStatus
+
+
+def _rule(rule_id: int, metric: str, threshold: float, comparator: str = ">", target=None, for_seconds=0):
+    return SimpleNamespace(
+        id=rule_id, user_id=1, name=f"rule-{rule_id}", metric=metric, target=target,
+        comparator=comparator, threshold=threshold, for_seconds=for_seconds,
+        sink="log", webhook_url=None, enabled=True
+    )
+
+
+def _disk(mountpoint: str, percent: float) -> DiskUsage:
+    return DiskUsage(
+        mountpoint=mountpoint, device="/dev/sda1", fstype="ext4",
+        total=100, used=int(percent), free=100 - int(percent), percent=percent
+    )
+
+
+def _status(root_percent: float, disks=()) -> SystemStatus:
+    return SystemStatus(
+        cpu_percent=0, memory_percent=0, memory_used=0, memory_total=0,
+        disk_percent=root_percent, disk_used=0, disk_total=0, disks=list(disks)
+    )
+
+
+def test_disk_rule_reads_selected_mount():
+    engine = AlertEngine()
+    engine.load([_rule(1, "disk_percent", 95, target="/mnt/nas"), _rule(2, "disk_percent", 95)])
+
+    events = engine.evaluate(1.0, _status(10, [_disk("/", 10), _disk("/mnt/nas", 97)]))
+    assert [(e.rule_id, e.target, e.state) for e in events] == [(1, "/mnt/nas", "firing")]
+
+    # 挂载点缺失时保持原状态，不误报恢复
+    assert engine.evaluate(2.0, _status(10, [_disk("/", 10)])) == []
+    assert [r.id for r in engine.active()] == [1]
+
+    events = engine.evaluate(3.0, _status(10, [_disk("/mnt/nas", 50)]))
+    assert [(e.rule_id, e.state) for e in events] == [(1, "resolved")]
+
+
+def test_container_die_fires_per_container_and_resolves_on_start():
+    engine = AlertEngine()
+    engine.load([
+        _rule(1, "container_die", 0),
+        _rule(2, "container_oom", 0, target="db"),
+    ])
+
+    # 正常退出（退出码 0）不满足 > 0
+    assert engine.container_event(1.0, "local", "die", "web", 0) == []
+
+    events = engine.container_event(2.0, "local", "die", "web", 137)
+    assert [(e.rule_id, e.target, e.value, e.state) for e in events] == [(1, "web", 137.0, "firing")]
+    # 同一容器重复事件不重复通知
+    assert engine.container_event(2.5, "local", "die", "web", 137) == []
+
+    events = engine.container_event(3.0, "local", "oom", "db")
+    assert [(e.rule_id, e.target) for e in events] == [(2, "db")]
+    assert engine.container_event(3.0, "local", "oom", "web") == []
+
+    assert {(e.rule_id, e.target) for e in engine.active_events(1)} == {(1, "web"), (2, "db")}
+
+    events = engine.container_event(4.0, "local", "start", "web")
+    assert [(e.rule_id, e.target, e.state) for e in events] == [(1, "web", "resolved")]
+    assert [r.id for r in engine.active()] == [2]
+
+
+def test_reload_keeps_container_state():
+    engine = AlertEngine()
+    rules = [_rule(1, "container_die", 0)]
+    engine.load(rules)
+    engine.container_event(1.0, "local", "die", "web", 1)
+    engine.load(rules)
+    assert [e.target for e in engine.active_events()] == ["web"]
+
+
+def test_webhook_rule_requires_http_url():
+    validate_rule("cpu_percent", "webhook", webhook_url="https://hooks.example.com/x")
+    for url in (None, "", "ftp://example.com/x", "hooks.example.com", "http://"):
+        with pytest.raises(HTTPException) as exc:
+            validate_rule("cpu_percent", "webhook", webhook_url=url)
+        assert exc.value.status_code == 400
+    # 其他通知方式不要求地址
+    validate_rule("cpu_percent", "log")
@@ -0,0 +1,93 @@
+"""
+Docker 连接熔断器状态转换（假时钟）
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from service import docker_client
+from service.docker_client import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(docker_client, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+def test_starts_open_and_probes_immediately(clock):
+    breaker = CircuitBreaker(base_delay=1, max_delay=8)
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.available
+
+    # 首个请求即作为探测，探测期间其他请求不放行
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.available
+    assert breaker.allow()
+
+
+def test_failed_probes_back_off_exponentially_up_to_max(clock):
+    breaker = CircuitBreaker(base_delay=1, max_delay=4)
+    delays = []
+    for _ in range(5):
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        delays.append(breaker.retry_at - clock.now)
+        # 退避期内不放行，期满后放行一个探测
+        clock.now = breaker.retry_at - 0.01
+        assert not breaker.allow()
+        clock.now = breaker.retry_at
+    assert delays == [1, 2, 4, 4, 4]
+
+
+def test_failure_while_closed_opens_and_success_resets_backoff(clock):
+    breaker = CircuitBreaker(base_delay=1, max_delay=60)
+    breaker.allow()
+    breaker.record_success()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_at == clock.now + 1
+    # 断开前发出的请求随后失败，不重复累计退避
+    breaker.record_failure()
+    assert breaker.failures == 1 and breaker.retry_at == clock.now + 1
+
+    clock.now += 1
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.retry_at == clock.now + 2
+
+    clock.now += 2
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.failures == 0
+    breaker.record_failure()
+    assert breaker.retry_at == clock.now + 1
+
+
+def test_cancelled_probe_releases_half_open(clock):
+    breaker = CircuitBreaker(base_delay=1, max_delay=8)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.OPEN
+    # 未得出结果，下一个请求立即重新探测
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # 已连接时 release 不改变状态
+    breaker.record_success()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,97 @@
+"""
+Docker 服务：容器表刷新与多主机批量操作
+"""
+import asyncio
+
+import aiohttp
+
+from service.docker_client import DockerError, DockerNotFound
+from service.docker_service import DockerHosts, DockerService
+
+CAFE_ID = "cafe" + "0" * 60
+DB_ID = "1" * 64
+
+
+class FakeApi:
+    """按守护进程的规则解析容器引用：完整 ID、名称、ID 前缀"""
+
+    def __init__(self, containers):
+        self.containers_by_id = {c["Id"]: c for c in containers}
+
+    def _resolve(self, ref: str):
+        if ref in self.containers_by_id:
+            return self.containers_by_id[ref]
+        for c in self.containers_by_id.values():
+            if c["Names"] == [f"/{ref}"]:
+                return c
+        for c in self.containers_by_id.values():
+            if c["Id"].startswith(ref):
+                return c
+        raise DockerNotFound("No such container", 404)
+
+    async def inspect_container(self, ref: str) -> dict:
+        return {"Id": self._resolve(ref)["Id"]}
+
+    async def containers(self, all=True, filters=None) -> list:
+        ids = filters["id"]
+        # id 过滤器按前缀匹配
+        return [c for c in self.containers_by_id.values() if any(c["Id"].startswith(i) for i in ids)]
+
+
+def test_refresh_by_hex_name_does_not_hit_id_prefix():
+    api = FakeApi([
+        {"Id": CAFE_ID, "Names": ["/web"], "State": "running"},
+        {"Id": DB_ID, "Names": ["/cafe"], "State": "running"},
+    ])
+    service = DockerService(api, name="test")
+    service._cache.reset([
+        {"Id": CAFE_ID, "Names": ["/web"], "State": "running"},
+        {"Id": DB_ID, "Names": ["/cafe"], "State": "running"},
+    ])
+    api.containers_by_id[DB_ID]["State"] = "exited"
+    api.containers_by_id[CAFE_ID]["State"] = "paused"
+
+    asyncio.run(service._refresh_container("cafe"))
+    states = {c["Id"]: c["State"] for c in service._cache.list()}
+    assert states == {CAFE_ID: "running", DB_ID: "exited"}
+
+
+def test_refresh_removes_vanished_container():
+    api = FakeApi([])
+    service = DockerService(api, name="test")
+    service._cache.reset([{"Id": DB_ID, "Names": ["/db"], "State": "running"}])
+
+    asyncio.run(service._refresh_container(DB_ID))
+    assert service._cache.list() == []
+
+
+class ActionApi:
+    """按容器 ID 返回预设的操作结果：None 成功，异常则抛出"""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+
+    async def container_action(self, container_id, action, timeout=None):
+        outcome = self.outcomes[container_id]
+        if outcome is not None:
+            raise outcome
+
+
+def test_batch_action_reports_unexpected_errors_per_container():
+    hosts = DockerHosts([
+        DockerService(ActionApi({"a1": None, "a2": DockerError("HTTP 500: boom", 500)}), name="a"),
+        DockerService(ActionApi({
+            "b1": aiohttp.ClientPayloadError("truncated"),
+            "b2": KeyError("Id"),
+            "b3": None,
+        }), name="b"),
+    ])
+
+    async def collect():
+        return [r async for r in hosts.batch_action({"a": ["a1", "a2"], "b": ["b1", "b2", "b3"]}, "restart")]
+
+    results = {r.id: r for r in asyncio.run(collect())}
+    assert set(results) == {"a1", "a2", "b1", "b2", "b3"}
+    assert {i for i, r in results.items() if r.success} == {"a1", "b3"}
+    assert "truncated" in results["b1"].error
+    assert "Id" in results["b2"].error
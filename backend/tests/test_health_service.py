@@ -0,0 +1,180 @@
+"""
+健康检查：探测方式（对本地 aiohttp 服务）、状态码范围解析与按需关注的地址
+"""
+import time
+import socket
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from schema.schemas import ServiceStatus
+from service import health_service
+from service.health_service import HealthChecker, HealthProber, ProbeSpec, parse_status_ranges
+
+
+def test_parse_status_ranges():
+    assert parse_status_ranges(None) is None
+    assert parse_status_ranges(" ") is None
+    assert parse_status_ranges("200") == ((200, 200),)
+    assert parse_status_ranges("200-299, 401") == ((200, 299), (401, 401))
+    for value in ("abc", "299-200", "99", "200-600", "200-"):
+        with pytest.raises(ValueError):
+            parse_status_ranges(value)
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _with_server(scenario):
+    """启动本地服务，记录收到的请求方法，运行 scenario(checker, base_url, methods)"""
+    methods = []
+
+    async def ok(request):
+        methods.append((request.method, request.path))
+        return web.Response(text="ok")
+
+    async def no_head(request):
+        methods.append((request.method, request.path))
+        return web.Response(text="fallback")
+
+    async def redirect(request):
+        methods.append((request.method, request.path))
+        raise web.HTTPFound("/ok")
+
+    async def unauthorized(request):
+        return web.Response(status=401)
+
+    async def error(request):
+        return web.Response(status=500)
+
+    async def large(request):
+        # 目标文本跨越分块边界
+        return web.Response(body=b"x" * (16 * 1024 - 3) + b"READY" + b"y" * 50000)
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    app.router.add_get("/no-head", no_head, allow_head=False)
+    app.router.add_get("/redirect", redirect)
+    app.router.add_get("/401", unauthorized)
+    app.router.add_get("/500", error)
+    app.router.add_get("/large", large)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    checker = HealthChecker()
+    try:
+        return await scenario(checker, f"http://127.0.0.1:{port}", port, methods)
+    finally:
+        await checker.close()
+        await runner.cleanup()
+
+
+def test_head_mode_and_fallback_to_get():
+    async def scenario(checker, base, port, methods):
+        head = ProbeSpec("head", 2)
+        ok = await checker.check(f"{base}/ok", head)
+        assert ok.is_online and ok.status_code == 200
+        assert methods == [("HEAD", "/ok")]
+
+        # 不支持 HEAD（405）时改用 GET
+        methods.clear()
+        fallback = await checker.check(f"{base}/no-head", head)
+        assert fallback.is_online and fallback.status_code == 200
+        assert methods == [("GET", "/no-head")]
+
+        # HEAD 跟随重定向
+        methods.clear()
+        redirected = await checker.check(f"{base}/redirect", head)
+        assert redirected.is_online and redirected.status_code == 200
+        assert methods == [("HEAD", "/redirect"), ("HEAD", "/ok")]
+
+    asyncio.run(_with_server(scenario))
+
+
+def test_get_mode_status_ranges_and_body_match():
+    async def scenario(checker, base, port, methods):
+        expect = parse_status_ranges("200-299,401")
+        assert (await checker.check(f"{base}/401", ProbeSpec("get", 2, expect))).is_online
+        failed = await checker.check(f"{base}/500", ProbeSpec("get", 2, expect))
+        assert not failed.is_online and failed.status_code == 500 and "500" in failed.error
+        # 未配置状态码范围时任意响应均视为在线
+        assert (await checker.check(f"{base}/500", ProbeSpec("get", 2))).is_online
+
+        assert (await checker.check(f"{base}/large", ProbeSpec("get", 2, body_match="READY"))).is_online
+        missing = await checker.check(f"{base}/large", ProbeSpec("get", 2, body_match="MISSING"))
+        assert not missing.is_online and "MISSING" in missing.error
+
+    asyncio.run(_with_server(scenario))
+
+
+def test_tcp_mode():
+    async def scenario(checker, base, port, methods):
+        up = await checker.check(f"tcp://127.0.0.1:{port}", ProbeSpec("tcp", 2))
+        assert up.is_online and up.status_code is None
+        # 只完成握手，不发送 HTTP 请求
+        assert methods == []
+
+        down = await checker.check(f"tcp://127.0.0.1:{_closed_port()}", ProbeSpec("tcp", 2))
+        assert not down.is_online and down.error
+
+        invalid = await checker.check("tcp://127.0.0.1", ProbeSpec("tcp", 2))
+        assert not invalid.is_online
+
+    asyncio.run(_with_server(scenario))
+from service.uptime_service import UptimeHistory
+
+
+def _prober() -> HealthProber:
+    return HealthProber(HealthChecker(), UptimeHistory())
+
+
+def test_watch_accepts_only_probeable_urls():
+    prober = _prober()
+    prober.watch([
+        "http://nas.local:5000", "https://example.com", "tcp://db.local:5432",
+        "file:///etc/passwd", "gopher://host/", "tcp://no-port", "http://", "/relative",
+    ])
+    assert set(prober._targets) == {"http://nas.local:5000", "https://example.com", "tcp://db.local:5432"}
+
+
+def test_watch_evicts_oldest_past_cap(monkeypatch):
+    monkeypatch.setattr(health_service, "HEALTH_WATCH_MAX", 3)
+    prober = _prober()
+    prober.sync_card_targets({"http://card.local"})
+    for i in range(3):
+        prober.watch([f"http://svc{i}.local"])
+    # 再次查询续期后，svc1 成为最久未查询的地址
+    prober.watch(["http://svc0.local"])
+    prober.watch(["http://svc3.local"])
+
+    assert set(prober._targets) == {
+        "http://card.local", "http://svc0.local", "http://svc2.local", "http://svc3.local"
+    }
+
+
+class _FakeChecker:
+    async def check(self, url, spec=None):
+        return ServiceStatus(url=url, is_online=True, response_time=1.0, checked_at=time.time())
+
+
+def test_history_records_only_tracked_urls():
+    history = UptimeHistory()
+    prober = HealthProber(_FakeChecker(), history)
+    prober.sync_card_targets({"http://card.local"})
+    prober._specs = {"tcp://probe.local:22": ProbeSpec("tcp", 2)}
+    prober.watch(["http://adhoc.local", "tcp://probe.local:22"])
+
+    async def probe_all():
+        for target in list(prober._targets.values()):
+            await prober._probe(target)
+
+    asyncio.run(probe_all())
+    assert {url for url, _ in history._series} == {"http://card.local", "tcp://probe.local:22"}
+    # 按需关注的地址仍有缓存结果
+    assert prober.result("http://adhoc.local").is_online
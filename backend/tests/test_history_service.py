@@ -0,0 +1,71 @@
+"""
+指标历史降采样与查询层级选择
+"""
+from service.history_service import MetricsHistory
+from schema.schemas import SystemStatus
+
+DAY = 86400
+
+
+def _status(value: float) -> SystemStatus:
+    return SystemStatus(
+        cpu_percent=value,
+        memory_percent=value,
+        memory_used=0,
+        memory_total=0,
+        disk_percent=value,
+        disk_used=0,
+        disk_total=0,
+    )
+
+
+def _fill(history: MetricsHistory, start: float, end: float, interval: float = 5):
+    ts = start
+    while ts < end:
+        history.record(ts, _status(50.0))
+        ts += interval
+
+
+def test_range_longer_than_history_uses_longest_tier():
+    """只有 3 天数据时查询 7d / 30d 应返回 1h 层级的全部 3 天，而不是 1s 层级的最近 2 小时"""
+    history = MetricsHistory(metrics=("cpu_percent",))
+    now = 10 * DAY
+    _fill(history, now - 3 * DAY, now)
+
+    for days in (7, 30):
+        step, points = history.query("cpu_percent", now - days * DAY, now)
+        assert step == 3600
+        assert points[0].timestamp <= now - 3 * DAY + 3600
+        assert len(points) >= 71
+
+
+def test_range_longer_than_history_with_step():
+    history = MetricsHistory(metrics=("cpu_percent",))
+    now = 10 * DAY
+    _fill(history, now - 3 * DAY, now)
+
+    step, points = history.query("cpu_percent", now - 7 * DAY, now, step=3600)
+    assert step == 3600
+    assert len(points) >= 71
+
+
+def test_short_history_prefers_finest_tier():
+    """历史只有几分钟时各层级最早时间相同，仍使用最细层级"""
+    history = MetricsHistory(metrics=("cpu_percent",))
+    now = 10 * DAY
+    _fill(history, now - 300, now, interval=1)
+
+    step, points = history.query("cpu_percent", now - DAY, now)
+    assert step == 1
+    assert len(points) == 300
+
+
+def test_covered_range_uses_finest_covering_tier():
+    history = MetricsHistory(metrics=("cpu_percent",))
+    now = 10 * DAY
+    _fill(history, now - 3 * DAY, now)
+
+    step, _ = history.query("cpu_percent", now - 600, now)
+    assert step == 1
+    step, _ = history.query("cpu_percent", now - 12 * 3600, now)
+    assert step == 60
@@ -0,0 +1,104 @@
+"""
+指标文件存储：写入、重新打开读回、环形覆盖与文件头校验
+"""
+import struct
+
+import pytest
+
+from repository import metrics_store
+from repository.metrics_store import MetricsStore, RingFile
+
+METRICS = ("cpu_percent", "memory_percent")
+
+
+def _values(i: int):
+    return [float(i), i + 0.5, i + 1.0] * len(METRICS)
+
+
+def _timestamps(ring: RingFile):
+    return [record[0] for record in ring.records()]
+
+
+def test_round_trip_after_reopen(tmp_path):
+    path = str(tmp_path / "history-1s.bin")
+    ring = RingFile(path, 1, 10, METRICS)
+    for i in range(4):
+        ring.append(1000.0 + i, _values(i))
+    ring.close()
+
+    ring = RingFile(path, 1, 10, METRICS)
+    records = list(ring.records())
+    assert [r[0] for r in records] == [1000.0, 1001.0, 1002.0, 1003.0]
+    assert records[2][1:] == pytest.approx(_values(2))
+
+    # 重新打开后继续追加
+    ring.append(1004.0, _values(4))
+    ring.close()
+    assert _timestamps(RingFile(path, 1, 10, METRICS))[-1] == 1004.0
+
+
+def test_wrap_around_keeps_newest_in_order(tmp_path):
+    path = str(tmp_path / "history-1s.bin")
+    ring = RingFile(path, 1, 5, METRICS)
+    for i in range(12):
+        ring.append(float(i), _values(i))
+    assert ring.size == 5
+    assert _timestamps(ring) == [7.0, 8.0, 9.0, 10.0, 11.0]
+    ring.close()
+
+    ring = RingFile(path, 1, 5, METRICS)
+    assert _timestamps(ring) == [7.0, 8.0, 9.0, 10.0, 11.0]
+    ring.append(12.0, _values(12))
+    assert _timestamps(ring) == [8.0, 9.0, 10.0, 11.0, 12.0]
+    ring.close()
+
+
+@pytest.mark.parametrize("reopen", [
+    lambda path: RingFile(path, 60, 8, METRICS),  # 分辨率不同
+    lambda path: RingFile(path, 1, 8, ("cpu_percent", "disk_percent")),  # 指标名不同（记录宽度相同）
+    lambda path: RingFile(path, 1, 16, METRICS),  # 容量不同（文件大小不同）
+])
+def test_mismatched_layout_is_reset(tmp_path, reopen):
+    path = str(tmp_path / "history.bin")
+    ring = RingFile(path, 1, 8, METRICS)
+    ring.append(1.0, _values(1))
+    ring.close()
+
+    ring = reopen(path)
+    assert ring.size == 0 and list(ring.records()) == []
+    ring.close()
+
+
+def test_version_mismatch_is_reset(tmp_path, monkeypatch):
+    path = str(tmp_path / "history.bin")
+    ring = RingFile(path, 1, 8, METRICS)
+    ring.append(1.0, _values(1))
+    ring.close()
+
+    monkeypatch.setattr(metrics_store, "VERSION", metrics_store.VERSION + 1)
+    ring = RingFile(path, 1, 8, METRICS)
+    assert ring.size == 0
+    ring.close()
+
+
+def test_corrupted_cursor_is_reset(tmp_path):
+    path = str(tmp_path / "history.bin")
+    RingFile(path, 1, 8, METRICS).close()
+    with open(path, "r+b") as f:
+        f.seek(metrics_store._CURSOR_OFFSET)
+        f.write(struct.pack("<II", 99, 3))  # head 超出容量
+
+    ring = RingFile(path, 1, 8, METRICS)
+    assert (ring.head, ring.size) == (0, 0)
+    ring.close()
+
+
+def test_store_files_per_tier(tmp_path):
+    store = MetricsStore(METRICS, [(1, 4), (60, 4)], directory=str(tmp_path))
+    store.append(1, 60.0, _values(1))
+    store.close()
+
+    store = MetricsStore(METRICS, [(1, 4), (60, 4)], directory=str(tmp_path))
+    assert [f.size for f in store.files] == [0, 1]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["history-1s.bin", "history-60s.bin"]
+    store.close()
@@ -0,0 +1,51 @@
+"""
+访问者地址解析：只信任配置的反向代理的转发头
+"""
+import ipaddress
+
+import pytest
+from starlette.requests import Request
+
+from service import route_service
+from service.route_service import client_address, is_lan_client
+
+
+def _request(peer: str, headers=None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": (peer, 50000),
+    })
+
+
+@pytest.fixture
+def trusted(monkeypatch):
+    monkeypatch.setattr(route_service, "TRUSTED_PROXIES", [ipaddress.ip_network("172.17.0.1/32")])
+
+
+def test_forwarded_header_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(route_service, "TRUSTED_PROXIES", [])
+    # 私有地址的直连方也不再被默认信任
+    request = _request("172.17.0.1", {"X-Forwarded-For": "192.168.1.5"})
+    assert client_address(request) == "172.17.0.1"
+    assert not is_lan_client(_request("8.8.8.8", {"X-Forwarded-For": "192.168.1.5"}))
+
+
+def test_forwarded_header_from_trusted_proxy(trusted):
+    assert client_address(_request("172.17.0.1", {"X-Forwarded-For": "8.8.8.8"})) == "8.8.8.8"
+    assert client_address(_request("172.17.0.1", {"X-Real-IP": "192.168.1.5"})) == "192.168.1.5"
+    assert client_address(_request("172.17.0.1")) == "172.17.0.1"
+
+
+def test_spoofed_leftmost_hop_is_skipped(trusted):
+    # 客户端自带的 X-Forwarded-For 位于最左侧，取最右侧的不可信地址
+    request = _request("172.17.0.1", {"X-Forwarded-For": "192.168.1.5, 8.8.8.8"})
+    assert client_address(request) == "8.8.8.8"
+    assert not is_lan_client(request)
+
+
+def test_untrusted_private_peer_cannot_forward(trusted):
+    request = _request("10.0.0.9", {"X-Forwarded-For": "8.8.8.8"})
+    assert client_address(request) == "10.0.0.9"
@@ -0,0 +1,146 @@
+"""
+批量排序与版本校验
+"""
+import time
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from repository.database import Base
+from model import user, card, group, setting, alert_rule, sort_version  # noqa: F401
+from model.card import Card
+from model.group import Group
+from model.user import User
+from schema.schemas import SortItem
+from service import sort_service
+from service.sort_service import (
+    SortConflict, SortError, current_version, sort_cards, sort_groups, touch_version
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(id=1, username="a", email="a@example.com", password_hash="x"),
+        User(id=2, username="b", email="b@example.com", password_hash="x"),
+        Group(id=1, user_id=1, name="g1"),
+        Group(id=2, user_id=2, name="g2"),
+    ])
+    session.add_all([Card(id=i, user_id=1, title=f"c{i}", sort_order=i) for i in range(1, 4)])
+    session.add(Card(id=9, user_id=2, title="other", sort_order=0))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _orders(db, model, user_id):
+    return [row.id for row in db.query(model).filter(model.user_id == user_id).order_by(model.sort_order)]
+
+
+def test_sort_scoped_by_user(db):
+    sort_cards(db, 1, [SortItem(id=3, sort_order=0), SortItem(id=1, sort_order=1),
+                       SortItem(id=2, sort_order=2), SortItem(id=9, sort_order=5)])
+    db.commit()
+    assert _orders(db, Card, 1) == [3, 1, 2]
+    assert db.get(Card, 9).sort_order == 0
+
+
+def test_move_to_foreign_group_rejected(db):
+    with pytest.raises(SortError):
+        sort_cards(db, 1, [SortItem(id=1, sort_order=0, group_id=2)])
+
+
+def test_version_round_trip_and_conflict(db):
+    first = sort_groups(db, 1, [SortItem(id=1, sort_order=0)])
+    db.commit()
+    assert current_version(db, Group, 1) == first
+
+    # 基于最新版本的排序通过，版本严格递增
+    second = sort_groups(db, 1, [SortItem(id=1, sort_order=1)], expected_version=first)
+    db.commit()
+    assert second > first
+
+    # 基于旧版本的排序被拒绝，且不写入
+    with pytest.raises(SortConflict):
+        sort_groups(db, 1, [SortItem(id=1, sort_order=7)], expected_version=first)
+    assert db.get(Group, 1).sort_order == 1
+
+    # 不带版本时不校验
+    sort_groups(db, 1, [SortItem(id=1, sort_order=2)])
+
+
+def test_other_edits_invalidate_version(db):
+    version = sort_cards(db, 1, [SortItem(id=1, sort_order=0)])
+    db.commit()
+    time.sleep(0.002)  # 版本精度为毫秒
+    db.get(Card, 2).title = "renamed"
+    db.commit()
+    with pytest.raises(SortConflict):
+        sort_cards(db, 1, [SortItem(id=2, sort_order=0)], expected_version=version)
+
+
+def test_delete_invalidates_version(db):
+    version = sort_cards(db, 1, [SortItem(id=1, sort_order=0)])
+    db.commit()
+    db.delete(db.get(Card, 3))
+    touch_version(db, Card, 1)
+    db.commit()
+    assert current_version(db, Card, 1) > version
+    with pytest.raises(SortConflict):
+        sort_cards(db, 1, [SortItem(id=2, sort_order=0)], expected_version=version)
+
+
+def test_concurrent_sorts_with_same_version_conflict(tmp_path, monkeypatch):
+    # 文件库，两个会话各自持有连接，模拟两个页面基于同一版本同时提交
+    engine = create_engine(f"sqlite:///{tmp_path}/sort.db", connect_args={"timeout": 0.2})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as setup:
+        setup.add_all([
+            User(id=1, username="a", email="a@example.com", password_hash="x"),
+            Card(id=1, user_id=1, title="c1", sort_order=0),
+        ])
+        setup.commit()
+        version = current_version(setup, Card, 1)
+
+    # 第一个排序读到版本后暂停，等第二个排序尝试完成再写入
+    read_done, second_done = threading.Event(), threading.Event()
+    real_current_version = sort_service.current_version
+
+    def paused_current_version(*args):
+        result = real_current_version(*args)
+        if threading.current_thread().name == "first":
+            read_done.set()
+            second_done.wait(5)
+        return result
+
+    monkeypatch.setattr(sort_service, "current_version", paused_current_version)
+    first, second = Session(), Session()
+
+    def run_first():
+        sort_cards(first, 1, [SortItem(id=1, sort_order=1)], expected_version=version)
+        first.commit()
+
+    thread = threading.Thread(target=run_first, name="first")
+    thread.start()
+    assert read_done.wait(5)
+    # 第一个排序已持有写锁，第二个在读取版本之前等待，超时失败
+    with pytest.raises(OperationalError):
+        sort_cards(second, 1, [SortItem(id=1, sort_order=2)], expected_version=version)
+    second.rollback()
+    second_done.set()
+    thread.join(5)
+
+    # 第一个提交后，基于同一版本的第二个排序被拒绝，第一个的结果保留
+    with pytest.raises(SortConflict):
+        sort_cards(second, 1, [SortItem(id=1, sort_order=2)], expected_version=version)
+    second.rollback()
+    assert second.get(Card, 1).sort_order == 1
+    first.close()
+    second.close()
@@ -0,0 +1,25 @@
+"""
+进程表：查询只读缓存，预热由采样线程完成
+"""
+import os
+import time
+
+from service.system_service import ProcessTracker
+
+
+def test_top_never_scans_and_first_refresh_only_primes():
+    tracker = ProcessTracker()
+
+    started = time.perf_counter()
+    assert tracker.top(5) == []
+    assert time.perf_counter() - started < 0.05
+    assert tracker.active
+
+    # 冷启动的首次刷新只预热 CPU 基准，不对外提供
+    tracker.refresh()
+    assert tracker.top(5) == []
+
+    tracker.refresh()
+    rows = tracker.top(100000, "mem")
+    assert rows and not any(row.stale for row in rows)
+    assert os.getpid() in {row.pid for row in rows}
@@ -7,8 +7,8 @@ import type {
   Card, CardCreate, CardUpdate,
   Group, GroupCreate, GroupUpdate,
   Settings, SettingsUpdate,
-  SystemStatus, DockerContainer, DockerStatus,
-  MessageResponse, SortItem
+  SystemStatus, MetricHistory, ProcessInfo, NodeInfo, DockerContainer, DockerHostInfo, DockerDiskUsage, DockerStack, ContainerStats, BatchActionResponse, DockerStatus,
+  MessageResponse, SortItem, SortResponse
 } from '../types';
 
 // API 基础地址（生产环境使用相对路径，开发环境使用默认值）
@@ -55,9 +55,12 @@ api.interceptors.response.use(
 export const cardsApi = {
   /**
    * 获取所有卡片
+   * @param route auto 时按探测结果与访问网络填写 preferred_url
    */
-  getAll: async (): Promise<Card[]> => {
-    const response = await api.get<Card[]>('/api/cards');
+  getAll: async (route?: 'manual' | 'auto'): Promise<Card[]> => {
+    const response = await api.get<Card[]>('/api/cards', {
+      params: { route }
+    });
     return response.data;
   },
 
@@ -95,13 +98,23 @@ export const cardsApi = {
 
   /**
    * 批量更新排序
+   * @param version 上次排序返回的版本，卡片已被其他页面修改时返回 409
    */
-  updateSort: async (items: SortItem[]): Promise<MessageResponse> => {
-    const response = await api.put<MessageResponse>('/api/cards/sort/batch', { items });
+  updateSort: async (items: SortItem[], version?: number): Promise<SortResponse> => {
+    const response = await api.put<SortResponse>('/api/cards/sort/batch', { items, version });
     return response.data;
   },
 };
 
+/**
+ * 卡片实际打开的地址
+ * 优先使用自动选路（getAll('auto')）填写的 preferred_url，没有时按内外网设置选择
+ */
+export function getCardUrl(card: Card, settings: Settings | null): string | undefined {
+  if (card.preferred_url) return card.preferred_url;
+  return settings?.use_external_url ? card.external_url : card.internal_url;
+}
+
 // ==================== 分组 API ====================
 
 export const groupsApi = {
@@ -139,9 +152,10 @@ export const groupsApi = {
 
   /**
    * 批量更新排序
+   * @param version 上次排序返回的版本，分组已被其他页面修改时返回 409
    */
-  updateSort: async (items: SortItem[]): Promise<MessageResponse> => {
-    const response = await api.put<MessageResponse>('/api/groups/sort/batch', { items });
+  updateSort: async (items: SortItem[], version?: number): Promise<SortResponse> => {
+    const response = await api.put<SortResponse>('/api/groups/sort/batch', { items, version });
     return response.data;
   },
 };
@@ -188,8 +202,49 @@ export const systemApi = {
   /**
    * 获取系统状态
    */
-  getStatus: async (): Promise<SystemStatus> => {
-    const response = await api.get<SystemStatus>('/api/system/status');
+  getStatus: async (node?: string): Promise<SystemStatus> => {
+    const response = await api.get<SystemStatus>('/api/system/status', {
+      params: { node }
+    });
+    return response.data;
+  },
+
+  /**
+   * 订阅系统状态推送（SSE）
+   */
+  openStream: (): EventSource => {
+    return new EventSource(`${API_BASE_URL}/api/system/stream`);
+  },
+
+  /**
+   * 获取资源占用最高的进程
+   */
+  getProcesses: async (top: number = 20, sort: 'cpu' | 'mem' = 'cpu'): Promise<ProcessInfo[]> => {
+    const response = await api.get<ProcessInfo[]>('/api/system/processes', {
+      params: { top, sort }
+    });
+    return response.data;
+  },
+
+  /**
+   * 获取指标历史
+   */
+  getHistory: async (metric: string, range: string = '1h', step?: string): Promise<MetricHistory> => {
+    const response = await api.get<MetricHistory>('/api/system/history', {
+      params: { metric, range, step }
+    });
+    return response.data;
+  },
+};
+
+// ==================== 节点 API ====================
+
+export const nodesApi = {
+  /**
+   * 获取所有节点
+   */
+  getAll: async (): Promise<NodeInfo[]> => {
+    const response = await api.get<NodeInfo[]>('/api/nodes');
     return response.data;
   },
 };
@@ -206,7 +261,15 @@ export const dockerApi = {
   },
 
   /**
-   * 获取所有容器
+   * 获取全部 Docker 主机状态
+   */
+  getHosts: async (): Promise<DockerHostInfo[]> => {
+    const response = await api.get<DockerHostInfo[]>('/api/docker/hosts');
+    return response.data;
+  },
+
+  /**
+   * 获取所有容器（未指定主机时合并全部主机）
    */
   getContainers: async (all: boolean = true): Promise<DockerContainer[]> => {
     const response = await api.get<DockerContainer[]>('/api/docker/containers', {
@@ -215,16 +278,72 @@ export const dockerApi = {
     return response.data;
   },
 
+  /**
+   * 获取运行中容器的资源占用
+   */
+  getStats: async (): Promise<ContainerStats[]> => {
+    const response = await api.get<ContainerStats[]>('/api/docker/stats');
+    return response.data;
+  },
+
   /**
    * 对容器执行操作
    */
-  containerAction: async (containerId: string, action: string): Promise<MessageResponse> => {
+  containerAction: async (containerId: string, action: string, host?: string): Promise<MessageResponse> => {
     const response = await api.post<MessageResponse>(
       `/api/docker/containers/${containerId}/action`,
-      { action }
+      { action },
+      { params: { host } }
+    );
+    return response.data;
+  },
+
+  /**
+   * 获取 Docker 磁盘占用（镜像 / 容器 / 卷 / 构建缓存）
+   */
+  getDiskUsage: async (host?: string, refresh: boolean = false): Promise<DockerDiskUsage> => {
+    const response = await api.get<DockerDiskUsage>('/api/docker/disk-usage', {
+      params: { host, refresh }
+    });
+    return response.data;
+  },
+
+  /**
+   * 打开容器日志 SSE 流（收到 end 事件后需关闭）
+   */
+  openLogs: (containerId: string, tail: number = 100, follow: boolean = true): EventSource => {
+    return new EventSource(
+      `${API_BASE_URL}/api/docker/containers/${containerId}/logs?tail=${tail}&follow=${follow}`
+    );
+  },
+
+  /**
+   * 获取 compose 栈（未指定主机时合并全部主机）
+   */
+  getStacks: async (host?: string): Promise<DockerStack[]> => {
+    const response = await api.get<DockerStack[]>('/api/docker/stacks', { params: { host } });
+    return response.data;
+  },
+
+  /**
+   * 对一个或多个 compose 栈执行操作
+   */
+  stackAction: async (stacks: string[], action: string, host?: string): Promise<BatchActionResponse> => {
+    const response = await api.post<BatchActionResponse>(
+      '/api/docker/stacks/action',
+      { stacks, action },
+      { params: { host } }
     );
     return response.data;
   },
+
+  /**
+   * 批量执行容器操作
+   */
+  batchAction: async (ids: string[], action: string): Promise<BatchActionResponse> => {
+    const response = await api.post<BatchActionResponse>('/api/docker/actions/batch', { ids, action });
+    return response.data;
+  },
 };
 
 // ==================== 文件上传 API ====================
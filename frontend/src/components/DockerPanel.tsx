@@ -61,20 +61,20 @@ export function DockerPanel() {
   /**
    * 处理容器操作
    */
-  const handleAction = async (containerId: string, action: 'start' | 'stop' | 'restart') => {
+  const handleAction = async (containerId: string, action: 'start' | 'stop' | 'restart', host?: string) => {
     setActionLoading(containerId);
     
     try {
       let success = false;
       switch (action) {
         case 'start':
-          success = await startContainer(containerId);
+          success = await startContainer(containerId, host);
           break;
         case 'stop':
-          success = await stopContainer(containerId);
+          success = await stopContainer(containerId, host);
           break;
         case 'restart':
-          success = await restartContainer(containerId);
+          success = await restartContainer(containerId, host);
           break;
       }
       
@@ -154,7 +154,7 @@ export function DockerPanel() {
           </div>
         ) : (
           containers.map((container) => (
-            <div key={container.id} className="docker-container-item">
+            <div key={`${container.host}/${container.id}`} className="docker-container-item">
               <div className="docker-container-info">
                 <div className="docker-container-name">{container.name}</div>
                 <div className="docker-container-image">{container.image}</div>
@@ -173,7 +173,7 @@ export function DockerPanel() {
                   <>
                     <button
                       className="btn-icon"
-                      onClick={() => handleAction(container.id, 'stop')}
+                      onClick={() => handleAction(container.id, 'stop', container.host)}
                       disabled={actionLoading === container.id}
                       title="停止"
                     >
@@ -185,7 +185,7 @@ export function DockerPanel() {
                     </button>
                     <button
                       className="btn-icon"
-                      onClick={() => handleAction(container.id, 'restart')}
+                      onClick={() => handleAction(container.id, 'restart', container.host)}
                       disabled={actionLoading === container.id}
                       title="重启"
                     >
@@ -195,7 +195,7 @@ export function DockerPanel() {
                 ) : (
                   <button
                     className="btn-icon docker-start-btn"
-                    onClick={() => handleAction(container.id, 'start')}
+                    onClick={() => handleAction(container.id, 'start', container.host)}
                     disabled={actionLoading === container.id}
                     title="启动"
                   >
@@ -47,7 +47,33 @@ export function HealthCheck() {
     localStorage.setItem(STORAGE_KEY, JSON.stringify(services));
   }, [services]);
 
-  // 检查服务状态
+  const applyResults = (results: ServiceStatus[]) => {
+    const newStatuses = new Map<string, ServiceStatus>();
+    results.forEach((r: ServiceStatus) => {
+      newStatuses.set(r.url, r);
+    });
+    setStatuses(newStatuses);
+  };
+
+  // 读取后端定时探测的缓存结果（不触发出站请求）
+  const loadStatuses = useCallback(async () => {
+    if (services.length === 0) return;
+    
+    try {
+      const params = new URLSearchParams();
+      services.forEach(s => params.append('urls', s.url));
+      const response = await fetch(`/api/health/status?${params.toString()}`);
+      
+      if (response.ok) {
+        const data = await response.json();
+        applyResults(data.results);
+      }
+    } catch (e) {
+      console.error('Health status failed:', e);
+    }
+  }, [services]);
+
+  // 手动刷新：立即检查服务状态
   const checkServices = useCallback(async () => {
     if (services.length === 0) return;
     
@@ -61,11 +87,7 @@ export function HealthCheck() {
       
       if (response.ok) {
         const data = await response.json();
-        const newStatuses = new Map<string, ServiceStatus>();
-        data.results.forEach((r: ServiceStatus) => {
-          newStatuses.set(r.url, r);
-        });
-        setStatuses(newStatuses);
+        applyResults(data.results);
       }
     } catch (e) {
       console.error('Health check failed:', e);
@@ -74,12 +96,16 @@ export function HealthCheck() {
     }
   }, [services]);
 
-  // 自动刷新
+  // 自动刷新（新加入的地址由后端在数秒内完成首次探测）
   useEffect(() => {
-    checkServices();
-    const interval = setInterval(checkServices, 60000); // 每分钟检查一次
-    return () => clearInterval(interval);
-  }, [checkServices]);
+    loadStatuses();
+    const first = setTimeout(loadStatuses, 3000);
+    const interval = setInterval(loadStatuses, 15000);
+    return () => {
+      clearTimeout(first);
+      clearInterval(interval);
+    };
+  }, [loadStatuses]);
 
   const addService = () => {
     if (!newName.trim() || !newUrl.trim()) return;
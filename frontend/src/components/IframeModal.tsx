@@ -4,6 +4,7 @@
  */
 import { useState } from 'react';
 import { Icon } from '@iconify/react';
+import { getCardUrl } from '../api';
 import type { Card, Settings } from '../types';
 import './IframeModal.css';
 
@@ -19,8 +20,7 @@ export function IframeModal({ isOpen, card, settings, onClose }: IframeModalProp
 
   if (!isOpen || !card) return null;
 
-  // 根据设置选择内网或外网地址
-  const url = settings?.use_external_url ? card.external_url : card.internal_url;
+  const url = getCardUrl(card, settings);
 
   if (!url) {
     return (
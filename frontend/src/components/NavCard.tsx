@@ -3,6 +3,7 @@
  * 支持 Iconify 图标、自定义背景、悬浮效果
  */
 import { Icon } from '@iconify/react';
+import { getCardUrl } from '../api';
 import type { Card, Settings } from '../types';
 import './NavCard.css';
 
@@ -15,8 +16,8 @@ export interface NavCardProps {
 }
 
 export function NavCard({ card, settings, onEdit, onDelete, onOpenIframe }: NavCardProps) {
-  // 根据设置选择内网或外网地址
-  const url = settings?.use_external_url ? card.external_url : card.internal_url;
+  const url = getCardUrl(card, settings);
+  const isExternal = !!url && url === card.external_url;
   
   /**
    * 处理卡片点击
@@ -99,10 +100,10 @@ export function NavCard({ card, settings, onEdit, onDelete, onOpenIframe }: NavC
         </div>
       )}
       
-      {/* 网络模式指示器 */}
+      {/* 网络模式指示器：显示实际使用的地址 */}
       {card.internal_url && card.external_url && (
-        <div className="nav-card-network-indicator" title={settings?.use_external_url ? '外网' : '内网'}>
-          <Icon icon={settings?.use_external_url ? 'mdi:earth' : 'mdi:home-network'} />
+        <div className="nav-card-network-indicator" title={isExternal ? '外网' : '内网'}>
+          <Icon icon={isExternal ? 'mdi:earth' : 'mdi:home-network'} />
         </div>
       )}
     </div>
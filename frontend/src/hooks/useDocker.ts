@@ -12,9 +12,9 @@ interface UseDockerReturn {
   isLoading: boolean;
   error: string | null;
   refresh: () => Promise<void>;
-  startContainer: (containerId: string) => Promise<boolean>;
-  stopContainer: (containerId: string) => Promise<boolean>;
-  restartContainer: (containerId: string) => Promise<boolean>;
+  startContainer: (containerId: string, host?: string) => Promise<boolean>;
+  stopContainer: (containerId: string, host?: string) => Promise<boolean>;
+  restartContainer: (containerId: string, host?: string) => Promise<boolean>;
 }
 
 export function useDocker(pollingInterval: number = 10000): UseDockerReturn {
@@ -59,9 +59,9 @@ export function useDocker(pollingInterval: number = 10000): UseDockerReturn {
   /**
    * 启动容器
    */
-  const startContainer = useCallback(async (containerId: string): Promise<boolean> => {
+  const startContainer = useCallback(async (containerId: string, host?: string): Promise<boolean> => {
     try {
-      await dockerApi.containerAction(containerId, 'start');
+      await dockerApi.containerAction(containerId, 'start', host);
       await fetchData(); // 刷新列表
       return true;
     } catch (err) {
@@ -73,9 +73,9 @@ export function useDocker(pollingInterval: number = 10000): UseDockerReturn {
   /**
    * 停止容器
    */
-  const stopContainer = useCallback(async (containerId: string): Promise<boolean> => {
+  const stopContainer = useCallback(async (containerId: string, host?: string): Promise<boolean> => {
     try {
-      await dockerApi.containerAction(containerId, 'stop');
+      await dockerApi.containerAction(containerId, 'stop', host);
       await fetchData(); // 刷新列表
       return true;
     } catch (err) {
@@ -87,9 +87,9 @@ export function useDocker(pollingInterval: number = 10000): UseDockerReturn {
   /**
    * 重启容器
    */
-  const restartContainer = useCallback(async (containerId: string): Promise<boolean> => {
+  const restartContainer = useCallback(async (containerId: string, host?: string): Promise<boolean> => {
     try {
-      await dockerApi.containerAction(containerId, 'restart');
+      await dockerApi.containerAction(containerId, 'restart', host);
       await fetchData(); // 刷新列表
       return true;
     } catch (err) {
@@ -1,6 +1,6 @@
 /**
- * 系统状态轮询 Hook
- * 定期获取 CPU、内存、磁盘使用信息
+ * 系统状态 Hook
+ * 通过 SSE 订阅 CPU、内存、磁盘使用信息，不支持 SSE 时回退为定时轮询
  */
 import { useState, useEffect, useCallback } from 'react';
 import { systemApi } from '../api';
@@ -43,13 +43,30 @@ export function useSystemStatus(pollingInterval: number = 5000): UseSystemStatus
   }, []);
 
   useEffect(() => {
-    // 首次获取
-    fetchStatus();
+    // 不支持 SSE 的环境回退为定时轮询
+    if (typeof EventSource === 'undefined') {
+      fetchStatus();
+      const interval = setInterval(fetchStatus, pollingInterval);
+      return () => clearInterval(interval);
+    }
+
+    // 服务端推送（断线后浏览器会自动重连）
+    const source = systemApi.openStream();
+
+    source.onmessage = (event) => {
+      setStatus(JSON.parse(event.data));
+      setError(null);
+      setIsLoading(false);
+    };
 
-    // 定时轮询
-    const interval = setInterval(fetchStatus, pollingInterval);
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        setError('无法获取系统状态');
+        setIsLoading(false);
+      }
+    };
 
-    return () => clearInterval(interval);
+    return () => source.close();
   }, [fetchStatus, pollingInterval]);
 
   return {
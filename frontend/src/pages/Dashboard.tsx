@@ -2,7 +2,7 @@
  * 主仪表盘页面
  * 显示导航卡片、天气预报、支持卡片管理和小窗口预览
  */
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Icon } from '@iconify/react';
 import { NavCard, SearchBar, Weather, CardModal, IframeModal, DateTime, Notepad, VercelGlobe, SystemMonitor, DockerPanel, Clock, TodoList, HealthCheck } from '../components';
@@ -10,6 +10,7 @@ import { cardsApi, groupsApi, settingsApi } from '../api';
 
 import type { Card, CardCreate, CardUpdate, Group, Settings, SortItem } from '../types';
 import toast from 'react-hot-toast';
+import { isAxiosError } from 'axios';
 import {
   DndContext, 
   closestCenter,
@@ -49,6 +50,11 @@ export function Dashboard() {
   const [showIframe, setShowIframe] = useState(false);
   const [iframeCard, setIframeCard] = useState<Card | null>(null);
   
+  // 上次排序返回的版本号，下次排序时带上以检测其他页面的修改；
+  // 重新加载或本页修改过卡片 / 分组后置空，下次排序不做校验
+  const cardsVersion = useRef<number | undefined>(undefined);
+  const groupsVersion = useRef<number | undefined>(undefined);
+  
   const navigate = useNavigate();
   
   // 加载数据
@@ -92,7 +98,7 @@ export function Dashboard() {
   const loadData = async () => {
     try {
       const [cardsData, groupsData, settingsData] = await Promise.all([
-        cardsApi.getAll(),
+        cardsApi.getAll('auto'),
         groupsApi.getAll(),
         settingsApi.get()
       ]);
@@ -100,6 +106,8 @@ export function Dashboard() {
       setCards(cardsData);
       setGroups(groupsData);
       setSettings(settingsData);
+      cardsVersion.current = undefined;
+      groupsVersion.current = undefined;
     } catch (error) {
       console.error('加载数据失败:', error);
       toast.error('加载数据失败');
@@ -115,6 +123,8 @@ export function Dashboard() {
     try {
       const newSettings = await settingsApi.toggleNetwork();
       setSettings(newSettings);
+      // 自动选路在没有探测结果时沿用内外网设置，切换后重新获取
+      setCards(await cardsApi.getAll('auto'));
       toast.success(newSettings.use_external_url ? '已切换到外网模式' : '已切换到内网模式');
     } catch {
       toast.error('切换网络模式失败');
@@ -125,6 +135,9 @@ export function Dashboard() {
    * 保存卡片（新增或更新）
    */
   const handleSaveCard = async (data: CardCreate | CardUpdate) => {
+    // 卡片编辑框内还可能新建分组
+    cardsVersion.current = undefined;
+    groupsVersion.current = undefined;
     try {
       if (editingCard) {
         // 更新现有卡片
@@ -148,6 +161,7 @@ export function Dashboard() {
    * 删除卡片
    */
   const handleDeleteCard = async (id: number) => {
+    cardsVersion.current = undefined;
     try {
       await cardsApi.delete(id);
       setCards(cards.filter(c => c.id !== id));
@@ -273,8 +287,12 @@ export function Dashboard() {
                     sort_order: index
                 }));
                 try {
-                   await groupsApi.updateSort(sortItems);
-                } catch(e) { console.error(e); }
+                   const result = await groupsApi.updateSort(sortItems, groupsVersion.current);
+                   groupsVersion.current = result.version;
+                } catch(e) {
+                   console.error(e);
+                   handleSortError(e);
+                }
             }
         }
     }
@@ -343,8 +361,21 @@ export function Dashboard() {
       });
       
       try {
-          await cardsApi.updateSort(sortItems);
+          const result = await cardsApi.updateSort(sortItems, cardsVersion.current);
+          cardsVersion.current = result.version;
       } catch (e) {
+          handleSortError(e);
+      }
+  };
+  
+  /**
+   * 排序保存失败：已被其他页面修改时重新加载最新顺序
+   */
+  const handleSortError = (e: unknown) => {
+      if (isAxiosError(e) && e.response?.status === 409) {
+          toast.error('排序已在其他页面修改，已重新加载');
+          loadData();
+      } else {
           toast.error('保存排序失败');
       }
   };
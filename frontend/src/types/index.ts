@@ -59,6 +59,7 @@ export interface Card {
   open_in_iframe: boolean;
   sort_order: number;
   created_at: string;
+  preferred_url?: string;
   group?: Group;
 }
 
@@ -130,6 +131,32 @@ export interface SettingsUpdate {
 
 // ==================== 系统状态相关 ====================
 
+export interface NetworkIO {
+  interface: string;
+  bytes_sent_per_sec: number;
+  bytes_recv_per_sec: number;
+  packets_sent_per_sec: number;
+  packets_recv_per_sec: number;
+}
+
+export interface DiskIO {
+  device: string;
+  read_bytes_per_sec: number;
+  write_bytes_per_sec: number;
+  read_iops: number;
+  write_iops: number;
+}
+
+export interface DiskUsage {
+  mountpoint: string;
+  device: string;
+  fstype: string;
+  total: number;
+  used: number;
+  free: number;
+  percent: number;
+}
+
 export interface SystemStatus {
   cpu_percent: number;
   memory_percent: number;
@@ -138,6 +165,43 @@ export interface SystemStatus {
   disk_percent: number;
   disk_used: number;
   disk_total: number;
+  cpu_per_core: number[];
+  network: NetworkIO[];
+  disk_io: DiskIO[];
+  disks: DiskUsage[];
+}
+
+export interface ProcessInfo {
+  pid: number;
+  name: string;
+  username?: string;
+  status: string;
+  cpu_percent: number;
+  memory_percent: number;
+  memory_rss: number;
+  stale?: boolean;
+}
+
+export interface MetricPoint {
+  timestamp: number;
+  min: number;
+  avg: number;
+  max: number;
+}
+
+export interface MetricHistory {
+  metric: string;
+  step: number;
+  points: MetricPoint[];
+}
+
+export interface NodeInfo {
+  name: string;
+  is_local: boolean;
+  online: boolean;
+  last_seen?: number;
+  status?: SystemStatus;
+  container_count?: number;
 }
 
 // ==================== Docker 相关 ====================
@@ -150,6 +214,85 @@ export interface DockerContainer {
   state: string;
   created: string;
   ports: Record<string, string[]>;
+  host?: string;
+  stale?: boolean;
+  project?: string;
+  service?: string;
+}
+
+export interface DockerStack {
+  name: string;
+  host?: string;
+  state: 'running' | 'degraded' | 'stopped';
+  total: number;
+  running: number;
+  services: string[];
+  ports: string[];
+  containers: string[];
+  stale: boolean;
+}
+
+export interface DockerDiskUsageEntry {
+  id: string;
+  name: string;
+  size: number;
+  in_use: boolean;
+}
+
+export interface DockerDiskUsageCategory {
+  total_count: number;
+  active_count: number;
+  size: number;
+  reclaimable: number;
+  items: DockerDiskUsageEntry[];
+}
+
+export interface DockerDiskUsage {
+  host: string;
+  images: DockerDiskUsageCategory;
+  containers: DockerDiskUsageCategory;
+  volumes: DockerDiskUsageCategory;
+  build_cache: DockerDiskUsageCategory;
+  total_size: number;
+  total_reclaimable: number;
+  updated_at: number;
+  stale: boolean;
+}
+
+export interface DockerHostInfo {
+  name: string;
+  url: string;
+  available: boolean;
+  state: 'closed' | 'open' | 'half_open';
+  error?: string;
+  container_count?: number;
+  last_sync?: number;
+}
+
+export interface ContainerStats {
+  id: string;
+  name: string;
+  cpu_percent: number;
+  memory_usage: number;
+  memory_limit: number;
+  memory_percent: number;
+  network_rx: number;
+  network_tx: number;
+  block_read: number;
+  block_write: number;
+}
+
+export interface ContainerActionResult {
+  id: string;
+  success: boolean;
+  error?: string;
+}
+
+export interface BatchActionResponse {
+  action: string;
+  succeeded: number;
+  failed: number;
+  results: ContainerActionResult[];
 }
 
 export interface DockerStatus {
@@ -169,3 +312,9 @@ export interface SortItem {
   sort_order: number;
   group_id?: number | null;
 }
+
+export interface SortResponse {
+  message: string;
+  success: boolean;
+  version: number;
+}